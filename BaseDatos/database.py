@@ -1,15 +1,153 @@
-import os
-from sqlalchemy import create_engine
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
-from dotenv import load_dotenv
 
-load_dotenv()
+from Utilidades.configuracion import config
+from Utilidades.metricas import medicion_actual
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = config.DATABASE_URL
+CHECK_THREAD = config.CHECK_THREAD
+
+# Pool de conexiones (solo bases de datos servidor, SQLite usa el pool por defecto)
+DB_POOL_SIZE = config.DB_POOL_SIZE
+DB_MAX_OVERFLOW = config.DB_MAX_OVERFLOW
+DB_POOL_RECYCLE = config.DB_POOL_RECYCLE
+DB_POOL_PRE_PING = config.DB_POOL_PRE_PING
+
+# PRAGMAs de SQLite aplicados en cada conexión nueva
+SQLITE_PRAGMAS = config.SQLITE_PRAGMAS
+SQLITE_JOURNAL_MODE = config.SQLITE_JOURNAL_MODE
+SQLITE_SYNCHRONOUS = config.SQLITE_SYNCHRONOUS
+SQLITE_MMAP_SIZE = config.SQLITE_MMAP_SIZE
+SQLITE_CACHE_SIZE = config.SQLITE_CACHE_SIZE
+SQLITE_BUSY_TIMEOUT = config.SQLITE_BUSY_TIMEOUT
+
+# Sentencias que tardan al menos esto se registran en el log (0 lo desactiva)
+DB_CONSULTA_LENTA_MS = config.DB_CONSULTA_LENTA_MS
+
+
+def es_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def opciones_engine(url: str) -> dict:
+# Argumentos de create_engine según el motor: connect_args para SQLite, parámetros de pool para el resto.
+
+    if es_sqlite(url):
+        return {"connect_args": {CHECK_THREAD: False}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def aplicar_pragmas_sqlite(dbapi_connection, connection_record) -> None:
+# Hook "connect": WAL permite lectores concurrentes con un escritor y synchronous=NORMAL reduce los fsync.
+
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    finally:
+        cursor.close()
+
+
+def _inicio_consulta(conn, cursor, statement, parameters, context, executemany) -> None:
+    # en el contexto de ejecución: se descarta con la sentencia aunque falle
+    if context is not None:
+        context._inicio_medicion = time.perf_counter()
+
+
+def _duracion(context) -> Optional[float]:
+    inicio = getattr(context, "_inicio_medicion", None)
+    return None if inicio is None else time.perf_counter() - inicio
+
+
+def _registrar_lenta(duracion: float, statement: str, fallida: bool = False) -> None:
+    if DB_CONSULTA_LENTA_MS > 0 and duracion * 1000 >= DB_CONSULTA_LENTA_MS:
+        logger.warning("Consulta lenta%s (%.1f ms): %s", " con error" if fallida else "", duracion * 1000, statement)
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-CHECK_THREAD = os.getenv("CHECK_THREAD")
 
-engine = create_engine(DATABASE_URL, connect_args={CHECK_THREAD: False})
+def _fin_consulta(conn, cursor, statement, parameters, context, executemany) -> None:
+# Hooks before/after_cursor_execute: miden cada sentencia, la suman a la medición del pedido en curso
+# (Utilidades/metricas.py) y registran las lentas.
+
+    duracion = _duracion(context)
+    if duracion is None:
+        return
+    _registrar_lenta(duracion, statement)
+    medicion = medicion_actual()
+    if medicion is not None:
+        medicion.registrar_consulta(duracion, context)
+
+
+def _error_consulta(contexto_error) -> None:
+# Hook handle_error: las sentencias que fallan (p. ej. el IntegrityError del 409 "Horario ocupado") no pasan
+# por after_cursor_execute; se cuentan igual, con su tiempo, en la medición del pedido.
+
+    duracion = _duracion(contexto_error.execution_context)
+    if duracion is None:
+        return
+    _registrar_lenta(duracion, contexto_error.statement, fallida=True)
+    medicion = medicion_actual()
+    if medicion is not None:
+        medicion.registrar_fallida(duracion)
+
+
+def instrumentar_engine(motor) -> None:
+    event.listen(motor, "before_cursor_execute", _inicio_consulta)
+    event.listen(motor, "after_cursor_execute", _fin_consulta)
+    event.listen(motor, "handle_error", _error_consulta)
+
+
+engine = create_engine(DATABASE_URL, **opciones_engine(DATABASE_URL))
+
+if es_sqlite(DATABASE_URL) and SQLITE_PRAGMAS:
+    event.listen(engine, "connect", aplicar_pragmas_sqlite)
+instrumentar_engine(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
+
+
+# --------- Modo asíncrono (opcional) --------- #
+
+DB_ASYNC = config.DB_ASYNC
+
+
+def url_async(url: str) -> str:
+# Traduce la URL síncrona a su driver asíncrono: aiosqlite para SQLite y asyncpg para PostgreSQL.
+
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefijo in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefijo):
+            return "postgresql+asyncpg:" + url[len(prefijo):]
+    return url
+
+
+ASYNC_DATABASE_URL = config.ASYNC_DATABASE_URL or url_async(DATABASE_URL)
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC:
+    # Import diferido: solo se necesita el driver asíncrono si el modo está activo
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **opciones_engine(ASYNC_DATABASE_URL))
+    if es_sqlite(ASYNC_DATABASE_URL) and SQLITE_PRAGMAS:
+        event.listen(async_engine.sync_engine, "connect", aplicar_pragmas_sqlite)
+    instrumentar_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
@@ -0,0 +1,344 @@
+"""
+Migraciones versionadas del esquema. La tabla schema_version guarda qué versiones ya se aplicaron y cada
+migración corre en su propia transacción. Las primeras son idempotentes (checkfirst / IF EXISTS) para poder
+adoptar bases creadas antes con create_all.
+
+Al iniciar, la app sigue DB_ESQUEMA_AL_INICIAR:
+    migrar     aplica las migraciones pendientes (por defecto, cómodo para desarrollo)
+    verificar  solo compara la versión y no arranca si faltan migraciones
+    omitir     no consulta el esquema (varios workers: se migra una vez antes de levantarlos)
+
+Uso (desde la raíz del repo):
+    python -m BaseDatos.migraciones estado
+    python -m BaseDatos.migraciones migrar [--hasta N]
+    python -m BaseDatos.migraciones corregir-estados [--hasta-id N]   (ver corregir_estados_intercambiados)
+"""
+import argparse
+import logging
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import (Boolean, Column, Date, DateTime, Enum, ForeignKey, Index, Integer, MetaData, String, Table,
+Time, case, delete, func, insert, inspect, select, text, update)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from Utilidades.configuracion import config
+from BaseDatos.database import engine
+
+logger = logging.getLogger(__name__)
+
+DB_ESQUEMA_AL_INICIAR = config.DB_ESQUEMA_AL_INICIAR
+
+# Fuera de Base: no es un modelo de la app
+_metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("descripcion", String, nullable=False),
+    Column("aplicada", DateTime, nullable=False),
+)
+
+
+class Migracion(NamedTuple):
+    version: int
+    descripcion: str
+    aplicar: Callable[[Connection], None]
+
+
+# --------- Esquema de cada versión --------- #
+# Las migraciones no usan los modelos (Modelos/models.py): estos siguen cambiando y una base nueva tiene que
+# pasar por las mismas tablas e índices que se crearon en su momento. Cada versión define lo que agrega.
+
+# Nombres de EstadoTurno tal como se guardan en la columna estado
+ESTADOS_TURNO_V1 = ("pendiente", "cancelado", "confirmado", "asistido")
+
+
+def _tablas_v1(metadata: MetaData) -> Tuple[Table, Table]:
+# personas y turnos como los creaba create_all, con los índices de una columna que la versión 4 quita.
+
+    personas = Table(
+        "personas",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True, index=True),
+        Column("dni", Integer, unique=True, nullable=False, index=True),
+        Column("nombre", String, nullable=False),
+        Column("email", String, unique=True, nullable=False),
+        Column("telefono", String, nullable=False),
+        Column("fecha_Nacimiento", Date, nullable=False),
+        Column("habilitado", Boolean, nullable=False),
+    )
+    turnos = Table(
+        "turnos",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True, index=True),
+        Column("fecha", Date, nullable=False, index=True),
+        Column("hora", Time, nullable=False, index=True),
+        Column("estado", Enum(*ESTADOS_TURNO_V1, name="estadoturno"), nullable=False),
+        Column("persona_id", Integer, ForeignKey("personas.id", ondelete="CASCADE"), nullable=False, index=True),
+    )
+    return personas, turnos
+
+
+def _indice_turno_activo_v1(turnos: Table) -> Index:
+    return Index(
+        "ux_turnos_fecha_hora_activos",
+        turnos.c.fecha,
+        turnos.c.hora,
+        unique=True,
+        sqlite_where=turnos.c.estado != "cancelado",
+        postgresql_where=turnos.c.estado != "cancelado",
+    )
+
+
+def _tabla_estadisticas_v2(metadata: MetaData) -> Table:
+# Necesita personas en la misma metadata por la clave foránea.
+
+    estadisticas = Table(
+        "estadisticas_turnos_diarias",
+        metadata,
+        Column("persona_id", Integer, ForeignKey("personas.id", ondelete="CASCADE"), primary_key=True),
+        Column("estado", Enum(*ESTADOS_TURNO_V1, name="estadoturno"), primary_key=True),
+        Column("fecha", Date, primary_key=True),
+        Column("cantidad", Integer, nullable=False),
+    )
+    Index("ix_estadisticas_estado_fecha", estadisticas.c.estado, estadisticas.c.fecha)
+    return estadisticas
+
+
+# --------- Migraciones --------- #
+
+def _001_tablas_iniciales(conexion: Connection) -> None:
+    personas, turnos = _tablas_v1(MetaData())
+    personas.create(conexion, checkfirst=True)
+    turnos.create(conexion, checkfirst=True)
+
+    # En bases anteriores al índice único puede haber dos turnos activos en el mismo horario
+    duplicado = conexion.execute(
+        select(turnos.c.fecha, turnos.c.hora)
+        .where(turnos.c.estado != "cancelado")
+        .group_by(turnos.c.fecha, turnos.c.hora)
+        .having(func.count(turnos.c.id) > 1)
+        .limit(1)
+    ).first()
+    indice = _indice_turno_activo_v1(turnos)
+    if duplicado is not None:
+        raise RuntimeError(
+            f"Hay turnos activos duplicados (p. ej. {duplicado.fecha} {duplicado.hora}): cancele uno "
+            f"y vuelva a migrar para crear {indice.name}"
+        )
+    indice.create(conexion, checkfirst=True)
+
+
+def _002_estadisticas_turnos(conexion: Connection) -> None:
+    metadata = MetaData()
+    _, turnos = _tablas_v1(metadata)
+    estadisticas = _tabla_estadisticas_v2(metadata)
+    estadisticas.create(conexion, checkfirst=True)
+
+    # Se llena una vez desde turnos; después la mantiene Utilidades/estadisticas.py
+    if conexion.scalar(select(estadisticas.c.persona_id).limit(1)) is None:
+        conexion.execute(
+            insert(estadisticas).from_select(
+                ["persona_id", "estado", "fecha", "cantidad"],
+                select(turnos.c.persona_id, turnos.c.estado, turnos.c.fecha, func.count(turnos.c.id))
+                .group_by(turnos.c.persona_id, turnos.c.estado, turnos.c.fecha),
+            )
+        )
+
+
+def _003_indices_compuestos_turnos(conexion: Connection) -> None:
+    _, turnos = _tablas_v1(MetaData())
+    c = turnos.c
+    for indice in (
+        Index("ix_turnos_estado_fecha_hora", c.estado, c.fecha, c.hora),
+        Index("ix_turnos_persona_estado_fecha_hora", c.persona_id, c.estado, c.fecha, c.hora),
+        Index("ix_turnos_fecha_hora_id", c.fecha, c.hora, c.id),
+    ):
+        indice.create(conexion, checkfirst=True)
+    # estadísticas del planificador para que tenga en cuenta los índices nuevos
+    conexion.execute(text("ANALYZE"))
+
+
+def _004_quitar_indices_redundantes(conexion: Connection) -> None:
+    # Los de id repiten la clave primaria; fecha y persona_id son prefijo de los compuestos; hora no lo usa ninguna consulta
+    for nombre in ("ix_personas_id", "ix_turnos_id", "ix_turnos_fecha", "ix_turnos_hora", "ix_turnos_persona_id"):
+        conexion.execute(text(f"DROP INDEX IF EXISTS {nombre}"))
+
+
+def _005_indice_fecha_nacimiento(conexion: Connection) -> None:
+    personas, _ = _tablas_v1(MetaData())
+    Index("ix_personas_fecha_nacimiento", personas.c.fecha_Nacimiento).create(conexion, checkfirst=True)
+
+
+def _006_versiones_tablas(conexion: Connection) -> None:
+    # Definición fija de la versión 6 (no la del modelo actual)
+    versiones = Table(
+        "versiones_tablas",
+        MetaData(),
+        Column("tabla", String, primary_key=True),
+        Column("version", Integer, nullable=False),
+    )
+    versiones.create(conexion, checkfirst=True)
+    existentes = set(conexion.scalars(select(versiones.c.tabla)))
+    nuevas = [t for t in ("personas", "turnos", "estadisticas_turnos_diarias") if t not in existentes]
+    if nuevas:
+        conexion.execute(insert(versiones), [{"tabla": t, "version": 0} for t in nuevas])
+
+
+def _007_versiones_por_fragmento(conexion: Connection) -> None:
+    # Cada tabla pasa a tener varios contadores (fragmentos) y su versión es la suma: las escrituras concurrentes
+    # incrementan filas distintas. La versión anterior queda en el fragmento 0, así la suma sigue creciendo
+    # y no vuelve a coincidir con una clave vieja del cache.
+    nueva = Table(
+        "versiones_tablas_nueva",
+        MetaData(),
+        Column("tabla", String, primary_key=True),
+        Column("fragmento", Integer, primary_key=True),
+        Column("version", Integer, nullable=False),
+    )
+    nueva.create(conexion)
+    conexion.execute(text(
+        "INSERT INTO versiones_tablas_nueva (tabla, fragmento, version) SELECT tabla, 0, version FROM versiones_tablas"
+    ))
+    conexion.execute(text("DROP TABLE versiones_tablas"))
+    conexion.execute(text("ALTER TABLE versiones_tablas_nueva RENAME TO versiones_tablas"))
+
+
+MIGRACIONES: List[Migracion] = [
+    Migracion(1, "Tablas personas y turnos, índice único de turnos activos", _001_tablas_iniciales),
+    Migracion(2, "Tabla estadisticas_turnos_diarias", _002_estadisticas_turnos),
+    Migracion(3, "Índices compuestos de turnos", _003_indices_compuestos_turnos),
+    Migracion(4, "Quitar índices de una columna redundantes", _004_quitar_indices_redundantes),
+    Migracion(5, "Índice de personas por fecha de nacimiento (filtros de edad)", _005_indice_fecha_nacimiento),
+    Migracion(6, "Tabla versiones_tablas para invalidar el cache de reportes entre procesos", _006_versiones_tablas),
+    Migracion(7, "Versiones de tablas repartidas en fragmentos", _007_versiones_por_fragmento),
+]
+
+
+# --------- Aplicación --------- #
+
+def version_actual(conexion: Connection) -> int:
+    if not inspect(conexion).has_table(schema_version.name):
+        return 0
+    return conexion.scalar(select(func.max(schema_version.c.version))) or 0
+
+
+def migraciones_pendientes(conexion: Connection) -> List[Migracion]:
+    actual = version_actual(conexion)
+    return [m for m in MIGRACIONES if m.version > actual]
+
+
+def migrar(hasta: Optional[int] = None, motor: Engine = engine) -> List[Migracion]:
+# Aplica en orden las migraciones pendientes (hasta la versión `hasta`, si se indica) y devuelve las aplicadas.
+
+    with motor.begin() as conexion:
+        _metadata.create_all(conexion)
+        pendientes = migraciones_pendientes(conexion)
+
+    aplicadas = []
+    for migracion in pendientes:
+        if hasta is not None and migracion.version > hasta:
+            break
+        try:
+            with motor.begin() as conexion:
+                # Se registra antes de aplicarla: toma el lock de escritura y, si otro proceso está
+                # migrando al mismo tiempo, uno de los dos falla acá en lugar de aplicarla dos veces
+                conexion.execute(insert(schema_version).values(
+                    version=migracion.version, descripcion=migracion.descripcion, aplicada=datetime.now(),
+                ))
+                migracion.aplicar(conexion)
+        except IntegrityError:
+            logger.info("Migración %s ya aplicada por otro proceso", migracion.version)
+            continue
+        logger.info("Migración %s aplicada: %s", migracion.version, migracion.descripcion)
+        aplicadas.append(migracion)
+    return aplicadas
+
+
+def preparar_esquema() -> None:
+# Se llama al iniciar la app, según DB_ESQUEMA_AL_INICIAR (ver el docstring del módulo).
+
+    if DB_ESQUEMA_AL_INICIAR == "omitir":
+        return
+    if DB_ESQUEMA_AL_INICIAR == "verificar":
+        with engine.connect() as conexion:
+            pendientes = migraciones_pendientes(conexion)
+        if pendientes:
+            raise RuntimeError(
+                f"Faltan {len(pendientes)} migraciones del esquema (desde la {pendientes[0].version}): "
+                "python -m BaseDatos.migraciones migrar"
+            )
+        return
+    migrar()
+
+
+# --------- Corrección de datos --------- #
+
+def corregir_estados_intercambiados(hasta_id: Optional[int] = None, motor: Engine = engine) -> int:
+# Antes de corregir el enum, EstadoTurno tenía cruzados los valores de cancelado y asistido y SQLAlchemy guardaba
+# los turnos cancelados por la app (PUT /turnos/{id}/cancelar y similares) con el nombre 'asistido' y los
+# asistidos con 'cancelado'. Con el enum corregido esas filas se leen con el estado opuesto. Intercambia
+# 'cancelado' y 'asistido' en turnos (solo hasta el id `hasta_id`, si se indica: el último turno anterior a la
+# actualización) y reconstruye las estadísticas diarias, en una transacción. No es una migración automática:
+# los turnos creados con el estado en el cuerpo del pedido quedaron con el nombre correcto y la base no
+# permite distinguirlos, así que se corre a mano, una vez y con la app detenida, después de revisar los datos.
+# Devuelve la cantidad de turnos cambiados.
+
+    metadata = MetaData()
+    _, turnos = _tablas_v1(metadata)
+    estadisticas = _tabla_estadisticas_v2(metadata)
+
+    sentencia = (
+        update(turnos)
+        .where(turnos.c.estado.in_(["cancelado", "asistido"]))
+        .values(estado=case((turnos.c.estado == "cancelado", "asistido"), else_="cancelado"))
+    )
+    if hasta_id is not None:
+        sentencia = sentencia.where(turnos.c.id <= hasta_id)
+
+    try:
+        with motor.begin() as conexion:
+            cambiados = conexion.execute(sentencia).rowcount
+            conexion.execute(delete(estadisticas))
+            conexion.execute(
+                insert(estadisticas).from_select(
+                    ["persona_id", "estado", "fecha", "cantidad"],
+                    select(turnos.c.persona_id, turnos.c.estado, turnos.c.fecha, func.count(turnos.c.id))
+                    .group_by(turnos.c.persona_id, turnos.c.estado, turnos.c.fecha),
+                )
+            )
+    except IntegrityError as e:
+        # un turno que pasa de 'cancelado' a 'asistido' vuelve a ocupar su horario
+        raise RuntimeError(f"Hay turnos activos en el mismo horario que un turno a corregir: {e.orig}") from e
+    return cambiados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("accion", choices=["estado", "migrar", "corregir-estados"])
+    parser.add_argument("--hasta", type=int, default=None, help="Versión máxima a aplicar")
+    parser.add_argument("--hasta-id", type=int, default=None, help="corregir-estados: último id de turno a corregir")
+    args = parser.parse_args()
+
+    if args.accion == "migrar":
+        aplicadas = migrar(args.hasta)
+        for m in aplicadas:
+            print(f"Aplicada {m.version}: {m.descripcion}")
+        print(f"{len(aplicadas)} migraciones aplicadas")
+
+    if args.accion == "corregir-estados":
+        print(f"{corregir_estados_intercambiados(args.hasta_id)} turnos corregidos")
+
+    with engine.connect() as conexion:
+        actual = version_actual(conexion)
+        pendientes = migraciones_pendientes(conexion)
+    print(f"Versión del esquema: {actual}")
+    for m in pendientes:
+        print(f"Pendiente {m.version}: {m.descripcion}")
+
+
+if __name__ == "__main__":
+    main()
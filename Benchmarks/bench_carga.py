@@ -0,0 +1,325 @@
+"""
+Prueba de carga de la API: siembra una base SQLite (por defecto 10k personas y 1M de turnos, ver
+Benchmarks/sembrado.py), manda pedidos a los endpoints reales a través de la app ASGI en el mismo proceso
+(httpx.ASGITransport, sin red ni uvicorn) y mide latencia p50/p95/p99 y pedidos por segundo de cada escenario:
+CRUD de personas y turnos, disponibilidad y cada reporte JSON, CSV y PDF.
+
+Los resultados se guardan en JSON (con el commit, el entorno y los parámetros) para comparar entre commits:
+    python Benchmarks/bench_carga.py --salida antes.json
+    python Benchmarks/bench_carga.py --salida despues.json --comparar antes.json
+
+Sembrar 1M de turnos lleva un rato: con --db la base se guarda en esa ruta y las corridas siguientes la
+reutilizan (los escenarios que escriben dejan la base como estaba). El cache de reportes se desactiva para
+medir la generación; --cache lo deja como esté en el .env.
+
+Uso (desde la raíz del repo):
+    python Benchmarks/bench_carga.py --personas 10000 --turnos 1000000 --pedidos 500 --concurrencia 8
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, List, NamedTuple, Optional
+
+from sembrado import sembrar, dni_sembrado
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Personas que crean los escenarios de escritura (fuera del rango sembrado)
+DNI_CARGA = 90_000_000
+
+
+class Escenario(NamedTuple):
+    nombre: str
+    # i -> (método, url, kwargs de httpx)
+    pedido: Callable[[int], tuple]
+    esperado: int
+    reporte: bool = False
+    # se llama con cada respuesta esperada (p. ej. para guardar el id creado)
+    al_responder: Optional[Callable] = None
+    # ids creados por un escenario anterior que usa este; se omite si no hay ninguno
+    datos: Optional[list] = None
+    # un pedido por id (confirmar, borrar): no manda más pedidos que ids haya
+    por_dato: bool = False
+
+
+def _commit() -> str:
+    try:
+        salida = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=RAIZ,
+                                capture_output=True, text=True, check=True)
+        return salida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def _escenarios(personas: int, turnos: int, dia_libre: date, slots: List[str]) -> List[Escenario]:
+    hoy = date.today()
+    mes = (hoy + timedelta(days=30)).isoformat()
+    creadas: List[int] = []
+    turnos_creados: List[int] = []
+
+    # Para que los reportes de cancelados traigan pocas personas: mínimo de unas 3 desviaciones sobre la media
+    # por persona. El JSON cuenta todas las cancelaciones; CSV y PDF, las de los últimos 180 días.
+    def minimo_cancelados(turnos_considerados: int) -> int:
+        media = turnos_considerados * 0.2 / max(personas, 1)
+        return max(1, round(media + 3 * math.sqrt(media)))
+
+    min_cancelados = minimo_cancelados(turnos)
+    min_cancelados_ventana = minimo_cancelados(min(turnos // 2, 180 * len(slots)))
+
+    def nueva_persona(i):
+        return ("POST", "/personas", {"json": {
+            "nombre": f"Carga {i}", "email": f"carga{i}@mail.com", "dni": DNI_CARGA + i,
+            "telefono": "1100000000", "fecha_Nacimiento": "1990-01-01",
+        }})
+
+    def nuevo_turno(i):
+        return ("POST", "/turnos", {"json": {
+            "fecha": (dia_libre + timedelta(days=i // len(slots))).isoformat(),
+            "hora": slots[i % len(slots)],
+            # personas creadas por la carga: sin cancelaciones, así no las frena la regla de 5 cancelaciones
+            "persona_dni": creadas[i % len(creadas)],
+        }})
+
+    escenarios = [
+        # Personas
+        Escenario("POST /personas", nueva_persona, 201, al_responder=lambda r: creadas.append(r.json()["dni"])),
+        Escenario("GET /personas/{dni}", lambda i: ("GET", f"/personas/{dni_sembrado(i % personas)}", {}), 200),
+        Escenario("GET /personas?limit=50", lambda i: ("GET", "/personas", {"params": {"limit": 50}}), 200),
+        Escenario("PUT /personas/{dni}", lambda i: ("PUT", f"/personas/{creadas[i % len(creadas)]}",
+                                                    {"json": {"telefono": f"11{i:08d}"}}), 200, datos=creadas),
+        # Turnos
+        Escenario("POST /turnos", nuevo_turno, 201, al_responder=lambda r: turnos_creados.append(r.json()["id"]),
+                  datos=creadas),
+        Escenario("GET /turnos/{id}", lambda i: ("GET", f"/turnos/{turnos_creados[i % len(turnos_creados)]}", {}), 200,
+                  datos=turnos_creados),
+        Escenario("GET /turnos?limit=50", lambda i: ("GET", "/turnos", {"params": {"limit": 50}}), 200),
+        Escenario("GET /turnos?estado&limit=50", lambda i: ("GET", "/turnos", {"params": {
+            "estado": "confirmado", "limit": 50}}), 200),
+        Escenario("GET /turnos?persona_dni", lambda i: ("GET", "/turnos", {"params": {
+            "persona_dni": dni_sembrado(i % personas), "limit": 50}}), 200),
+        Escenario("PUT /turnos/{id}/confirmar", lambda i: ("PUT", f"/turnos/{turnos_creados[i]}/confirmar", {}), 200,
+                  datos=turnos_creados, por_dato=True),
+        Escenario("DELETE /turnos/{id}", lambda i: ("DELETE", f"/turnos/{turnos_creados[i]}", {}), 204,
+                  datos=turnos_creados, por_dato=True),
+        Escenario("DELETE /personas/{dni}", lambda i: ("DELETE", f"/personas/{creadas[i]}", {}), 204,
+                  datos=creadas, por_dato=True),
+        # Disponibilidad
+        Escenario("GET /turnos-disponibles", lambda i: ("GET", "/turnos-disponibles", {"params": {
+            "fecha": (hoy + timedelta(days=i % 30)).isoformat()}}), 200),
+        Escenario("GET /turnos-disponibles/rango", lambda i: ("GET", "/turnos-disponibles/rango", {"params": {
+            "desde": hoy.isoformat(), "hasta": mes}}), 200),
+    ]
+
+    # Reportes: los mismos parámetros para JSON, CSV y PDF
+    parametros = {
+        "turnos-por-fecha": lambda i: {"fecha": hoy.isoformat()},
+        "turnos-cancelados-por-mes": lambda i: {},
+        "turnos-por-persona": lambda i: {"dni": dni_sembrado(i % personas)},
+        "turnos-cancelados": lambda i: {"min": min_cancelados},
+        "csv/turnos-cancelados": lambda i: {"min": min_cancelados_ventana},
+        "turnos-confirmados": lambda i: {"desde": hoy.isoformat(), "hasta": mes, "tamanio": 50, "pagina": 1},
+        "estado-personas": lambda i: {"habilitada": False},
+    }
+    for prefijo in ("/reportes", "/reportes/csv", "/reportes/pdf"):
+        for reporte, params in parametros.items():
+            if reporte.startswith("csv/"):
+                continue
+            if prefijo != "/reportes":
+                params = parametros.get(f"csv/{reporte}", params)
+            url = f"{prefijo}/{reporte}"
+            escenarios.append(Escenario(
+                f"GET {url}", lambda i, url=url, params=params: ("GET", url, {"params": params(i)}), 200, reporte=True,
+            ))
+    return escenarios
+
+
+def _percentil(ordenadas: List[float], p: float) -> float:
+    return ordenadas[min(len(ordenadas) - 1, math.ceil(p / 100 * len(ordenadas)) - 1)]
+
+
+async def _correr(cliente, escenario: Escenario, pedidos: int, concurrencia: int, calentamiento: int) -> dict:
+# Manda `pedidos` pedidos con `concurrencia` pedidos en vuelo y devuelve las estadísticas del escenario.
+
+    latencias: List[float] = []
+    codigos = {}
+    ejemplo_error = None
+
+    async def mandar(i: int, medir: bool) -> None:
+        nonlocal ejemplo_error
+        metodo, url, kwargs = escenario.pedido(i)
+        inicio = time.perf_counter()
+        respuesta = await cliente.request(metodo, url, **kwargs)
+        if not medir:
+            return
+        latencias.append(time.perf_counter() - inicio)
+        codigos[respuesta.status_code] = codigos.get(respuesta.status_code, 0) + 1
+        if respuesta.status_code != escenario.esperado:
+            ejemplo_error = ejemplo_error or f"{respuesta.status_code} {metodo} {url}: {respuesta.text[:200]}"
+        elif escenario.al_responder:
+            escenario.al_responder(respuesta)
+
+    # Solo se calientan los escenarios de lectura: los de escritura consumen los índices i
+    if escenario.pedido(0)[0] == "GET":
+        for i in range(calentamiento):
+            await mandar(i, medir=False)
+
+    indices = iter(range(pedidos))
+
+    async def trabajador():
+        for i in indices:
+            await mandar(i, medir=True)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    total = time.perf_counter() - inicio
+
+    ordenadas = sorted(latencias)
+    return {
+        "pedidos": pedidos,
+        "errores": pedidos - codigos.get(escenario.esperado, 0),
+        "codigos": {str(c): n for c, n in sorted(codigos.items())},
+        "p50_ms": round(_percentil(ordenadas, 50) * 1000, 2),
+        "p95_ms": round(_percentil(ordenadas, 95) * 1000, 2),
+        "p99_ms": round(_percentil(ordenadas, 99) * 1000, 2),
+        "media_ms": round(statistics.fmean(ordenadas) * 1000, 2),
+        "rps": round(pedidos / total, 1),
+        "ejemplo_error": ejemplo_error,
+    }
+
+
+def _comparar(anterior: dict, actual: dict) -> None:
+    print(f"\nComparación con {anterior.get('commit')} ({anterior.get('fecha')}):")
+    print(f"{'escenario':48s} {'p50 ms':>19s} {'p95 ms':>19s} {'req/s':>19s}")
+    for nombre, r in actual["escenarios"].items():
+        a = anterior["escenarios"].get(nombre)
+        if a is None:
+            continue
+        columnas = []
+        for campo in ("p50_ms", "p95_ms", "rps"):
+            cambio = (r[campo] - a[campo]) / a[campo] * 100 if a[campo] else 0.0
+            columnas.append(f"{a[campo]:>7} -> {r[campo]:<7} {cambio:+4.0f}%")
+        print(f"{nombre:48s} " + " ".join(columnas))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--personas", type=int, default=10_000)
+    parser.add_argument("--turnos", type=int, default=1_000_000)
+    parser.add_argument("--pedidos", type=int, default=500, help="Pedidos por escenario de CRUD y disponibilidad")
+    parser.add_argument("--pedidos-reportes", type=int, default=20, help="Pedidos por escenario de reportes")
+    parser.add_argument("--concurrencia", type=int, default=8, help="Pedidos en vuelo a la vez")
+    parser.add_argument("--calentamiento", type=int, default=5, help="Pedidos sin medir antes de cada escenario de lectura")
+    parser.add_argument("--solo", default=None, help="Corre solo los escenarios cuyo nombre contiene este texto")
+    parser.add_argument("--db", default=None, help="Ruta de la base sembrada (se reutiliza si ya existe)")
+    parser.add_argument("--cache", action="store_true", help="No desactivar el cache de reportes")
+    parser.add_argument("--salida", default=None, help="Archivo JSON de resultados (por defecto bench_carga_<commit>.json)")
+    parser.add_argument("--comparar", default=None, help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+
+    tmp = None
+    ruta_db = args.db
+    if ruta_db is None:
+        tmp = tempfile.TemporaryDirectory()
+        ruta_db = os.path.join(tmp.name, "carga.db")
+    reutilizada = os.path.exists(ruta_db)
+
+    # Los módulos del proyecto leen la configuración al importarse
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(ruta_db)}"
+    if not args.cache:
+        os.environ["REPORTES_CACHE"] = "false"
+    # Con 1M de turnos los reportes superan el umbral y llenarían la salida de warnings
+    os.environ.setdefault("DB_CONSULTA_LENTA_MS", "0")
+    sys.path.insert(0, RAIZ)
+    import httpx
+    from sqlalchemy import delete, func, select
+    from BaseDatos.database import engine, SessionLocal, DB_ASYNC
+    from BaseDatos.migraciones import migrar
+    from Modelos.models import Persona, Turno
+    from Utilidades.estadisticas import reconstruir_estadisticas
+    from Utilidades.configuracion import config
+    from Utilidades.slots import SLOTS
+    from app import crear_app
+
+    migrar()
+    sembrado_seg = 0.0
+    if not reutilizada:
+        inicio = time.perf_counter()
+        sembrar(engine, args.turnos, args.personas)
+        db = SessionLocal()
+        try:
+            reconstruir_estadisticas(db)
+        finally:
+            db.close()
+        sembrado_seg = round(time.perf_counter() - inicio, 1)
+
+    with engine.begin() as conexion:
+        # Restos de una corrida interrumpida sobre la misma base (no tienen turnos: se crean para personas sembradas)
+        conexion.execute(delete(Persona).where(Persona.dni >= DNI_CARGA))
+        personas = conexion.scalar(select(func.count(Persona.id)))
+        turnos = conexion.scalar(select(func.count(Turno.id)))
+        dia_libre = conexion.scalar(select(func.max(Turno.fecha))) + timedelta(days=1)
+    origen = f"reutilizada ({ruta_db})" if reutilizada else f"sembrada en {sembrado_seg} s"
+    print(f"Base: {personas} personas, {turnos} turnos, {origen}")
+
+    escenarios = _escenarios(personas, turnos, dia_libre, SLOTS)
+    if args.solo:
+        escenarios = [e for e in escenarios if args.solo in e.nombre]
+
+    async def correr_todos() -> dict:
+        resultados = {}
+        transporte = httpx.ASGITransport(app=crear_app())
+        async with httpx.AsyncClient(transport=transporte, base_url="http://carga", timeout=None) as cliente:
+            for escenario in escenarios:
+                pedidos = args.pedidos_reportes if escenario.reporte else args.pedidos
+                if escenario.datos is not None:
+                    if not escenario.datos:
+                        print(f"{escenario.nombre:48s} omitido: no hay datos de un escenario anterior")
+                        continue
+                    if escenario.por_dato:
+                        pedidos = min(pedidos, len(escenario.datos))
+                r = await _correr(cliente, escenario, pedidos, args.concurrencia, args.calentamiento)
+                resultados[escenario.nombre] = r
+                print(f"{escenario.nombre:48s} p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  "
+                      f"p99 {r['p99_ms']:>8} ms  {r['rps']:>8} req/s  errores {r['errores']}")
+        return resultados
+
+    resultados = asyncio.run(correr_todos())
+
+    commit = _commit()
+    informe = {
+        "commit": commit,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "entorno": {"python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+                    "plataforma": platform.platform(), "cpus": os.cpu_count()},
+        "parametros": {"personas": personas, "turnos": turnos, "pedidos": args.pedidos,
+                       "pedidos_reportes": args.pedidos_reportes, "concurrencia": args.concurrencia,
+                       "cache_reportes": config.REPORTES_CACHE, "db_async": DB_ASYNC},
+        "sembrado_seg": sembrado_seg,
+        "escenarios": resultados,
+    }
+    salida = args.salida or f"bench_carga_{commit}.json"
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(informe, archivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            _comparar(json.load(archivo), informe)
+
+    engine.dispose()
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark del arranque: mide cuánto tarda `import app` en un intérprete nuevo (python -X importtime), los
+módulos que más pesan, la memoria residente después de importar y si se cargó borb (no debería: el PDF lo
+importa recién al generarse). Sale con código 1 si la mediana supera el presupuesto, para usarlo en CI.
+
+Cada repetición corre en un subproceso con una base temporal, para no tocar la del proyecto.
+
+Uso (desde la raíz del repo):
+    python Benchmarks/bench_importacion.py --repeticiones 5 --presupuesto-ms 1500
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Línea de -X importtime: "import time: <propio us> | <acumulado us> | <sangría><módulo>"
+LINEA_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+PAQUETES_PROYECTO = ("BaseDatos", "Modelos", "Utilidades", "Rutas")
+
+# Se ejecuta en el subproceso después de importar la app
+SONDA = (
+    "import json, resource, sys; import app; "
+    "print(json.dumps({'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "
+    "'borb': 'borb' in sys.modules, 'modulos': len(sys.modules)}))"
+)
+
+
+def _importar(db: str) -> dict:
+    entorno = dict(os.environ)
+    entorno["DATABASE_URL"] = f"sqlite:///{db}"
+    entorno["PYTHONPATH"] = RAIZ
+    salida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SONDA],
+        cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True,
+    )
+
+    acumulado = {}
+    for linea in salida.stderr.splitlines():
+        m = LINEA_IMPORTTIME.match(linea)
+        if not m:
+            continue
+        modulo = m.group(4)
+        # app y lo que importa directamente (sangría de hasta 3 espacios), más todos los módulos del proyecto
+        if len(m.group(3)) <= 3 or modulo.split(".")[0] in PAQUETES_PROYECTO:
+            acumulado[modulo] = int(m.group(2)) / 1000
+    resultado = json.loads(salida.stdout.strip().splitlines()[-1])
+    resultado["ms"] = acumulado.get("app", 0.0)
+    resultado["acumulado"] = acumulado
+    return resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--presupuesto-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=10, help="Cantidad de módulos a listar")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corridas = [_importar(os.path.join(tmp, "bench.db")) for _ in range(args.repeticiones)]
+
+    mediana = statistics.median(c["ms"] for c in corridas)
+    ultima = corridas[-1]
+    print(f"import app: mediana {mediana:.0f} ms (min {min(c['ms'] for c in corridas):.0f}, "
+          f"max {max(c['ms'] for c in corridas):.0f}) en {args.repeticiones} repeticiones")
+    print(f"RSS después de importar: {ultima['rss_kb'] / 1024:.1f} MB, {ultima['modulos']} módulos, "
+          f"borb cargado: {'sí' if ultima['borb'] else 'no'}")
+
+    print("\nMódulos con más tiempo acumulado (última corrida):")
+    modulos = sorted(((ms, nombre) for nombre, ms in ultima["acumulado"].items() if nombre != "app"), reverse=True)
+    for ms, nombre in modulos[:args.top]:
+        print(f"  {ms:8.1f} ms  {nombre}")
+
+    if mediana > args.presupuesto_ms:
+        print(f"\nSupera el presupuesto de {args.presupuesto_ms:.0f} ms")
+        sys.exit(1)
+    print(f"\nDentro del presupuesto de {args.presupuesto_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark de los índices de turnos: siembra una base SQLite temporal (por defecto 1M de turnos) y, para la
+consulta de cada endpoint, muestra el plan (EXPLAIN QUERY PLAN) y el tiempo con los índices anteriores (de una
+columna: fecha, hora y persona_id) y con los actuales (compuestos, migraciones 3 y 4).
+
+Los datos salen de Benchmarks/sembrado.py (16 turnos activos por día alrededor de hoy). Las consultas usan
+los mismos parámetros ligados que la API, por eso el plan es el que ve el endpoint.
+
+Uso (desde la raíz del repo):
+    python Benchmarks/bench_indices.py --turnos 1000000 --personas 20000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, time as time_cls, timedelta
+
+from sembrado import sembrar, dni_sembrado
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Índices de turnos antes de la migración 3
+INDICES_ANTERIORES = {"ix_turnos_fecha": "fecha", "ix_turnos_hora": "hora", "ix_turnos_persona_id": "persona_id"}
+
+
+def _consultas(db):
+# (endpoint, query) con la misma forma que usa cada endpoint.
+
+    from sqlalchemy import tuple_
+    from Modelos.models import Persona, Turno, EstadoTurno
+    from Utilidades.consultas import consulta_turnos, filtrar_por_dni
+    from Utilidades.reportes import (_turnos_por_fecha, _mes_actual, _turnos_cancelados_del_mes,
+    _turnos_de_persona, _turnos_confirmados)
+
+    hoy = date.today()
+    persona = db.query(Persona).filter(Persona.dni == dni_sembrado(123)).one()
+    orden = (Turno.fecha.asc(), Turno.hora.asc(), Turno.id.asc())
+    return [
+        ("GET /turnos?limit=50", consulta_turnos(db).order_by(*orden).limit(51)),
+        ("GET /turnos?estado&limit=50", consulta_turnos(db).filter(Turno.estado == EstadoTurno.confirmado)
+            .order_by(*orden).limit(51)),
+        ("GET /turnos?estado&cursor", consulta_turnos(db).filter(Turno.estado == EstadoTurno.confirmado)
+            .filter(tuple_(Turno.fecha, Turno.hora, Turno.id) > (hoy, time_cls(9), 0)).order_by(*orden).limit(51)),
+        ("GET /turnos?fecha&estado", consulta_turnos(db).filter(Turno.estado == EstadoTurno.pendiente, Turno.fecha == hoy)
+            .order_by(*orden)),
+        ("GET /turnos?persona_dni", filtrar_por_dni(consulta_turnos(db), persona.dni).order_by(*orden).limit(51)),
+        ("GET /turnos-disponibles", db.query(Turno.hora).filter(Turno.fecha == hoy, Turno.estado != EstadoTurno.cancelado)),
+        ("GET /turnos-disponibles/rango (30 días)", db.query(Turno.fecha, Turno.hora)
+            .filter(Turno.fecha >= hoy, Turno.fecha <= hoy + timedelta(days=30), Turno.estado != EstadoTurno.cancelado)
+            .group_by(Turno.fecha, Turno.hora).order_by(Turno.fecha.asc(), Turno.hora.asc())),
+        ("/reportes/turnos-por-fecha", _turnos_por_fecha(hoy)(db)),
+        ("/reportes/turnos-cancelados-por-mes", _turnos_cancelados_del_mes(*_mes_actual())(db)),
+        ("/reportes/turnos-por-persona", _turnos_de_persona(persona.id)(db)),
+        ("/reportes/turnos-cancelados (por persona)", db.query(Turno)
+            .filter(Turno.persona_id == persona.id, Turno.estado == EstadoTurno.cancelado)
+            .order_by(Turno.fecha.desc(), Turno.hora.desc())),
+        ("/reportes/turnos-confirmados (30 días)", _turnos_confirmados(hoy, hoy + timedelta(days=30))(db)),
+    ]
+
+
+def _medir(SessionLocal, repeticiones: int) -> dict:
+# Ejecuta cada consulta `repeticiones` veces (mediana en ms) y guarda el plan de la primera ejecución.
+
+    from sqlalchemy import event
+    from BaseDatos.database import engine
+
+    planes = {}
+
+    def explicar(conexion, cursor, sentencia, parametros, contexto, executemany):
+        clave = conexion.info.pop("explicar", None)
+        if clave is not None:
+            cursor.execute("EXPLAIN QUERY PLAN " + sentencia, parametros)
+            planes[clave] = [fila[3] for fila in cursor.fetchall()]
+
+    event.listen(engine, "before_cursor_execute", explicar)
+    resultados = {}
+    db = SessionLocal()
+    try:
+        for nombre, query in _consultas(db):
+            tiempos = []
+            for i in range(repeticiones):
+                if i == 0:
+                    db.connection().info["explicar"] = nombre
+                inicio = time.perf_counter()
+                filas = len(query.all())
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+                db.expunge_all()
+            resultados[nombre] = (statistics.median(tiempos), filas)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", explicar)
+    return {nombre: (ms, filas, planes.get(nombre, [])) for nombre, (ms, filas) in resultados.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turnos", type=int, default=1_000_000)
+    parser.add_argument("--personas", type=int, default=20_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    # Los módulos del proyecto leen DATABASE_URL al importarse: se usa una base temporal para no tocar la del proyecto
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    sys.path.insert(0, RAIZ)
+    from sqlalchemy import text
+    from BaseDatos.database import engine, SessionLocal
+    from BaseDatos.migraciones import migrar
+    from Modelos.models import Turno
+
+    migrar()
+    compuestos = [i for i in Turno.__table__.indexes if len(i.columns) > 1 and not i.unique]
+
+    # Se siembra sin los índices compuestos (la carga es más rápida) y después se miden las dos fases
+    for indice in compuestos:
+        indice.drop(bind=engine)
+
+    inicio = time.perf_counter()
+    sembrar(engine, args.turnos, args.personas)
+    print(f"Sembrado: {args.turnos} turnos, {args.personas} personas en {time.perf_counter() - inicio:.1f} s")
+
+    fases = {}
+    for fase in ("anteriores", "actuales"):
+        inicio = time.perf_counter()
+        with engine.begin() as conexion:
+            for nombre, columna in INDICES_ANTERIORES.items():
+                if fase == "anteriores":
+                    conexion.execute(text(f"CREATE INDEX {nombre} ON turnos ({columna})"))
+                else:
+                    conexion.execute(text(f"DROP INDEX {nombre}"))
+            if fase == "actuales":
+                for indice in compuestos:
+                    indice.create(bind=conexion)
+            conexion.execute(text("ANALYZE"))
+        print(f"Índices {fase}: preparados en {time.perf_counter() - inicio:.1f} s")
+        fases[fase] = _medir(SessionLocal, args.repeticiones)
+
+    antes, despues = fases["anteriores"], fases["actuales"]
+    for nombre in antes:
+        ms_antes, filas, plan_antes = antes[nombre]
+        ms_despues, _, plan_despues = despues[nombre]
+        print(f"\n{nombre}  ({filas} filas)  {ms_antes:.2f} ms -> {ms_despues:.2f} ms")
+        for etiqueta, plan in (("antes", plan_antes), ("después", plan_despues)):
+            print(f"  {etiqueta:>7}: " + " | ".join(plan))
+
+    engine.dispose()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
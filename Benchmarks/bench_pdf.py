@@ -0,0 +1,84 @@
+"""
+Benchmark del renderer de PDF paginado (generar_pdf_tabla) con 10k, 50k y 100k filas.
+
+Las filas se generan con un generador, igual que en los endpoints /reportes/pdf/*, y cada tamaño
+corre en un subproceso para que el pico de memoria (ru_maxrss) de una corrida no tape al de la siguiente.
+
+Uso (desde la raíz del repo):
+    python Benchmarks/bench_pdf.py --filas 10000 50000 100000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _filas(cantidad: int):
+# Filas con la misma forma que el reporte de turnos por fecha (dni, nombre, id, fecha, hora, estado).
+
+    inicio = date.today()
+    for i in range(cantidad):
+        yield [
+            30_000_000 + i % 5000,
+            f"Persona {i % 5000}",
+            i + 1,
+            inicio + timedelta(days=i // 16),
+            f"{9 + (i % 16) // 2:02d}:{30 * (i % 2):02d}",
+            "confirmado",
+        ]
+
+
+def _medir(cantidad: int) -> dict:
+# Se ejecuta dentro del subproceso: renderiza el PDF y devuelve tiempos, tamaño y pico de memoria.
+
+    sys.path.insert(0, RAIZ)
+    from Utilidades.exportacion_pdf import generar_pdf_tabla, PDF_FILAS_POR_PAGINA
+
+    columnas = ["DNI", "Nombre", "Turno", "Fecha", "Hora", "Estado"]
+    inicio = time.perf_counter()
+    pdf = generar_pdf_tabla(columnas, _filas(cantidad), titulo=f"Benchmark {cantidad} filas")
+    duracion = time.perf_counter() - inicio
+
+    return {
+        "filas": cantidad,
+        "paginas": -(-cantidad // PDF_FILAS_POR_PAGINA),
+        "segundos": round(duracion, 2),
+        "filas_por_seg": round(cantidad / duracion, 1),
+        "bytes": len(pdf),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    parser.add_argument("--interno", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        print(json.dumps(_medir(args.filas[0])))
+        return
+
+    for cantidad in args.filas:
+        # Utilidades.utils importa los modelos: se usa una base temporal para no tocar la del proyecto
+        with tempfile.TemporaryDirectory() as tmp:
+            entorno = dict(os.environ)
+            entorno["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            salida = subprocess.run(
+                [sys.executable, __file__, "--interno", "--filas", str(cantidad)],
+                cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True,
+            )
+        r = json.loads(salida.stdout.strip().splitlines()[-1])
+        print(f"{r['filas']:>7} filas  {r['paginas']:>5} páginas  {r['segundos']:>8} s  "
+              f"{r['filas_por_seg']:>8} filas/s  {r['bytes'] / 1e6:>7.1f} MB  (pico RSS {r['max_rss_mb']} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark de POST /turnos concurrentes con y sin los PRAGMAs de SQLite (WAL, synchronous=NORMAL, ...).
+
+Cada modo corre en un subproceso con su propia base temporal, porque la configuración del engine
+se lee al importar BaseDatos/database.py.
+
+Uso (desde la raíz del repo):
+    python Benchmarks/bench_pool.py --turnos 2000 --hilos 16
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _medir(turnos: int, hilos: int) -> dict:
+# Se ejecuta dentro del subproceso: crea personas y lanza los POST /turnos en paralelo.
+
+    sys.path.insert(0, RAIZ)
+    from fastapi.testclient import TestClient
+    import app as aplicacion
+    from BaseDatos.migraciones import migrar
+    from Utilidades.slots import SLOTS
+
+    migrar()
+    cliente = TestClient(aplicacion.app)
+    personas = max(1, hilos)
+    for i in range(personas):
+        cliente.post("/personas", json={
+            "nombre": f"Persona {i}",
+            "email": f"bench{i}@mail.com",
+            "dni": 90_000_000 + i,
+            "telefono": "1111",
+            "fecha_Nacimiento": "1990-01-01",
+        })
+
+    slots = SLOTS
+
+    inicio_fechas = date.today() + timedelta(days=1)
+    cuerpos = [
+        {
+            "fecha": (inicio_fechas + timedelta(days=i // len(slots))).isoformat(),
+            "hora": slots[i % len(slots)],
+            "persona_dni": 90_000_000 + (i % personas),
+        }
+        for i in range(turnos)
+    ]
+
+    def enviar(cuerpo):
+        return cliente.post("/turnos", json=cuerpo).status_code
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        codigos = list(pool.map(enviar, cuerpos))
+    duracion = time.perf_counter() - inicio
+
+    return {
+        "turnos": turnos,
+        "hilos": hilos,
+        "segundos": round(duracion, 3),
+        "req_por_seg": round(turnos / duracion, 1),
+        "creados": codigos.count(201),
+        "errores": len(codigos) - codigos.count(201),
+    }
+
+
+def _correr_modo(pragmas: bool, turnos: int, hilos: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        entorno = dict(os.environ)
+        entorno["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        entorno["SQLITE_PRAGMAS"] = "true" if pragmas else "false"
+        salida = subprocess.run(
+            [sys.executable, __file__, "--interno", "--turnos", str(turnos), "--hilos", str(hilos)],
+            cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True,
+        )
+        return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turnos", type=int, default=1000)
+    parser.add_argument("--hilos", type=int, default=16)
+    parser.add_argument("--interno", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        print(json.dumps(_medir(args.turnos, args.hilos)))
+        return
+
+    for nombre, pragmas in (("antes (rollback journal)", False), ("después (WAL + pragmas)", True)):
+        r = _correr_modo(pragmas, args.turnos, args.hilos)
+        print(f"{nombre:28s} {r['req_por_seg']:>8} req/s  "
+              f"({r['creados']} creados, {r['errores']} errores, {r['segundos']} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Micro-benchmark de la grilla de slots (Utilidades/slots.py) contra la implementación anterior: parseo y
+validación de horas de POST/PUT /turnos, paso de hora a texto en las respuestas y armado de los horarios
+libres de un día a partir de las filas ocupadas.
+
+Antes de medir comprueba que las dos implementaciones den los mismos resultados y los mismos errores (la
+anterior tenía fijos el paso de 30 minutos y los mensajes, así que la comparación vale con la grilla por defecto).
+No usa la base de datos.
+
+Uso (desde la raíz del repo):
+    python Benchmarks/bench_slots.py --numero 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+from datetime import date, datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Textos de prueba: la grilla completa, grafías alternativas y horas inválidas de cada tipo
+HORAS_INVALIDAS = ["09:15", "08:30", "17:00", "16:45", "25:00", "9-30", "", "hora"]
+HORAS_ALTERNATIVAS = ["9:00", "9:30"]
+
+
+def _implementacion_anterior(config):
+# Las funciones tal como estaban en Utilidades/utils.py y Utilidades/ocupacion.py antes de la grilla.
+
+    from fastapi import HTTPException
+
+    hora_modelo = config.HORA_MODELO
+    slot_start = datetime.strptime(config.SLOT_START, hora_modelo).time()
+    slot_end = datetime.strptime(config.SLOT_END, hora_modelo).time()
+    paso = config.SLOT_STEP_MIN
+
+    def validar_slot(hora):
+        if hora.minute not in (0, 30) or hora.second != 0 or hora.microsecond != 0:
+            raise HTTPException(status_code=422, detail="La hora debe ser cada 30 minutos (HH:00 o HH:30).")
+        ultimo_inicio = (datetime.combine(date.today(), slot_end) - timedelta(minutes=paso)).time()
+        if not (slot_start <= hora <= ultimo_inicio):
+            raise HTTPException(status_code=422, detail="Horario fuera de franja (09:00 a 16:30).")
+
+    def parsear_hora(hhmm):
+        try:
+            hora = datetime.strptime(hhmm, hora_modelo).time()
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Hora inválida, use formato HH:MM (por ejemplo 10:30).")
+        validar_slot(hora)
+        return hora
+
+    from Utilidades.slots import SLOTS
+    indice_slot = {s: i for i, s in enumerate(SLOTS)}
+
+    def horarios_libres(horas):
+        mascara = 0
+        for h in horas:
+            bit = indice_slot.get(h.strftime(hora_modelo))
+            if bit is not None:
+                mascara |= 1 << bit
+        return [s for i, s in enumerate(SLOTS) if not (mascara >> i) & 1]
+
+    def texto(hora):
+        return hora.strftime(hora_modelo)
+
+    return parsear_hora, texto, horarios_libres
+
+
+def _resultado(funcion, argumento):
+    from fastapi import HTTPException
+    try:
+        return funcion(argumento)
+    except HTTPException as e:
+        return ("error", e.status_code, e.detail)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--numero", type=int, default=100_000, help="Llamadas por medición")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Se informa la mejor")
+    args = parser.parse_args()
+
+    # Base temporal: Utilidades.utils importa BaseDatos.database, que crea el engine al importarse
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    sys.path.insert(0, RAIZ)
+
+    from Utilidades.configuracion import config
+    from Utilidades.utils import parsear_hora
+    from Utilidades.slots import SLOTS, HORAS, texto_hora
+    from Utilidades.ocupacion import mascara_de_horas, slots_libres
+
+    parsear_anterior, texto_anterior, libres_anterior = _implementacion_anterior(config)
+
+    def libres_actual(horas):
+        return slots_libres(mascara_de_horas(horas))
+
+    # Un día con la mitad de los slots ocupados, como los devuelve la consulta de disponibilidad
+    ocupadas = list(HORAS[::2])
+
+    textos = list(SLOTS) + HORAS_ALTERNATIVAS + HORAS_INVALIDAS
+    for t in textos:
+        anterior, actual = _resultado(parsear_anterior, t), _resultado(parsear_hora, t)
+        if anterior != actual:
+            raise SystemExit(f"parsear_hora({t!r}) difiere: antes {anterior}, ahora {actual}")
+    if [texto_anterior(h) for h in HORAS] != [texto_hora(h) for h in HORAS]:
+        raise SystemExit("texto_hora difiere de strftime")
+    if libres_anterior(ocupadas) != libres_actual(ocupadas):
+        raise SystemExit("los horarios libres difieren")
+    print(f"Grilla: {len(SLOTS)} slots ({SLOTS[0]} a {SLOTS[-1]}); resultados iguales en {len(textos)} textos\n")
+
+    valido, invalido, hora = "14:30", "14:15", HORAS[len(HORAS) // 2]
+    mediciones = [
+        ("parsear_hora válida", lambda: parsear_anterior(valido), lambda: parsear_hora(valido)),
+        ("parsear_hora inválida", lambda: _resultado(parsear_anterior, invalido), lambda: _resultado(parsear_hora, invalido)),
+        ("hora a texto", lambda: texto_anterior(hora), lambda: texto_hora(hora)),
+        ("horarios libres de un día", lambda: libres_anterior(ocupadas), lambda: libres_actual(ocupadas)),
+    ]
+
+    print(f"{'':28} {'antes':>12} {'ahora':>12} {'mejora':>8}")
+    for nombre, anterior, actual in mediciones:
+        t_anterior = min(timeit.repeat(anterior, number=args.numero, repeat=args.repeticiones)) / args.numero
+        t_actual = min(timeit.repeat(actual, number=args.numero, repeat=args.repeticiones)) / args.numero
+        print(f"{nombre:28} {t_anterior * 1e6:9.2f} µs {t_actual * 1e6:9.2f} µs {t_anterior / t_actual:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Datos sintéticos para los benchmarks: personas y turnos insertados en lotes con INSERT de Core (sin pasar por
+la sesión, así que las estadísticas diarias se reconstruyen aparte si hacen falta).
+
+El índice único parcial (un turno activo por fecha y hora) limita a 16 turnos activos por día, así que los
+turnos se reparten un día tras otro alrededor de hoy: 1M de turnos ocupan unos 170 años de agenda.
+"""
+import random
+from datetime import date, timedelta
+
+ESTADOS = ["pendiente", "confirmado", "asistido", "cancelado"]
+PESOS_ESTADOS = [30, 30, 20, 20]
+
+DNI_BASE = 20_000_000
+LOTE = 50_000
+
+
+def dni_sembrado(i: int) -> int:
+    return DNI_BASE + i
+
+
+def sembrar(engine, turnos: int, personas: int, semilla: int = 11) -> date:
+# Inserta `personas` (una de cada 10 inhabilitada) y `turnos` con estados al azar. Devuelve el primer día
+# libre después de los turnos sembrados.
+
+    from sqlalchemy import insert
+    from Modelos.models import Persona, Turno, EstadoTurno
+    from Utilidades.slots import HORAS
+
+    azar = random.Random(semilla)
+    horas = HORAS
+    nacimiento = date(1980, 1, 1)
+
+    with engine.begin() as conexion:
+        for inicio in range(0, personas, LOTE):
+            conexion.execute(insert(Persona), [
+                {"dni": dni_sembrado(i), "nombre": f"Persona {i}", "email": f"persona{i}@mail.com",
+                 "telefono": "1100000000", "fecha_Nacimiento": nacimiento, "habilitado": i % 10 != 0}
+                for i in range(inicio, min(inicio + LOTE, personas))
+            ])
+
+        primer_dia = date.today() - timedelta(days=turnos // len(horas) // 2)
+        lote = []
+        for i in range(turnos):
+            lote.append({
+                "fecha": primer_dia + timedelta(days=i // len(horas)),
+                "hora": horas[i % len(horas)],
+                "estado": EstadoTurno[azar.choices(ESTADOS, PESOS_ESTADOS)[0]],
+                "persona_id": azar.randint(1, personas),
+            })
+            if len(lote) == LOTE:
+                conexion.execute(insert(Turno), lote)
+                lote = []
+        if lote:
+            conexion.execute(insert(Turno), lote)
+
+    return primer_dia + timedelta(days=-(-turnos // len(horas)))
@@ -1,5 +1,5 @@
-from datetime import date
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 from Modelos.models import EstadoTurno
 
@@ -21,6 +21,17 @@ class PersonaUpdate(BaseModel):
 class PersonaOut(PersonaIn):
     edad: int
 
+class ImportacionErrorOut(BaseModel):
+    fila: int
+    detalle: str
+
+class ImportacionPersonasOut(BaseModel):
+    procesadas: int
+    creadas: int
+    rechazadas: int
+    errores: List[ImportacionErrorOut]
+    errores_omitidos: int
+
 class TurnoIn(BaseModel):
     fecha: date
     hora: str
@@ -40,6 +51,51 @@ class TurnoOut(BaseModel):
     estado: EstadoTurno
     persona_dni: int
 
+class TurnoBulkResultado(BaseModel):
+    indice: int
+    status_code: int
+    turno: Optional[TurnoOut] = None
+    error: Optional[str] = None
+
+class TurnosBulkOut(BaseModel):
+    creados: int
+    errores: int
+    resultados: List[TurnoBulkResultado]
+
+class TurnosLoteIn(BaseModel):
+    # ids, o bien fecha (y opcionalmente estado) para tomar todos los turnos del día
+    ids: Optional[List[int]] = None
+    fecha: Optional[date] = None
+    estado: Optional[EstadoTurno] = None
+
+class TurnoLoteResultado(BaseModel):
+    id: int
+    status_code: int
+    turno: Optional[TurnoOut] = None
+    error: Optional[str] = None
+
+class TurnosLoteOut(BaseModel):
+    actualizados: int
+    errores: int
+    resultados: List[TurnoLoteResultado]
+
 class TurnosDisponiblesOut(BaseModel):
     fecha: str
     horarios_disponibles: List[str]
+
+class TurnosDisponiblesRangoOut(BaseModel):
+    desde: str
+    hasta: str
+    dias: List[TurnosDisponiblesOut]
+
+class TrabajoReporteOut(BaseModel):
+    id: str
+    formato: str
+    reporte: str
+    parametros: Dict[str, Any]
+    estado: str
+    creado: datetime
+    terminado: Optional[datetime] = None
+    filas: Optional[int] = None
+    detalle: Optional[str] = None
+    descarga: Optional[str] = None
@@ -1,22 +1,20 @@
-from sqlalchemy import Column, Integer, String, Date, Boolean, Time, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Boolean, Time, Enum, ForeignKey, Index
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
-from BaseDatos.database import engine, Base
-from datetime import date
+from Utilidades.configuracion import config
+from Utilidades.edades import edad_en, edad_sql
+from BaseDatos.database import Base
 import enum
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
-
-ESTADO_TURNO_PENDIENTE: str = os.getenv("ESTADO_TURNO_PENDIENTE")
-ESTADO_TURNO_ASISTIDO: str = os.getenv("ESTADO_TURNO_ASISTIDO")
-ESTADO_TURNO_CONFIRMADO: str = os.getenv("ESTADO_TURNO_CONFIRMADO")
-ESTADO_TURNO_CANCELADO: str = os.getenv("ESTADO_TURNO_CANCELADO")
+ESTADO_TURNO_PENDIENTE: str = config.ESTADO_TURNO_PENDIENTE
+ESTADO_TURNO_ASISTIDO: str = config.ESTADO_TURNO_ASISTIDO
+ESTADO_TURNO_CONFIRMADO: str = config.ESTADO_TURNO_CONFIRMADO
+ESTADO_TURNO_CANCELADO: str = config.ESTADO_TURNO_CANCELADO
 
 class Persona(Base):
     __tablename__ = "personas"
 
-    id = Column(Integer, primary_key=True, autoincrement=True, index=True)  
+    id = Column(Integer, primary_key=True, autoincrement=True)
     dni = Column(Integer, unique=True, nullable=False, index=True)        
     nombre = Column(String, nullable=False)
     email = Column(String, unique=True, nullable=False)
@@ -27,33 +25,80 @@ class Persona(Base):
     # relación 1→N: una persona tiene muchos turnos
     turnos = relationship("Turno", back_populates="persona", cascade="all, delete")
 
-    @property
+    # En una instancia calcula la edad en Python; en una consulta (Persona.edad) es una expresión SQL que se
+    # puede seleccionar u ordenar. Para listados de muchas personas, Utilidades.edades.edades.
+    @hybrid_property
     def edad(self) -> int:
-        hoy = date.today()
-        edad = hoy.year - self.fecha_Nacimiento.year
-        if hoy.month < self.fecha_Nacimiento.month:
-            edad -= 1
-        elif hoy.month == self.fecha_Nacimiento.month and hoy.day < self.fecha_Nacimiento.day:
-            edad -= 1
-        return edad
+        return edad_en(self.fecha_Nacimiento)
+
+    @edad.inplace.expression
+    @classmethod
+    def _edad_expresion(cls):
+        return edad_sql(cls.fecha_Nacimiento)
 
 class EstadoTurno(str, enum.Enum):
     pendiente = ESTADO_TURNO_PENDIENTE
-    cancelado = ESTADO_TURNO_ASISTIDO
+    cancelado = ESTADO_TURNO_CANCELADO
     confirmado = ESTADO_TURNO_CONFIRMADO
-    asistido = ESTADO_TURNO_CANCELADO
+    asistido = ESTADO_TURNO_ASISTIDO
 
 class Turno(Base):
     __tablename__ = "turnos"
 
-    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
-    fecha = Column(Date, nullable=False, index=True)
-    hora = Column(Time, nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    fecha = Column(Date, nullable=False)
+    hora = Column(Time, nullable=False)
     estado = Column(Enum(EstadoTurno), nullable=False, default=EstadoTurno.pendiente)
-    persona_id = Column(Integer, ForeignKey("personas.id", ondelete="CASCADE"), nullable=False, index=True)
+    persona_id = Column(Integer, ForeignKey("personas.id", ondelete="CASCADE"), nullable=False)
 
     # relación N→1: cada turno pertenece a una persona
     persona = relationship("Persona", back_populates="turnos")
 
-# crea las tablas si no existen
-Base.metadata.create_all(bind=engine)
+class EstadisticaTurnoDiaria(Base):
+# Cantidad de turnos por persona, estado y día. Se actualiza en la misma transacción que los cambios
+# de turnos (Utilidades/estadisticas.py) para que los conteos no tengan que recorrer la tabla turnos.
+    __tablename__ = "estadisticas_turnos_diarias"
+
+    persona_id = Column(Integer, ForeignKey("personas.id", ondelete="CASCADE"), primary_key=True)
+    estado = Column(Enum(EstadoTurno), primary_key=True)
+    fecha = Column(Date, primary_key=True)
+    cantidad = Column(Integer, nullable=False, default=0)
+
+class VersionTabla(Base):
+# Versión de cada tabla, compartida por todos los procesos: la suma de los contadores de sus fragmentos. Cada
+# commit que escribe en una tabla incrementa uno de ellos en la misma transacción y las claves del cache de
+# reportes incluyen la suma (Utilidades/cache_reportes.py).
+    __tablename__ = "versiones_tablas"
+
+    tabla = Column(String, primary_key=True)
+    fragmento = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+# Filtros por rango de edad (Utilidades/edades.py comparan la fecha de nacimiento)
+Index("ix_personas_fecha_nacimiento", Persona.fecha_Nacimiento)
+
+# Para los resúmenes por día de un estado (p. ej. cancelados del mes)
+Index("ix_estadisticas_estado_fecha", EstadisticaTurnoDiaria.estado, EstadisticaTurnoDiaria.fecha)
+
+# Un solo turno activo (no cancelado) por fecha y hora: garantiza en la BD que no haya doble reserva
+IX_TURNO_ACTIVO_FECHA_HORA = "ux_turnos_fecha_hora_activos"
+
+Index(
+    IX_TURNO_ACTIVO_FECHA_HORA,
+    Turno.fecha,
+    Turno.hora,
+    unique=True,
+    sqlite_where=Turno.estado != EstadoTurno.cancelado,
+    postgresql_where=Turno.estado != EstadoTurno.cancelado,
+)
+
+# Índices compuestos con la forma de las consultas de turnos (ver Benchmarks/bench_indices.py):
+# listados y reportes por estado en un rango de fechas, ordenados por fecha y hora
+Index("ix_turnos_estado_fecha_hora", Turno.estado, Turno.fecha, Turno.hora)
+# turnos de una persona, con o sin estado, ordenados por fecha
+Index("ix_turnos_persona_estado_fecha_hora", Turno.persona_id, Turno.estado, Turno.fecha, Turno.hora)
+# paginación por cursor (fecha, hora, id) y turnos de un día
+Index("ix_turnos_fecha_hora_id", Turno.fecha, Turno.hora, Turno.id)
+
+
+# Las tablas e índices los crean y actualizan las migraciones versionadas (BaseDatos/migraciones.py)
@@ -0,0 +1,513 @@
+from datetime import date, time
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
+
+from Modelos.models import Persona, Turno, EstadoTurno
+from Esquemas.schemas import (PersonaIn, PersonaUpdate, PersonaOut,
+TurnoIn, TurnoUpdate, TurnoOut, TurnosDisponiblesOut,)
+from Utilidades.utils import (get_async_db, validar_email, parsear_hora, es_colision_horario,
+codificar_cursor, decodificar_cursor, PAGINACION_LIMITE_MAX)
+from Utilidades.slots import texto_hora
+from Utilidades.ocupacion import indice_ocupacion, mascara_de_horas, slots_libres, registrar_cambio_turno
+from Utilidades.cancelaciones import cancelaciones_recientes
+from Utilidades.edades import edades, filtros_edad, EDAD_MAXIMA
+
+# Versiones async de los endpoints de personas, turnos y disponibilidad (modo DB_ASYNC).
+# Mismas rutas, reglas y respuestas que Rutas/personas.py, Rutas/turnos.py y Rutas/disponibilidad.py;
+# crear_app (app.py) monta estas en lugar de las síncronas con la misma ruta y método.
+router_personas = APIRouter()
+router_turnos = APIRouter()
+router_disponibilidad = APIRouter()
+
+ROUTERS_ASYNC = {
+    "personas": router_personas,
+    "turnos": router_turnos,
+    "disponibilidad": router_disponibilidad,
+}
+
+
+def _persona_out(p: Persona, edad: Optional[int] = None) -> PersonaOut:
+    return PersonaOut(
+        nombre=p.nombre,
+        email=p.email,
+        dni=p.dni,
+        telefono=p.telefono,
+        fecha_Nacimiento=p.fecha_Nacimiento,
+        habilitado=p.habilitado,
+        edad=p.edad if edad is None else edad
+    )
+
+
+def _turno_out(t: Turno, persona_dni: int) -> TurnoOut:
+    return TurnoOut(
+        id=t.id,
+        fecha=t.fecha,
+        hora=texto_hora(t.hora),
+        estado=t.estado,
+        persona_dni=persona_dni
+    )
+
+
+async def _persona_por_dni(db: AsyncSession, dni: int) -> Optional[Persona]:
+    return await db.scalar(select(Persona).where(Persona.dni == dni))
+
+
+async def _turno_con_persona(db: AsyncSession, turno_id: int) -> Turno:
+# Busca un turno junto con su persona (en async no hay lazy load). Si no existe, lanza 404.
+
+    t = await db.get(Turno, turno_id, options=[joinedload(Turno.persona)])
+    if not t:
+        raise HTTPException(status_code=404, detail="Turno no encontrado")
+    return t
+
+
+# PERSONAS
+@router_personas.post("/personas", response_model=PersonaOut, status_code=status.HTTP_201_CREATED)
+async def crear_persona(datos: PersonaIn, db: AsyncSession = Depends(get_async_db)):
+    try:
+        validar_email(datos.email)
+
+        if await db.scalar(select(Persona.id).where(Persona.email == datos.email)):
+            raise HTTPException(status_code=409, detail="Email ya registrado")
+
+        if await db.scalar(select(Persona.id).where(Persona.dni == datos.dni)):
+            raise HTTPException(status_code=409, detail="DNI ya registrado")
+
+        p = Persona(
+            nombre=datos.nombre,
+            email=datos.email,
+            dni=datos.dni,
+            telefono=datos.telefono,
+            fecha_Nacimiento=datos.fecha_Nacimiento,
+            habilitado=datos.habilitado
+        )
+
+        db.add(p)
+        await db.commit()
+
+        return _persona_out(p)
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+@router_personas.get("/personas", response_model=List[PersonaOut])
+async def listar_personas(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=PAGINACION_LIMITE_MAX),
+    cursor: Optional[str] = None,
+    edad_min: Optional[int] = Query(None, ge=0, le=EDAD_MAXIMA),
+    edad_max: Optional[int] = Query(None, ge=0, le=EDAD_MAXIMA),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        if edad_min is not None and edad_max is not None and edad_min > edad_max:
+            raise HTTPException(status_code=400, detail="Rango de edad inválido: edad_min mayor que edad_max")
+
+        query = select(Persona).where(*filtros_edad(Persona.fecha_Nacimiento, edad_min, edad_max))
+
+        if cursor is not None:
+            (ultimo_id,) = decodificar_cursor(cursor, 1)
+            if not isinstance(ultimo_id, int):
+                raise HTTPException(status_code=400, detail="Cursor inválido")
+            query = query.where(Persona.id > ultimo_id)
+            limit = limit or PAGINACION_LIMITE_MAX
+
+        query = query.order_by(Persona.id.asc())
+        if limit is not None:
+            query = query.limit(limit + 1)
+
+        personas = (await db.scalars(query)).all()
+        if limit is not None and len(personas) > limit:
+            personas = personas[:limit]
+            response.headers["X-Next-Cursor"] = codificar_cursor([personas[-1].id])
+
+        return [_persona_out(p, edad) for p, edad in zip(personas, edades(p.fecha_Nacimiento for p in personas))]
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+@router_personas.get("/personas/{dni}", response_model=PersonaOut)
+async def obtener_persona(dni: int, db: AsyncSession = Depends(get_async_db)):
+    try:
+        p = await _persona_por_dni(db, dni)
+        if not p:
+            raise HTTPException(status_code=404, detail="Persona no encontrada")
+
+        return _persona_out(p)
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+@router_personas.put("/personas/{dni}", response_model=PersonaOut)
+async def actualizar_persona(dni: int, cambios: PersonaUpdate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        p = await _persona_por_dni(db, dni)
+        if not p:
+            raise HTTPException(status_code=404, detail="Persona no encontrada")
+
+        if cambios.nombre is not None:
+            p.nombre = cambios.nombre
+
+        if cambios.email is not None:
+            validar_email(cambios.email)
+
+            existe_otro = await db.scalar(
+                select(Persona.id).where(Persona.email == cambios.email, Persona.id != p.id)
+            )
+            if existe_otro:
+                raise HTTPException(status_code=409, detail="Email ya registrado por otra persona")
+
+            p.email = cambios.email
+
+        if cambios.telefono is not None:
+            p.telefono = cambios.telefono
+
+        if cambios.fecha_Nacimiento is not None:
+            p.fecha_Nacimiento = cambios.fecha_Nacimiento
+
+        if cambios.habilitado is not None:
+            p.habilitado = cambios.habilitado
+
+        await db.commit()
+
+        return _persona_out(p)
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+@router_personas.delete("/personas/{dni}", status_code=status.HTTP_204_NO_CONTENT)
+async def eliminar_persona(dni: int, db: AsyncSession = Depends(get_async_db)):
+    try:
+        # Se cargan los turnos de antemano para que el borrado en cascada no haga lazy load
+        p = await db.scalar(
+            select(Persona).options(selectinload(Persona.turnos)).where(Persona.dni == dni)
+        )
+        if not p:
+            raise HTTPException(status_code=404, detail="Persona no encontrada")
+
+        await db.delete(p)
+        await db.commit()
+
+        indice_ocupacion.invalidar()
+        return None
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error eliminando persona: {e}")
+    except Exception:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# TURNOS
+@router_turnos.post("/turnos", response_model=TurnoOut, status_code=status.HTTP_201_CREATED)
+async def crear_turno(datos: TurnoIn, db: AsyncSession = Depends(get_async_db)):
+    try:
+        persona = await _persona_por_dni(db, datos.persona_dni)
+        if not persona:
+            raise HTTPException(status_code=404, detail="Persona no encontrada")
+        if not persona.habilitado:
+            raise HTTPException(status_code=422, detail="La persona no está habilitada")
+
+        # Mismo helper que la ruta síncrona, corrido sobre la Session interna de la AsyncSession
+        cancelados = (await db.run_sync(cancelaciones_recientes, [persona.id]))[persona.id]
+
+        if cancelados >= 5:
+            raise HTTPException(status_code=422, detail="La persona tiene 5 o más cancelaciones recientes")
+
+        hora_ok = parsear_hora(datos.hora)
+
+        turno = Turno(
+            fecha=datos.fecha,
+            hora=hora_ok,
+            estado=datos.estado or EstadoTurno.pendiente,
+            persona_id=persona.id
+        )
+
+        db.add(turno)
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if es_colision_horario(e):
+                raise HTTPException(status_code=409, detail="Horario ocupado")
+            raise
+
+        registrar_cambio_turno(None, None, None, turno.fecha, turno.hora, turno.estado)
+
+        return _turno_out(turno, persona.dni)
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+@router_turnos.get("/turnos", response_model=List[TurnoOut])
+async def listar_turnos(
+    response: Response,
+    persona_dni: Optional[int] = None,
+    estado: Optional[EstadoTurno] = None,
+    fecha: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1, le=PAGINACION_LIMITE_MAX),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        query = select(Turno).join(Turno.persona).options(contains_eager(Turno.persona))
+
+        if persona_dni is not None:
+            query = query.where(Persona.dni == persona_dni)
+
+        if estado is not None:
+            query = query.where(Turno.estado == estado)
+
+        if fecha is not None:
+            query = query.where(Turno.fecha == fecha)
+
+        if cursor is not None:
+            c_fecha, c_hora, c_id = decodificar_cursor(cursor, 3)
+            try:
+                clave = (date.fromisoformat(c_fecha), time.fromisoformat(c_hora), int(c_id))
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Cursor inválido")
+            query = query.where(tuple_(Turno.fecha, Turno.hora, Turno.id) > clave)
+            limit = limit or PAGINACION_LIMITE_MAX
+
+        query = query.order_by(Turno.fecha.asc(), Turno.hora.asc(), Turno.id.asc())
+        if limit is not None:
+            query = query.limit(limit + 1)
+
+        turnos = (await db.scalars(query)).all()
+        if limit is not None and len(turnos) > limit:
+            turnos = turnos[:limit]
+            u = turnos[-1]
+            response.headers["X-Next-Cursor"] = codificar_cursor(
+                [u.fecha.isoformat(), u.hora.isoformat(), u.id]
+            )
+
+        return [_turno_out(t, t.persona.dni) for t in turnos]
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error consultando turnos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+@router_turnos.get("/turnos/{turno_id}", response_model=TurnoOut)
+async def obtener_turno(turno_id: int, db: AsyncSession = Depends(get_async_db)):
+    try:
+        turno = await _turno_con_persona(db, turno_id)
+        return _turno_out(turno, turno.persona.dni)
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error consultando turno: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+@router_turnos.put("/turnos/{turno_id}", response_model=TurnoOut)
+async def actualizar_turno(turno_id: int, cambios: TurnoUpdate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        t = await _turno_con_persona(db, turno_id)
+
+        if t.estado in (EstadoTurno.asistido, EstadoTurno.cancelado):
+            raise HTTPException(status_code=422, detail="No se puede editar un turno asistido o cancelado")
+
+        anterior = (t.fecha, t.hora, t.estado)
+        persona_dni = t.persona.dni
+        nueva_fecha = cambios.fecha or t.fecha
+        nueva_hora = t.hora
+
+        if cambios.hora is not None:
+            nueva_hora = parsear_hora(cambios.hora)
+
+        if cambios.persona_dni is not None:
+            p = await _persona_por_dni(db, cambios.persona_dni)
+            if not p:
+                raise HTTPException(status_code=404, detail="Persona destino no encontrada")
+            if not p.habilitado:
+                raise HTTPException(status_code=422, detail="La persona destino no está habilitada")
+            t.persona_id = p.id
+            persona_dni = p.dni
+
+        t.fecha = nueva_fecha
+        t.hora = nueva_hora
+
+        if cambios.estado is not None:
+            t.estado = cambios.estado
+
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if es_colision_horario(e):
+                raise HTTPException(status_code=409, detail="Horario ocupado")
+            raise
+
+        registrar_cambio_turno(*anterior, t.fecha, t.hora, t.estado)
+
+        return _turno_out(t, persona_dni)
+    except HTTPException:
+        await db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+@router_turnos.delete("/turnos/{turno_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def eliminar_turno(turno_id: int, db: AsyncSession = Depends(get_async_db)):
+    try:
+        t = await db.get(Turno, turno_id)
+        if not t:
+            raise HTTPException(status_code=404, detail="Turno no encontrado")
+
+        if t.estado == EstadoTurno.asistido:
+            raise HTTPException(status_code=422, detail="No se puede eliminar un turno asistido")
+
+        anterior = (t.fecha, t.hora, t.estado)
+        await db.delete(t)
+        await db.commit()
+
+        registrar_cambio_turno(*anterior, None, None, None)
+        return None
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# DISPONIBILIDAD
+@router_disponibilidad.get("/turnos-disponibles", response_model=TurnosDisponiblesOut)
+async def turnos_disponibles(fecha: date, db: AsyncSession = Depends(get_async_db)):
+    try:
+        mascara = indice_ocupacion.consultar(fecha)
+        if mascara is None:
+            generacion = indice_ocupacion.generacion
+            horas = await db.scalars(
+                select(Turno.hora).where(Turno.fecha == fecha, Turno.estado != EstadoTurno.cancelado)
+            )
+            mascara = mascara_de_horas(horas)
+            indice_ocupacion.guardar(fecha, mascara, generacion)
+
+        return {"fecha": fecha.isoformat(), "horarios_disponibles": slots_libres(mascara)}
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# GESTIÓN DE ESTADO
+@router_turnos.put("/turnos/{turno_id}/cancelar", response_model=TurnoOut)
+async def cancelar_turno(turno_id: int, db: AsyncSession = Depends(get_async_db)):
+    try:
+        t = await _turno_con_persona(db, turno_id)
+
+        if t.estado == EstadoTurno.asistido:
+            raise HTTPException(
+                status_code=422, detail="No se puede cancelar un turno asistido"
+            )
+
+        anterior = (t.fecha, t.hora, t.estado)
+        t.estado = EstadoTurno.cancelado
+        await db.commit()
+
+        registrar_cambio_turno(*anterior, t.fecha, t.hora, t.estado)
+
+        return _turno_out(t, t.persona.dni)
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+@router_turnos.put("/turnos/{turno_id}/confirmar", response_model=TurnoOut)
+async def confirmar_turno(turno_id: int, db: AsyncSession = Depends(get_async_db)):
+    try:
+        t = await _turno_con_persona(db, turno_id)
+
+        if t.estado in (EstadoTurno.asistido, EstadoTurno.cancelado):
+            raise HTTPException(
+                status_code=422,
+                detail="No se puede confirmar un turno asistido o cancelado",
+            )
+
+        anterior = (t.fecha, t.hora, t.estado)
+        t.estado = EstadoTurno.confirmado
+        await db.commit()
+
+        registrar_cambio_turno(*anterior, t.fecha, t.hora, t.estado)
+
+        return _turno_out(t, t.persona.dni)
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
@@ -0,0 +1,77 @@
+import json
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from Utilidades.configuracion import config
+from Esquemas.schemas import TurnosDisponiblesOut, TurnosDisponiblesRangoOut
+from Utilidades.utils import get_db
+from Utilidades.ocupacion import horarios_disponibles, disponibilidad_por_rango, DISPONIBILIDAD_MAX_DIAS
+from BaseDatos.database import SessionLocal
+
+UTF8: str = config.UTF8
+
+# Endpoints de disponibilidad (11 y el rango de fechas). app.py los monta con crear_app.
+router = APIRouter()
+
+
+# DISPONIBILIDAD
+# 11.
+@router.get("/turnos-disponibles", response_model=TurnosDisponiblesOut)
+def turnos_disponibles(fecha: date, db: Session = Depends(get_db)):
+    try:
+        disponibles = horarios_disponibles(db, fecha)
+
+        return {"fecha": fecha.isoformat(), "horarios_disponibles": disponibles}
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 11 bis.
+@router.get("/turnos-disponibles/rango", response_model=TurnosDisponiblesRangoOut)
+def turnos_disponibles_rango(desde: date, hasta: date, stream: bool = False, db: Session = Depends(get_db)):
+    try:
+        if desde > hasta:
+            raise HTTPException(
+                status_code=400,
+                detail="Rango inválido: 'desde' debe ser ≤ 'hasta'",
+            )
+        if (hasta - desde).days + 1 > DISPONIBILIDAD_MAX_DIAS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Rango inválido: máximo {DISPONIBILIDAD_MAX_DIAS} días",
+            )
+
+        if stream:
+            # NDJSON: una línea por día. Usa su propia sesión porque la respuesta se envía después del endpoint.
+            def generar():
+                sesion = SessionLocal()
+                try:
+                    for dia, libres in disponibilidad_por_rango(sesion, desde, hasta):
+                        linea = {"fecha": dia.isoformat(), "horarios_disponibles": libres}
+                        yield (json.dumps(linea) + "\n").encode(UTF8)
+                finally:
+                    sesion.close()
+
+            return StreamingResponse(generar(), media_type="application/x-ndjson")
+
+        dias = [
+            {"fecha": dia.isoformat(), "horarios_disponibles": libres}
+            for dia, libres in disponibilidad_por_rango(db, desde, hasta)
+        ]
+        return {"desde": desde.isoformat(), "hasta": hasta.isoformat(), "dias": dias}
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from Utilidades.metricas import registro_metricas
+
+# Métricas del proceso en formato de texto de Prometheus. crear_app (app.py) lo monta en toda app con METRICAS=true,
+# sin importar los grupos de APP_ROUTERS: cada worker expone las suyas.
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metricas():
+    return PlainTextResponse(registro_metricas.exponer(), media_type="text/plain; version=0.0.4")
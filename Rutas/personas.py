@@ -0,0 +1,269 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from Utilidades.configuracion import config
+from Modelos.models import Persona
+from Esquemas.schemas import PersonaIn, PersonaUpdate, PersonaOut, ImportacionPersonasOut
+from Utilidades.utils import (get_db, validar_email, codificar_cursor, decodificar_cursor,
+PAGINACION_LIMITE_MAX)
+from Utilidades.ocupacion import indice_ocupacion
+from Utilidades.edades import edades, filtros_edad, EDAD_MAXIMA
+from Utilidades.importacion import (ResultadoImportacion, filas_de_stream, guardar_chunk,
+IMPORT_CHUNK_FILAS, FORMATOS_IMPORTACION, TIPOS_IMPORTACION)
+
+UTF8: str = config.UTF8
+
+# Endpoints de personas (1 a 5 y la importación masiva). app.py los monta con crear_app.
+router = APIRouter()
+
+
+# PERSONAS
+# 1.
+@router.post("/personas", response_model=PersonaOut, status_code=status.HTTP_201_CREATED)
+def crear_persona(datos: PersonaIn, db: Session = Depends(get_db)):
+    try:
+        validar_email(datos.email)
+
+        if db.query(Persona).filter(Persona.email == datos.email).first():
+            raise HTTPException(status_code=409, detail="Email ya registrado")
+
+        if db.query(Persona).filter(Persona.dni == datos.dni).first():
+            raise HTTPException(status_code=409, detail="DNI ya registrado")
+
+        p = Persona(
+            nombre=datos.nombre,
+            email=datos.email,
+            dni=datos.dni,
+            telefono=datos.telefono,
+            fecha_Nacimiento=datos.fecha_Nacimiento,
+            habilitado=datos.habilitado
+        )
+
+        db.add(p)
+        db.commit()
+        db.refresh(p)
+
+        return PersonaOut(
+            nombre=p.nombre,
+            email=p.email,
+            dni=p.dni,
+            telefono=p.telefono,
+            fecha_Nacimiento=p.fecha_Nacimiento,
+            habilitado=p.habilitado,
+            edad=p.edad
+        )
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+# 1 bis.
+@router.post("/personas/importar", response_model=ImportacionPersonasOut)
+async def importar_personas(request: Request, formato: Optional[str] = None):
+    # El cuerpo se lee en streaming y se procesa por chunks de IMPORT_CHUNK_FILAS filas;
+    # cada chunk se guarda en el threadpool con su propia sesión.
+    try:
+        if formato is None:
+            # application/x-ndjson o text/csv; otro tipo (p. ej. application/json) termina en el 400 de abajo
+            tipo = request.headers.get("content-type", "").split(";")[0].strip().lower()
+            formato = TIPOS_IMPORTACION.get(tipo, tipo)
+        if formato not in FORMATOS_IMPORTACION:
+            raise HTTPException(status_code=400, detail="Formato inválido: use csv o ndjson")
+
+        resultado = ResultadoImportacion()
+        chunk = []
+        async for numero, datos, error in filas_de_stream(request.stream(), formato):
+            resultado.procesadas += 1
+            if error:
+                resultado.error(numero, error)
+                continue
+            chunk.append((numero, datos))
+            if len(chunk) >= IMPORT_CHUNK_FILAS:
+                await run_in_threadpool(guardar_chunk, chunk, resultado)
+                chunk = []
+
+        if chunk:
+            await run_in_threadpool(guardar_chunk, chunk, resultado)
+
+        return resultado.como_dict()
+
+    except HTTPException:
+        raise
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail=f"El archivo debe estar codificado en {UTF8}")
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+# 2.
+@router.get("/personas", response_model=List[PersonaOut])
+def listar_personas(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=PAGINACION_LIMITE_MAX),
+    cursor: Optional[str] = None,
+    edad_min: Optional[int] = Query(None, ge=0, le=EDAD_MAXIMA),
+    edad_max: Optional[int] = Query(None, ge=0, le=EDAD_MAXIMA),
+    db: Session = Depends(get_db),
+):
+    # Sin limit ni cursor devuelve todas las personas. Con limit pagina por id y, si hay más filas,
+    # devuelve el cursor de la página siguiente en el header X-Next-Cursor.
+    # edad_min / edad_max se filtran en la BD comparando la fecha de nacimiento.
+    try:
+        if edad_min is not None and edad_max is not None and edad_min > edad_max:
+            raise HTTPException(status_code=400, detail="Rango de edad inválido: edad_min mayor que edad_max")
+
+        query = db.query(Persona).filter(*filtros_edad(Persona.fecha_Nacimiento, edad_min, edad_max))
+
+        if cursor is not None:
+            (ultimo_id,) = decodificar_cursor(cursor, 1)
+            if not isinstance(ultimo_id, int):
+                raise HTTPException(status_code=400, detail="Cursor inválido")
+            query = query.filter(Persona.id > ultimo_id)
+            limit = limit or PAGINACION_LIMITE_MAX
+
+        query = query.order_by(Persona.id.asc())
+
+        if limit is None:
+            personas = query.all()
+        else:
+            personas = query.limit(limit + 1).all()
+            if len(personas) > limit:
+                personas = personas[:limit]
+                response.headers["X-Next-Cursor"] = codificar_cursor([personas[-1].id])
+
+        # Todas las edades de la página con una sola lectura de la fecha de hoy
+        return [
+            PersonaOut(
+                nombre=p.nombre,
+                email=p.email,
+                dni=p.dni,
+                telefono=p.telefono,
+                fecha_Nacimiento=p.fecha_Nacimiento,
+                habilitado=p.habilitado,
+                edad=edad
+            )
+            for p, edad in zip(personas, edades(p.fecha_Nacimiento for p in personas))
+        ]
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+# 3.
+@router.get("/personas/{dni}", response_model=PersonaOut)
+def obtener_persona(dni: int, db: Session = Depends(get_db)):
+    try:
+        p = db.query(Persona).filter(Persona.dni == dni).first()
+        if not p:
+            raise HTTPException(status_code=404, detail="Persona no encontrada")
+
+        return PersonaOut(
+            nombre=p.nombre,
+            email=p.email,
+            dni=p.dni,
+            telefono=p.telefono,
+            fecha_Nacimiento=p.fecha_Nacimiento,
+            habilitado=p.habilitado,
+            edad=p.edad
+        )
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+# 4.
+@router.put("/personas/{dni}", response_model=PersonaOut)
+def actualizar_persona(dni: int, cambios: PersonaUpdate, db: Session = Depends(get_db)):
+    try:
+        p = db.query(Persona).filter(Persona.dni == dni).first()
+        if not p:
+            raise HTTPException(status_code=404, detail="Persona no encontrada")
+
+        if cambios.nombre is not None:
+            p.nombre = cambios.nombre
+
+        if cambios.email is not None:
+            validar_email(cambios.email)
+
+            existe_otro = db.query(Persona).filter(
+                Persona.email == cambios.email,
+                Persona.id != p.id
+            ).first()
+            if existe_otro:
+                raise HTTPException(status_code=409, detail="Email ya registrado por otra persona")
+
+            p.email = cambios.email
+
+        if cambios.telefono is not None:
+            p.telefono = cambios.telefono
+
+        if cambios.fecha_Nacimiento is not None:
+            p.fecha_Nacimiento = cambios.fecha_Nacimiento
+
+        if cambios.habilitado is not None:
+            p.habilitado = cambios.habilitado
+
+        db.commit()
+        db.refresh(p)
+
+        return PersonaOut(
+            nombre=p.nombre,
+            email=p.email,
+            dni=p.dni,
+            telefono=p.telefono,
+            fecha_Nacimiento=p.fecha_Nacimiento,
+            habilitado=p.habilitado,
+            edad=p.edad
+        )
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+# 5.
+@router.delete("/personas/{dni}", status_code=status.HTTP_204_NO_CONTENT)
+def eliminar_persona(dni: int, db: Session = Depends(get_db)):
+    try:
+        p = db.query(Persona).filter(Persona.dni == dni).first()
+        if not p:
+            raise HTTPException(status_code=404, detail="Persona no encontrada")
+
+        db.delete(p)
+        db.commit()
+
+        # el borrado en cascada libera turnos de fechas arbitrarias
+        indice_ocupacion.invalidar()
+        return None
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error eliminando persona: {e}")
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
@@ -0,0 +1,511 @@
+import os
+from contextlib import asynccontextmanager
+from datetime import date
+from itertools import groupby
+from typing import Optional
+
+from dateutil.relativedelta import relativedelta
+from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi.responses import FileResponse
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from Utilidades.configuracion import config
+from Modelos.models import Persona, Turno, EstadoTurno, EstadisticaTurnoDiaria
+from Esquemas.schemas import TrabajoReporteOut
+from Utilidades.utils import get_db
+from Utilidades.slots import texto_hora
+from Utilidades.reportes import MEDIA_TYPES
+from Utilidades.trabajos import cola_reportes, responder_reporte, ESTADO_ERROR, ESTADO_TERMINADO
+from Utilidades.consultas import consulta_turnos
+
+MESES = config.MESES
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    # El pool de procesos de los reportes en segundo plano se cierra al apagar la app que monta este router
+    yield
+    cola_reportes.cerrar()
+
+# Endpoints de reportes JSON, CSV y PDF (14 a 31) y de los trabajos en segundo plano. Son los que más CPU y
+# memoria usan: con APP_ROUTERS se pueden servir desde workers propios, separados de personas y turnos.
+router = APIRouter(lifespan=ciclo_de_vida)
+
+
+# REPORTES
+# 14.
+@router.get("/reportes/turnos-por-fecha")
+def reportes_turnos_por_fecha(fecha: date, db: Session = Depends(get_db)):
+    try:
+        turnos = (
+            consulta_turnos(db)
+            .filter(Turno.fecha == fecha)
+            .order_by(Persona.nombre.asc(), Turno.hora.asc())
+            .all()
+        )
+
+        personas = []
+        persona_actual = None
+        lista_actual = None
+        for t in turnos:
+            clave = (t.persona.dni, t.persona.nombre)
+            if persona_actual != clave:
+                persona_actual = clave
+                lista_actual = []
+                personas.append(
+                    {"dni": clave[0], "nombre": clave[1], "turnos": lista_actual}
+                )
+            lista_actual.append(
+                {"id": t.id, "hora": texto_hora(t.hora), "estado": t.estado}
+            )
+
+        return {"fecha": fecha.isoformat(), "personas": personas}
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 15.
+@router.get("/reportes/turnos-por-persona")
+def reportes_turnos_por_persona(dni: int, db: Session = Depends(get_db)):
+    try:
+        persona = db.query(Persona).filter(Persona.dni == dni).first()
+        if not persona:
+            raise HTTPException(status_code=404, detail="Persona no encontrada")
+
+        turnos = (
+            db.query(Turno)
+            .filter(Turno.persona_id == persona.id)
+            .order_by(Turno.fecha.desc(), Turno.hora.desc())
+            .all()
+        )
+
+        resultado = []
+        for t in turnos:
+            resultado.append(
+                {
+                    "id": t.id,
+                    "fecha": t.fecha,
+                    "hora": texto_hora(t.hora),
+                    "estado": t.estado,
+                }
+            )
+
+        return {"persona": {"dni": persona.dni, "nombre": persona.nombre}, "turnos": resultado}
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 16.
+@router.get("/reportes/turnos-cancelados-por-mes")
+def reportes_cancelados_mes(db: Session = Depends(get_db)):
+    try:
+        hoy = date.today()
+        inicio = hoy.replace(day=1)
+        fin = inicio + relativedelta(months=1)
+
+        turnos = (
+            consulta_turnos(db)
+            .filter(
+                Turno.estado == EstadoTurno.cancelado,
+                Turno.fecha >= inicio,
+                Turno.fecha < fin,
+            )
+            .order_by(Turno.fecha.asc(), Turno.hora.asc())
+            .all()
+        )
+
+        resumen_rows = (
+            db.query(EstadisticaTurnoDiaria.fecha, func.sum(EstadisticaTurnoDiaria.cantidad))
+            .filter(
+                EstadisticaTurnoDiaria.estado == EstadoTurno.cancelado,
+                EstadisticaTurnoDiaria.fecha >= inicio,
+                EstadisticaTurnoDiaria.fecha < fin,
+                EstadisticaTurnoDiaria.cantidad > 0,
+            )
+            .group_by(EstadisticaTurnoDiaria.fecha)
+            .order_by(EstadisticaTurnoDiaria.fecha.asc())
+            .all()
+        )
+        resumen = [{"fecha": f, "cantidad": c} for (f, c) in resumen_rows]
+
+        if len(MESES) != 12:
+            raise RuntimeError("La variable de entorno MESES debe contener 12 meses")
+        
+        mes = MESES[hoy.month - 1]
+
+        return {
+            "anio": hoy.year,
+            "mes": mes,
+            "cantidad": len(turnos),
+            "resumen_por_fecha": resumen,
+            "turnos": [
+                {
+                    "id": t.id,
+                    "persona_dni": t.persona.dni,
+                    "fecha": t.fecha,
+                    "hora": texto_hora(t.hora),
+                    "estado": t.estado,
+                }
+                for t in turnos
+            ],
+        }
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 17.
+@router.get("/reportes/turnos-cancelados")
+def reportes_personas_con_cancelados(min: int = 5, db: Session = Depends(get_db)):
+    try:
+        # Una sola sentencia: los cancelados (con su persona) de quienes superan el mínimo.
+        # Quiénes superan el mínimo sale de las estadísticas diarias; el conteo por persona, de agrupar en Python.
+        con_minimo = (
+            db.query(EstadisticaTurnoDiaria.persona_id)
+            .filter(EstadisticaTurnoDiaria.estado == EstadoTurno.cancelado, EstadisticaTurnoDiaria.cantidad > 0)
+            .group_by(EstadisticaTurnoDiaria.persona_id)
+            .having(func.sum(EstadisticaTurnoDiaria.cantidad) >= min)
+            .subquery()
+        )
+        turnos = (
+            consulta_turnos(db)
+            .join(con_minimo, con_minimo.c.persona_id == Turno.persona_id)
+            .filter(Turno.estado == EstadoTurno.cancelado)
+            .order_by(Turno.persona_id.asc(), Turno.fecha.desc(), Turno.hora.desc())
+            .all()
+        )
+
+        salida = []
+        for _, grupo in groupby(turnos, key=lambda t: t.persona_id):
+            t_list = list(grupo)
+            p = t_list[0].persona
+
+            salida.append(
+                {
+                    "persona": {"dni": p.dni, "nombre": p.nombre},
+                    "cancelados": len(t_list),
+                    "turnos": [
+                        {
+                            "id": t.id,
+                            "fecha": t.fecha,
+                            "hora": texto_hora(t.hora),
+                            "estado": t.estado,
+                        }
+                        for t in t_list
+                    ],
+                }
+            )
+
+        return {"min_cancelados": min, "personas": salida}
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 18.
+@router.get("/reportes/turnos-confirmados")
+def reportes_turnos_confirmados(
+    desde: date,
+    hasta: date,
+    tamanio: int,
+    pagina: int,
+    db: Session = Depends(get_db),
+):
+    try:
+        if desde > hasta:
+            raise HTTPException(
+                status_code=400,
+                detail="Rango inválido: 'desde' debe ser ≤ 'hasta'",
+            )
+
+        if pagina < 1:
+            pagina = 1
+
+        q = (
+            consulta_turnos(db)
+            .filter(
+                Turno.estado == EstadoTurno.confirmado,
+                Turno.fecha >= desde,
+                Turno.fecha <= hasta,
+            )
+            .order_by(Turno.fecha.asc(), Turno.hora.asc())
+        )
+        total = q.count()
+        items = q.offset((pagina - 1) * tamanio).limit(tamanio).all()
+
+        salida = [
+            {
+                "id": t.id,
+                "fecha": t.fecha,
+                "hora": texto_hora(t.hora),
+                "persona_dni": t.persona.dni,
+            }
+            for t in items
+        ]
+        total_paginas = (total + tamanio - 1) // tamanio
+
+        return {
+            "desde": desde.isoformat(),
+            "hasta": hasta.isoformat(),
+            "pagina": pagina,
+            "tamaño": tamanio,
+            "total": total,
+            "Total Paginas": total_paginas,
+            "items": salida,
+        }
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 19.
+@router.get("/reportes/estado-personas")
+def reportes_estado_personas(habilitada: bool, db: Session = Depends(get_db)):
+    try:
+        personas = (
+            db.query(Persona)
+            .filter(Persona.habilitado == habilitada)
+            .order_by(Persona.id.asc())
+            .all()
+        )
+
+        salida = [
+            {
+                "dni": p.dni,
+                "nombre": p.nombre,
+                "email": p.email,
+                "telefono": p.telefono,
+                "habilitado": p.habilitado,
+            }
+            for p in personas
+        ]
+
+        return {"habilitada": habilitada, "personas": salida}
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# =====================================================
+# REPORTES CSV (punto G)
+# =====================================================
+
+# 20 GET /reportes/csv/turnos-por-fecha?fecha=YYYY-MM-DD
+@router.get("/reportes/csv/turnos-por-fecha")
+def csv_turnos_por_fecha(fecha: date, asincrono: bool = False, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        return responder_reporte("csv", "turnos-por-fecha", db, asincrono, if_none_match, fecha=fecha)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 21 GET /reportes/csv/turnos-cancelados-por-mes
+@router.get("/reportes/csv/turnos-cancelados-por-mes")
+def csv_turnos_cancelados_por_mes(asincrono: bool = False, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        return responder_reporte("csv", "turnos-cancelados-por-mes", db, asincrono, if_none_match)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 22 GET /reportes/csv/turnos-por-persona?dni=12345678
+@router.get("/reportes/csv/turnos-por-persona")
+def csv_turnos_por_persona(dni: int, asincrono: bool = False, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        return responder_reporte("csv", "turnos-por-persona", db, asincrono, if_none_match, dni=dni)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 23 GET /reportes/csv/turnos-cancelados?min=5
+@router.get("/reportes/csv/turnos-cancelados")
+def csv_turnos_cancelados_por_persona(min: int = 5, asincrono: bool = False, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        return responder_reporte("csv", "turnos-cancelados", db, asincrono, if_none_match, min=min)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 24 GET /reportes/csv/turnos-confirmados?desde=YYYY-MM-DD&hasta=YYYY-MM-DD
+@router.get("/reportes/csv/turnos-confirmados")
+def csv_turnos_confirmados(desde: date, hasta: date, asincrono: bool = False, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        return responder_reporte("csv", "turnos-confirmados", db, asincrono, if_none_match, desde=desde, hasta=hasta)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 25 GET /reportes/csv/estado-personas?habilitada=true/false
+@router.get("/reportes/csv/estado-personas")
+def csv_estado_personas(habilitada: bool, asincrono: bool = False, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        return responder_reporte("csv", "estado-personas", db, asincrono, if_none_match, habilitada=habilitada)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# =====================================================
+# REPORTES PDF (punto F)
+# =====================================================
+
+# 26
+@router.get("/reportes/pdf/turnos-por-fecha")
+def pdf_turnos_por_fecha(fecha: date, asincrono: bool = False, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        return responder_reporte("pdf", "turnos-por-fecha", db, asincrono, if_none_match, fecha=fecha)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 27
+@router.get("/reportes/pdf/turnos-cancelados-por-mes")
+def pdf_turnos_cancelados_por_mes(asincrono: bool = False, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        return responder_reporte("pdf", "turnos-cancelados-por-mes", db, asincrono, if_none_match)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 28
+@router.get("/reportes/pdf/turnos-por-persona")
+def pdf_turnos_por_persona(dni: int, asincrono: bool = False, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        return responder_reporte("pdf", "turnos-por-persona", db, asincrono, if_none_match, dni=dni)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 29
+@router.get("/reportes/pdf/turnos-cancelados")
+def pdf_turnos_cancelados_por_persona(min: int = 5, asincrono: bool = False, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        return responder_reporte("pdf", "turnos-cancelados", db, asincrono, if_none_match, min=min)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 30
+@router.get("/reportes/pdf/turnos-confirmados")
+def pdf_turnos_confirmados(desde: date, hasta: date, tamanio: int, pagina: int, asincrono: bool = False, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        return responder_reporte("pdf", "turnos-confirmados", db, asincrono, if_none_match, desde=desde, hasta=hasta, tamanio=tamanio, pagina=pagina)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 31
+@router.get("/reportes/pdf/estado-personas")
+def pdf_estado_personas(habilitada: bool, asincrono: bool = False, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    try:
+        return responder_reporte("pdf", "estado-personas", db, asincrono, if_none_match, habilitada=habilitada)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# =====================================================
+# REPORTES EN SEGUNDO PLANO
+# =====================================================
+# Los endpoints 20 a 31 con ?asincrono=true encolan el reporte (202 + id de trabajo) y lo genera un proceso
+# del pool de Utilidades/trabajos.py en REPORT_CSV_DIR / REPORT_PDF_DIR, junto con el estado del trabajo (<id>.json)
+# que leen los endpoints 32 y 33 en cualquier worker.
+
+# 32 GET /reportes/trabajos/{trabajo_id}
+@router.get("/reportes/trabajos/{trabajo_id}", response_model=TrabajoReporteOut)
+def estado_trabajo_reporte(trabajo_id: str):
+    trabajo = cola_reportes.obtener(trabajo_id)
+    if not trabajo:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return trabajo.como_dict()
+
+
+# 33 GET /reportes/trabajos/{trabajo_id}/archivo
+@router.get("/reportes/trabajos/{trabajo_id}/archivo")
+def descargar_trabajo_reporte(trabajo_id: str):
+    trabajo = cola_reportes.obtener(trabajo_id)
+    if not trabajo:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+
+    if trabajo.estado == ESTADO_ERROR:
+        raise HTTPException(status_code=trabajo.status_code, detail=trabajo.detalle)
+    if trabajo.estado != ESTADO_TERMINADO:
+        raise HTTPException(status_code=409, detail="El reporte todavía no está listo")
+    if not os.path.exists(trabajo.ruta):
+        raise HTTPException(status_code=404, detail="El archivo del reporte ya no está disponible")
+
+    return FileResponse(trabajo.ruta, media_type=MEDIA_TYPES[trabajo.formato], filename=trabajo.archivo)
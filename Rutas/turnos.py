@@ -0,0 +1,568 @@
+from collections import Counter
+from datetime import date, time
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.orm import Session
+
+from Utilidades.configuracion import config
+from Modelos.models import Persona, Turno, EstadoTurno
+from Esquemas.schemas import (TurnoIn, TurnoUpdate, TurnoOut, TurnoBulkResultado, TurnosBulkOut, TurnosLoteIn,
+TurnoLoteResultado, TurnosLoteOut)
+from Utilidades.utils import (get_db, parsear_hora, es_colision_horario, codificar_cursor, decodificar_cursor,
+PAGINACION_LIMITE_MAX)
+from Utilidades.slots import texto_hora
+from Utilidades.estadisticas import aplicar_deltas, deltas_de_filas
+from Utilidades.cancelaciones import cancelaciones_recientes
+from Utilidades.consultas import consulta_turnos, turno_con_persona_o_404, filtrar_por_dni
+from Utilidades.ocupacion import registrar_cambio_turno
+
+TURNOS_BULK_MAX = config.TURNOS_BULK_MAX
+
+# Endpoints de turnos (6 a 10, alta masiva y gestión de estado 12 y 13, por turno o en lote). app.py los monta con crear_app.
+router = APIRouter()
+
+
+# TURNOS
+# 6.
+@router.post("/turnos", response_model=TurnoOut, status_code=status.HTTP_201_CREATED)
+def crear_turno(datos: TurnoIn, db: Session = Depends(get_db)):
+    try:
+        persona = db.query(Persona).filter(Persona.dni == datos.persona_dni).first()
+        if not persona:
+            raise HTTPException(status_code=404, detail="Persona no encontrada")
+        if not persona.habilitado:
+            raise HTTPException(status_code=422, detail="La persona no está habilitada")
+
+        # Una consulta por rango sobre las estadísticas diarias (compartidas por todos los workers)
+        cancelados = cancelaciones_recientes(db, [persona.id])[persona.id]
+
+        if cancelados >= 5:
+            raise HTTPException(status_code=422, detail="La persona tiene 5 o más cancelaciones recientes")
+
+        hora_ok = parsear_hora(datos.hora)
+
+        turno = Turno(
+            fecha=datos.fecha,
+            hora=hora_ok,
+            estado=datos.estado or EstadoTurno.pendiente,
+            persona_id=persona.id
+        )
+
+        # La colisión de fecha y hora la detecta el índice único parcial al insertar
+        db.add(turno)
+        try:
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            if es_colision_horario(e):
+                raise HTTPException(status_code=409, detail="Horario ocupado")
+            raise
+        db.refresh(turno)
+
+        registrar_cambio_turno(None, None, None, turno.fecha, turno.hora, turno.estado)
+
+        return TurnoOut(
+            id=turno.id,
+            fecha=turno.fecha,
+            hora=texto_hora(turno.hora),
+            estado=turno.estado,
+            persona_dni=persona.dni
+        )
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+# 6 bis.
+@router.post("/turnos/bulk", response_model=TurnosBulkOut)
+def crear_turnos_bulk(datos: List[TurnoIn], db: Session = Depends(get_db)):
+    try:
+        if len(datos) > TURNOS_BULK_MAX:
+            raise HTTPException(status_code=413, detail=f"Máximo {TURNOS_BULK_MAX} turnos por pedido")
+
+        resultados: List[Optional[TurnoBulkResultado]] = [None] * len(datos)
+        if not datos:
+            return TurnosBulkOut(creados=0, errores=0, resultados=[])
+
+        # Personas: una sola consulta IN
+        dnis = {d.persona_dni for d in datos}
+        personas = {p.dni: p for p in db.query(Persona).filter(Persona.dni.in_(dnis)).all()}
+
+        # Cancelaciones de los últimos 6 meses: una sola consulta agrupada sobre las estadísticas diarias
+        cancelados = cancelaciones_recientes(db, [p.id for p in personas.values()])
+
+        # Slots ocupados de todas las fechas del pedido: una sola consulta
+        fechas = {d.fecha for d in datos}
+        ocupados = set(
+            db.query(Turno.fecha, Turno.hora)
+            .filter(Turno.fecha.in_(fechas), Turno.estado != EstadoTurno.cancelado)
+            .all()
+        )
+
+        filas = []
+        posiciones = []
+        for i, d in enumerate(datos):
+            try:
+                persona = personas.get(d.persona_dni)
+                if not persona:
+                    raise HTTPException(status_code=404, detail="Persona no encontrada")
+                if not persona.habilitado:
+                    raise HTTPException(status_code=422, detail="La persona no está habilitada")
+                if cancelados.get(persona.id, 0) >= 5:
+                    raise HTTPException(status_code=422, detail="La persona tiene 5 o más cancelaciones recientes")
+
+                hora_ok = parsear_hora(d.hora)
+                estado = d.estado or EstadoTurno.pendiente
+                if estado != EstadoTurno.cancelado:
+                    # también detecta colisiones entre ítems del mismo pedido
+                    if (d.fecha, hora_ok) in ocupados:
+                        raise HTTPException(status_code=409, detail="Horario ocupado")
+                    ocupados.add((d.fecha, hora_ok))
+
+            except HTTPException as e:
+                resultados[i] = TurnoBulkResultado(indice=i, status_code=e.status_code, error=e.detail)
+                continue
+
+            filas.append({"fecha": d.fecha, "hora": hora_ok, "estado": estado, "persona_id": persona.id})
+            posiciones.append(i)
+
+        if filas:
+            # Un único INSERT multi-fila en la misma transacción. Si otro request ocupó un slot
+            # entretanto, el índice único lo rechaza y se informa 409 para todo el lote.
+            try:
+                ids = db.execute(
+                    insert(Turno).returning(Turno.id, sort_by_parameter_order=True), filas
+                ).scalars().all()
+                # el insert core no pasa por el flush del ORM: las estadísticas se suman a mano
+                aplicar_deltas(db, deltas_de_filas(filas))
+                db.commit()
+            except IntegrityError as e:
+                db.rollback()
+                if not es_colision_horario(e):
+                    raise
+                for i in posiciones:
+                    resultados[i] = TurnoBulkResultado(
+                        indice=i, status_code=409,
+                        error="Horario ocupado por otro pedido concurrente, reintente",
+                    )
+                ids = []
+
+            for i, fila, turno_id in zip(posiciones, filas, ids):
+                registrar_cambio_turno(None, None, None, fila["fecha"], fila["hora"], fila["estado"])
+                resultados[i] = TurnoBulkResultado(
+                    indice=i,
+                    status_code=status.HTTP_201_CREATED,
+                    turno=TurnoOut(
+                        id=turno_id,
+                        fecha=fila["fecha"],
+                        hora=texto_hora(fila["hora"]),
+                        estado=fila["estado"],
+                        persona_dni=datos[i].persona_dni,
+                    ),
+                )
+
+        creados = sum(1 for r in resultados if r.turno is not None)
+        return TurnosBulkOut(creados=creados, errores=len(resultados) - creados, resultados=resultados)
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+# 7.
+@router.get("/turnos", response_model=List[TurnoOut])
+def listar_turnos(
+    response: Response,
+    persona_dni: Optional[int] = None,
+    estado: Optional[EstadoTurno] = None,
+    fecha: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1, le=PAGINACION_LIMITE_MAX),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    # Pagina por (fecha, hora, id) igual que GET /personas: cursor opaco en X-Next-Cursor.
+    try:
+        query = consulta_turnos(db)
+
+        if persona_dni is not None:
+            query = filtrar_por_dni(query, persona_dni)
+
+        if estado is not None:
+            query = query.filter(Turno.estado == estado)
+
+        if fecha is not None:
+            query = query.filter(Turno.fecha == fecha)
+
+        if cursor is not None:
+            c_fecha, c_hora, c_id = decodificar_cursor(cursor, 3)
+            try:
+                clave = (date.fromisoformat(c_fecha), time.fromisoformat(c_hora), int(c_id))
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Cursor inválido")
+            query = query.filter(tuple_(Turno.fecha, Turno.hora, Turno.id) > clave)
+            limit = limit or PAGINACION_LIMITE_MAX
+
+        query = query.order_by(Turno.fecha.asc(), Turno.hora.asc(), Turno.id.asc())
+
+        if limit is None:
+            turnos = query.all()
+        else:
+            turnos = query.limit(limit + 1).all()
+            if len(turnos) > limit:
+                turnos = turnos[:limit]
+                u = turnos[-1]
+                response.headers["X-Next-Cursor"] = codificar_cursor(
+                    [u.fecha.isoformat(), u.hora.isoformat(), u.id]
+                )
+
+        return [
+            TurnoOut(
+                id=t.id,
+                fecha=t.fecha,
+                hora=texto_hora(t.hora),
+                estado=t.estado,
+                persona_dni=t.persona.dni
+            )
+            for t in turnos
+        ]
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error consultando turnos: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+# 8.
+@router.get("/turnos/{turno_id}", response_model=TurnoOut)
+def obtener_turno(turno_id: int, db: Session = Depends(get_db)):
+    try:
+        turno = turno_con_persona_o_404(db, turno_id)
+
+        return TurnoOut(
+            id=turno.id,
+            fecha=turno.fecha,
+            hora=texto_hora(turno.hora),
+            estado=turno.estado,
+            persona_dni=turno.persona.dni
+        )
+
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error consultando turno: {e}")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+# 9.
+@router.put("/turnos/{turno_id}", response_model=TurnoOut)
+def actualizar_turno(turno_id: int, cambios: TurnoUpdate, db: Session = Depends(get_db)):
+    try:
+        t = turno_con_persona_o_404(db, turno_id)
+
+        if t.estado in (EstadoTurno.asistido, EstadoTurno.cancelado):
+            raise HTTPException(status_code=422, detail="No se puede editar un turno asistido o cancelado")
+
+        anterior = (t.fecha, t.hora, t.estado)
+        persona_dni = t.persona.dni
+        nueva_fecha = cambios.fecha or t.fecha
+        nueva_hora = t.hora
+
+        if cambios.hora is not None:
+            nueva_hora = parsear_hora(cambios.hora)
+
+        if cambios.persona_dni is not None:
+            p = db.query(Persona).filter(Persona.dni == cambios.persona_dni).first()
+            if not p:
+                raise HTTPException(status_code=404, detail="Persona destino no encontrada")
+            if not p.habilitado:
+                raise HTTPException(status_code=422, detail="La persona destino no está habilitada")
+            t.persona_id = p.id
+            persona_dni = p.dni
+
+        t.fecha = nueva_fecha
+        t.hora = nueva_hora
+
+        if cambios.estado is not None:
+            t.estado = cambios.estado
+
+        # Si cambió fecha u hora, la colisión la detecta el índice único parcial
+        try:
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            if es_colision_horario(e):
+                raise HTTPException(status_code=409, detail="Horario ocupado")
+            raise
+        db.refresh(t)
+
+        registrar_cambio_turno(*anterior, t.fecha, t.hora, t.estado)
+
+        return TurnoOut(
+            id=t.id,
+            fecha=t.fecha,
+            hora=texto_hora(t.hora),
+            estado=t.estado,
+            persona_dni=persona_dni
+        )
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+# 10.
+@router.delete("/turnos/{turno_id}", status_code=status.HTTP_204_NO_CONTENT)
+def eliminar_turno(turno_id: int, db: Session = Depends(get_db)):
+    try:
+        t = db.get(Turno, turno_id)
+        if not t:
+            raise HTTPException(status_code=404, detail="Turno no encontrado")
+
+        if t.estado == EstadoTurno.asistido:
+            raise HTTPException(status_code=422, detail="No se puede eliminar un turno asistido")
+
+        anterior = (t.fecha, t.hora, t.estado)
+        db.delete(t)
+        db.commit()
+
+        registrar_cambio_turno(*anterior, None, None, None)
+        return None
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# GESTIÓN DE ESTADO
+# 12.
+@router.put("/turnos/{turno_id}/cancelar", response_model=TurnoOut)
+def cancelar_turno(turno_id: int, db: Session = Depends(get_db)):
+    try:
+        t = turno_con_persona_o_404(db, turno_id)
+
+        if t.estado == EstadoTurno.asistido:
+            raise HTTPException(
+                status_code=422, detail="No se puede cancelar un turno asistido"
+            )
+
+        anterior = (t.fecha, t.hora, t.estado)
+        persona_dni = t.persona.dni
+        t.estado = EstadoTurno.cancelado
+        db.commit()
+        db.refresh(t)
+
+        registrar_cambio_turno(*anterior, t.fecha, t.hora, t.estado)
+
+        return TurnoOut(
+            id=t.id,
+            fecha=t.fecha,
+            hora=texto_hora(t.hora),
+            estado=t.estado,
+            persona_dni=persona_dni,
+        )
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 13.
+@router.put("/turnos/{turno_id}/confirmar", response_model=TurnoOut)
+def confirmar_turno(turno_id: int, db: Session = Depends(get_db)):
+    try:
+        t = turno_con_persona_o_404(db, turno_id)
+
+        if t.estado in (EstadoTurno.asistido, EstadoTurno.cancelado):
+            raise HTTPException(
+                status_code=422,
+                detail="No se puede confirmar un turno asistido o cancelado",
+            )
+
+        anterior = (t.fecha, t.hora, t.estado)
+        persona_dni = t.persona.dni
+        t.estado = EstadoTurno.confirmado
+        db.commit()
+        db.refresh(t)
+
+        registrar_cambio_turno(*anterior, t.fecha, t.hora, t.estado)
+
+        return TurnoOut(
+            id=t.id,
+            fecha=t.fecha,
+            hora=texto_hora(t.hora),
+            estado=t.estado,
+            persona_dni=persona_dni,
+        )
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# GESTIÓN DE ESTADO EN LOTE
+def _cambiar_estado_lote(
+    db: Session,
+    datos: TurnosLoteIn,
+    nuevo: EstadoTurno,
+    no_permitidos: tuple,
+    error_no_permitido: str,
+) -> TurnosLoteOut:
+# Aplica `nuevo` a los turnos indicados por ids o por (fecha, estado) con un SELECT para validar cada uno y un
+# único UPDATE ... WHERE (id, estado) IN (...). El estado leído va en el WHERE: si otro pedido cambió un turno
+# entretanto, ese turno no se actualiza y se informa 409. Devuelve un resultado por id.
+
+    if (datos.ids is None) == (datos.fecha is None):
+        raise HTTPException(status_code=422, detail="Indicar ids o fecha (con estado opcional), no ambos")
+    if datos.estado is not None and datos.fecha is None:
+        raise HTTPException(status_code=422, detail="El filtro por estado requiere fecha")
+
+    consulta = select(Turno.id, Turno.fecha, Turno.hora, Turno.estado, Turno.persona_id, Persona.dni).join(
+        Turno.persona
+    )
+    if datos.ids is not None:
+        ids = list(dict.fromkeys(datos.ids))
+        if len(ids) > TURNOS_BULK_MAX:
+            raise HTTPException(status_code=413, detail=f"Máximo {TURNOS_BULK_MAX} turnos por pedido")
+        consulta = consulta.where(Turno.id.in_(ids))
+    else:
+        consulta = consulta.where(Turno.fecha == datos.fecha)
+        if datos.estado is not None:
+            consulta = consulta.where(Turno.estado == datos.estado)
+        consulta = consulta.order_by(Turno.hora.asc(), Turno.id.asc())
+
+    filas = {fila.id: fila for fila in db.execute(consulta)}
+    if datos.ids is None:
+        ids = list(filas)
+
+    resultados = {}
+    a_cambiar = []
+    for turno_id in ids:
+        fila = filas.get(turno_id)
+        if fila is None:
+            resultados[turno_id] = TurnoLoteResultado(id=turno_id, status_code=404, error="Turno no encontrado")
+        elif fila.estado in no_permitidos:
+            resultados[turno_id] = TurnoLoteResultado(id=turno_id, status_code=422, error=error_no_permitido)
+        elif fila.estado != nuevo:
+            a_cambiar.append(fila)
+
+    cambiados = set()
+    if a_cambiar:
+        cambiados = set(db.execute(
+            update(Turno)
+            .where(tuple_(Turno.id, Turno.estado).in_([(f.id, f.estado) for f in a_cambiar]))
+            .values(estado=nuevo)
+            .returning(Turno.id),
+            execution_options={"synchronize_session": False},
+        ).scalars())
+        # el update core no pasa por el flush del ORM: las estadísticas a mano
+        deltas = Counter()
+        for f in a_cambiar:
+            if f.id in cambiados:
+                deltas[(f.persona_id, f.estado, f.fecha)] -= 1
+                deltas[(f.persona_id, nuevo, f.fecha)] += 1
+        aplicar_deltas(db, deltas)
+        db.commit()
+
+    for f in a_cambiar:
+        if f.id in cambiados:
+            registrar_cambio_turno(f.fecha, f.hora, f.estado, f.fecha, f.hora, nuevo)
+        else:
+            resultados[f.id] = TurnoLoteResultado(
+                id=f.id, status_code=409, error="El turno cambió de estado en otro pedido, reintente"
+            )
+
+    for turno_id in ids:
+        if turno_id not in resultados:
+            f = filas[turno_id]
+            resultados[turno_id] = TurnoLoteResultado(
+                id=turno_id,
+                status_code=status.HTTP_200_OK,
+                turno=TurnoOut(
+                    id=f.id,
+                    fecha=f.fecha,
+                    hora=texto_hora(f.hora),
+                    estado=nuevo,
+                    persona_dni=f.dni,
+                ),
+            )
+
+    lista = [resultados[turno_id] for turno_id in ids]
+    actualizados = sum(1 for r in lista if r.turno is not None)
+    return TurnosLoteOut(actualizados=actualizados, errores=len(lista) - actualizados, resultados=lista)
+
+
+# 12 bis.
+@router.post("/turnos/bulk/cancelar", response_model=TurnosLoteOut)
+def cancelar_turnos_lote(datos: TurnosLoteIn, db: Session = Depends(get_db)):
+    try:
+        return _cambiar_estado_lote(
+            db, datos, EstadoTurno.cancelado, (EstadoTurno.asistido,),
+            "No se puede cancelar un turno asistido",
+        )
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+
+# 13 bis.
+@router.post("/turnos/bulk/confirmar", response_model=TurnosLoteOut)
+def confirmar_turnos_lote(datos: TurnosLoteIn, db: Session = Depends(get_db)):
+    try:
+        return _cambiar_estado_lote(
+            db, datos, EstadoTurno.confirmado, (EstadoTurno.asistido, EstadoTurno.cancelado),
+            "No se puede confirmar un turno asistido o cancelado",
+        )
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
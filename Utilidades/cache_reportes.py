@@ -0,0 +1,235 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from Utilidades.configuracion import config
+from Modelos.models import VersionTabla
+
+# Configuración del cache de reportes desde .env
+REPORTES_CACHE = config.REPORTES_CACHE
+REPORTES_CACHE_MAX_BYTES = config.REPORTES_CACHE_MAX_BYTES
+REPORTES_CACHE_MAX_ENTRADA = config.REPORTES_CACHE_MAX_ENTRADA
+REPORTES_CACHE_TTL_SEG = config.REPORTES_CACHE_TTL_SEG
+
+_CLAVE_TABLAS_SESION = "tablas_modificadas"
+
+
+# --------- Versión por tabla --------- #
+# Las versiones viven en la tabla versiones_tablas, no en memoria: con varios workers (o los reportes
+# desplegados aparte, APP_ROUTERS) una escritura atendida por cualquier proceso invalida el cache de todos.
+# La versión de una tabla es la suma de VERSIONES_FRAGMENTOS contadores: cada commit que escribe en ella
+# incrementa uno al azar en la misma transacción, justo antes de confirmar, así las escrituras concurrentes
+# casi nunca esperan por la misma fila. La suma crece con cada commit confirmado, en cualquier orden. Las
+# claves del cache leen las versiones con un SELECT antes de generar el reporte, así nunca se guarda
+# contenido viejo bajo una versión nueva. Con REPORTES_CACHE=false no se registra nada de esto.
+
+VERSIONES_FRAGMENTOS = 16
+
+_versiones = VersionTabla.__table__
+
+
+def leer_versiones(db: Session, tablas: Iterable[str]) -> Dict[str, int]:
+    tablas = sorted(tablas)
+    guardadas = dict(db.execute(
+        select(_versiones.c.tabla, func.sum(_versiones.c.version))
+        .where(_versiones.c.tabla.in_(tablas))
+        .group_by(_versiones.c.tabla)
+    ).all())
+    return {t: guardadas.get(t, 0) for t in tablas}
+
+
+def incrementar_versiones(conexion: Connection, tablas: Iterable[str]) -> None:
+    if conexion.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as insertar
+    else:
+        insertar = insert_sqlite
+    for tabla in sorted(tablas):
+        fragmento = random.randrange(VERSIONES_FRAGMENTOS)
+        sentencia = insertar(_versiones).values(tabla=tabla, fragmento=fragmento, version=1)
+        conexion.execute(sentencia.on_conflict_do_update(
+            index_elements=[_versiones.c.tabla, _versiones.c.fragmento],
+            set_={"version": _versiones.c.version + 1},
+        ))
+
+
+# Las escrituras se detectan a nivel Session (también las de AsyncSession, que usa una Session por debajo):
+# los flush del ORM, los insert/update/delete ejecutados con session.execute y el commit que los confirma.
+
+def _tablas_pendientes(session: Session) -> set:
+    return session.info.setdefault(_CLAVE_TABLAS_SESION, set())
+
+
+def _registrar_flush(session: Session, flush_context) -> None:
+    tablas = _tablas_pendientes(session)
+    for obj in list(session.new) + list(session.deleted):
+        tablas.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj):
+            tablas.add(obj.__table__.name)
+
+
+def _registrar_sentencia(estado) -> None:
+    if (estado.is_insert or estado.is_update or estado.is_delete) and estado.bind_mapper is not None:
+        _tablas_pendientes(estado.session).add(estado.bind_mapper.local_table.name)
+
+
+def _versionar_tablas(session: Session) -> None:
+    # El commit haría este flush después del hook: se adelanta para conocer todas las tablas escritas
+    session.flush()
+    tablas = session.info.pop(_CLAVE_TABLAS_SESION, None)
+    if tablas:
+        incrementar_versiones(session.connection(), tablas)
+
+
+def _descartar_tablas(session: Session) -> None:
+    session.info.pop(_CLAVE_TABLAS_SESION, None)
+
+
+if REPORTES_CACHE:
+    event.listen(Session, "after_flush", _registrar_flush)
+    event.listen(Session, "do_orm_execute", _registrar_sentencia)
+    event.listen(Session, "before_commit", _versionar_tablas)
+    event.listen(Session, "after_rollback", _descartar_tablas)
+
+
+# --------- Cache de bytes renderizados --------- #
+
+class EntradaReporte:
+    def __init__(self, contenido: bytes, media_type: str, archivo: str):
+        self.contenido = contenido
+        self.media_type = media_type
+        self.archivo = archivo
+        self.etag = '"' + hashlib.sha256(contenido).hexdigest()[:32] + '"'
+        self.creada = time.monotonic()
+
+
+class CacheReportes:
+# LRU por tamaño total (REPORTES_CACHE_MAX_BYTES). Las entradas más grandes que REPORTES_CACHE_MAX_ENTRADA
+# no se guardan. Como la clave incluye las versiones de las tablas, no hace falta borrar nada al escribir:
+# las entradas viejas dejan de pedirse y las desaloja el LRU. REPORTES_CACHE_TTL_SEG acota la vida de cada
+# entrada para escrituras que no pasan por una Session de la app (SQL a mano, scripts con el engine).
+
+    def __init__(
+        self,
+        max_bytes: int = REPORTES_CACHE_MAX_BYTES,
+        max_entrada: int = REPORTES_CACHE_MAX_ENTRADA,
+        ttl_seg: float = REPORTES_CACHE_TTL_SEG,
+    ):
+        self._max_bytes = max_bytes
+        self.max_entrada = max_entrada
+        self._ttl = ttl_seg
+        self._entradas: "OrderedDict[str, EntradaReporte]" = OrderedDict()
+        self._tamanio = 0
+        self._lock = threading.Lock()
+
+    def clave(self, formato: str, nombre: str, parametros: dict, versiones: Dict[str, int]) -> str:
+    # versiones: las de leer_versiones para las tablas que lee el reporte. Incluye la fecha del día porque
+    # varios reportes calculan su rango con date.today().
+
+        datos = {
+            "formato": formato,
+            "reporte": nombre,
+            "parametros": {k: str(v) for k, v in sorted(parametros.items())},
+            "versiones": versiones,
+            "hoy": date.today().isoformat(),
+        }
+        return hashlib.sha256(json.dumps(datos, sort_keys=True).encode()).hexdigest()
+
+    def obtener(self, clave: str) -> Optional[EntradaReporte]:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            if self._ttl > 0 and time.monotonic() - entrada.creada > self._ttl:
+                del self._entradas[clave]
+                self._tamanio -= len(entrada.contenido)
+                return None
+            self._entradas.move_to_end(clave)
+            return entrada
+
+    def guardar(self, clave: str, contenido: bytes, media_type: str, archivo: str) -> EntradaReporte:
+        entrada = EntradaReporte(contenido, media_type, archivo)
+        if len(contenido) > self.max_entrada:
+            return entrada
+
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._tamanio -= len(anterior.contenido)
+            self._entradas[clave] = entrada
+            self._tamanio += len(contenido)
+            while self._tamanio > self._max_bytes and self._entradas:
+                _, desalojada = self._entradas.popitem(last=False)
+                self._tamanio -= len(desalojada.contenido)
+        return entrada
+
+    def vaciar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._tamanio = 0
+
+
+cache_reportes = CacheReportes()
+
+
+# --------- Respuestas HTTP --------- #
+
+def _coincide_etag(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for valor in if_none_match.split(","):
+        valor = valor.strip()
+        if valor.startswith("W/"):
+            valor = valor[2:]
+        if valor == "*" or valor == etag:
+            return True
+    return False
+
+
+def respuesta_desde_cache(entrada: EntradaReporte, if_none_match: Optional[str]) -> Response:
+# 304 sin cuerpo si el cliente ya tiene esa versión (If-None-Match), si no los bytes guardados con su ETag.
+
+    if _coincide_etag(if_none_match, entrada.etag):
+        return Response(status_code=304, headers={"ETag": entrada.etag})
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{entrada.archivo}"',
+        "ETag": entrada.etag,
+    }
+    return Response(content=entrada.contenido, media_type=entrada.media_type, headers=headers)
+
+
+def cachear_streaming(respuesta: StreamingResponse, clave: str, media_type: str, archivo: str) -> StreamingResponse:
+# Copia los bloques que se van enviando y guarda el archivo completo al terminar el envío. Si el cliente corta
+# la descarga o el archivo supera REPORTES_CACHE_MAX_ENTRADA no se guarda nada. La primera respuesta sale sin
+# ETag (no se conoce hasta terminar); las siguientes salen del cache con ETag.
+
+    cuerpo = respuesta.body_iterator
+
+    async def copiar() -> AsyncIterator[bytes]:
+        partes = []
+        tamanio = 0
+        async for bloque in cuerpo:
+            if partes is not None:
+                tamanio += len(bloque)
+                if tamanio > cache_reportes.max_entrada:
+                    partes = None
+                else:
+                    partes.append(bloque)
+            yield bloque
+        if partes is not None:
+            cache_reportes.guardar(clave, b"".join(partes), media_type, archivo)
+
+    respuesta.body_iterator = copiar()
+    return respuesta
@@ -0,0 +1,43 @@
+from datetime import date, timedelta
+from typing import Dict, List
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+from Utilidades.configuracion import config
+from Modelos.models import EstadisticaTurnoDiaria, EstadoTurno
+
+# Ventana de la regla de cancelaciones desde .env
+CANCELACIONES_VENTANA_DIAS = config.CANCELACIONES_VENTANA_DIAS
+
+# La regla de 5 cancelaciones se valida siempre contra la BD: las estadísticas diarias se actualizan en la misma
+# transacción que cada cambio de turno, así todos los workers ven la misma cantidad. La suma recorre un rango de
+# la clave primaria (persona_id, estado, fecha) por persona.
+
+
+def limite_cancelaciones() -> date:
+    return date.today() - timedelta(days=CANCELACIONES_VENTANA_DIAS)
+
+
+def select_cancelaciones_recientes(persona_ids: List[int]) -> Select:
+# (persona_id, cancelaciones dentro de la ventana) de las personas con alguna. Sirve para Session y AsyncSession.
+
+    return (
+        select(EstadisticaTurnoDiaria.persona_id, func.sum(EstadisticaTurnoDiaria.cantidad))
+        .where(
+            EstadisticaTurnoDiaria.persona_id.in_(persona_ids),
+            EstadisticaTurnoDiaria.estado == EstadoTurno.cancelado,
+            EstadisticaTurnoDiaria.fecha >= limite_cancelaciones(),
+        )
+        .group_by(EstadisticaTurnoDiaria.persona_id)
+    )
+
+
+def cancelaciones_recientes(db: Session, persona_ids: List[int]) -> Dict[int, int]:
+# Cancelaciones dentro de la ventana por persona (0 si no tiene), con una sola consulta.
+
+    resultado = dict.fromkeys(persona_ids, 0)
+    if persona_ids:
+        filas = db.execute(select_cancelaciones_recientes(persona_ids))
+        resultado.update({persona_id: cantidad for persona_id, cantidad in filas})
+    return resultado
@@ -0,0 +1,117 @@
+"""
+Configuración de la aplicación: las variables de entorno (y el archivo .env) se leen una sola vez, al importar
+este módulo. Los demás módulos toman sus valores de `config` en lugar de llamar a load_dotenv y os.getenv.
+Las variables ya definidas en el entorno tienen prioridad sobre las del .env.
+"""
+import os
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+
+def _texto(nombre: str, defecto: Optional[str] = None) -> Optional[str]:
+    return os.getenv(nombre, defecto)
+
+
+def _entero(nombre: str, defecto: int) -> int:
+    return int(os.getenv(nombre, str(defecto)))
+
+
+def _decimal(nombre: str, defecto: float) -> float:
+    return float(os.getenv(nombre, str(defecto)))
+
+
+def _booleano(nombre: str, defecto: bool) -> bool:
+    return os.getenv(nombre, "true" if defecto else "false").lower() == "true"
+
+
+def _lista(nombre: str, defecto: str = "") -> List[str]:
+    return os.getenv(nombre, defecto).split(",")
+
+
+class Configuracion:
+# Un atributo por variable de entorno, con el mismo nombre y ya convertido a su tipo.
+
+    def __init__(self):
+        load_dotenv()
+
+        # Base de datos
+        self.DATABASE_URL = _texto("DATABASE_URL")
+        self.ASYNC_DATABASE_URL = _texto("ASYNC_DATABASE_URL")
+        self.CHECK_THREAD = _texto("CHECK_THREAD")
+        self.DB_ASYNC = _booleano("DB_ASYNC", False)
+        self.DB_POOL_SIZE = _entero("DB_POOL_SIZE", 5)
+        self.DB_MAX_OVERFLOW = _entero("DB_MAX_OVERFLOW", 10)
+        self.DB_POOL_RECYCLE = _entero("DB_POOL_RECYCLE", 1800)
+        self.DB_POOL_PRE_PING = _booleano("DB_POOL_PRE_PING", True)
+        self.DB_ESQUEMA_AL_INICIAR = _texto("DB_ESQUEMA_AL_INICIAR", "migrar").lower()
+        self.SQLITE_PRAGMAS = _booleano("SQLITE_PRAGMAS", True)
+        self.SQLITE_JOURNAL_MODE = _texto("SQLITE_JOURNAL_MODE", "WAL")
+        self.SQLITE_SYNCHRONOUS = _texto("SQLITE_SYNCHRONOUS", "NORMAL")
+        self.SQLITE_MMAP_SIZE = _entero("SQLITE_MMAP_SIZE", 268435456)
+        self.SQLITE_CACHE_SIZE = _entero("SQLITE_CACHE_SIZE", -64000)
+        self.SQLITE_BUSY_TIMEOUT = _entero("SQLITE_BUSY_TIMEOUT", 5000)
+        self.DB_CONSULTA_LENTA_MS = _decimal("DB_CONSULTA_LENTA_MS", 200)
+
+        # Modelos y validaciones
+        self.ESTADO_TURNO_PENDIENTE = _texto("ESTADO_TURNO_PENDIENTE")
+        self.ESTADO_TURNO_ASISTIDO = _texto("ESTADO_TURNO_ASISTIDO")
+        self.ESTADO_TURNO_CONFIRMADO = _texto("ESTADO_TURNO_CONFIRMADO")
+        self.ESTADO_TURNO_CANCELADO = _texto("ESTADO_TURNO_CANCELADO")
+        self.EMAIL_REGEX = _texto("EMAIL_REGEX")
+        self.HORA_MODELO = _texto("HORA_MODELO", "%H:%M")
+        self.SLOT_START = _texto("SLOT_START", "09:00")
+        self.SLOT_END = _texto("SLOT_END", "17:00")
+        self.SLOT_STEP_MIN = _entero("SLOT_STEP_MIN", 30)
+
+        # Endpoints
+        self.APP_ROUTERS = _lista("APP_ROUTERS", "personas,turnos,disponibilidad,reportes")
+        self.PAGINACION_LIMITE_MAX = _entero("PAGINACION_LIMITE_MAX", 1000)
+        self.TURNOS_BULK_MAX = _entero("TURNOS_BULK_MAX", 1000)
+        self.IMPORT_CHUNK_FILAS = _entero("IMPORT_CHUNK_FILAS", 1000)
+        self.IMPORT_MAX_ERRORES = _entero("IMPORT_MAX_ERRORES", 1000)
+
+        # Métricas (/metrics y Server-Timing)
+        self.METRICAS = _booleano("METRICAS", True)
+
+        # Índices en memoria
+        self.OCUPACION_TTL_SEG = _decimal("OCUPACION_TTL_SEG", 60)
+        self.OCUPACION_MAX_FECHAS = _entero("OCUPACION_MAX_FECHAS", 366)
+        self.DISPONIBILIDAD_MAX_DIAS = _entero("DISPONIBILIDAD_MAX_DIAS", 366)
+        self.CANCELACIONES_VENTANA_DIAS = _entero("CANCELACIONES_VENTANA_DIAS", 180)
+
+        # Reportes
+        self.UTF8 = _texto("UTF8", "utf-8")
+        self.CSV_SEPARATOR = _texto("CSV_SEPARATOR", ";")
+        self.CSV_FILAS_POR_CHUNK = _entero("CSV_FILAS_POR_CHUNK", 500)
+        self.CSV_YIELD_PER = _entero("CSV_YIELD_PER", 1000)
+        self.REPORT_CSV_DIR = _texto("REPORT_CSV_DIR", "CSV")
+        self.REPORT_PDF_DIR = _texto("REPORT_PDF_DIR", "PDF")
+        self.PDF_FILAS_POR_PAGINA = _entero("PDF_FILAS_POR_PAGINA", 25)
+        self.PDF_FUENTE = _texto("PDF_FUENTE", "Helvetica")
+        self.PDF_YIELD_PER = _entero("PDF_YIELD_PER", 1000)
+        self.MSG_SIN_DATOS = _texto("MSG_SIN_DATOS")
+        self.CSV_TURNOS_CANCELADOS_MES = _texto("CSV_TURNOS_CANCELADOS_MES")
+        self.PDF_TURNOS_CANCELADOS_MES = _texto("PDF_TURNOS_CANCELADOS_MES")
+        self.COL_PDF_TURNOS_POR_FECHA = _lista("COL_PDF_TURNOS_POR_FECHA")
+        self.COL_PDF_TURNOS_CANCELADOS_POR_MES = _lista("COL_PDF_TURNOS_CANCELADOS_POR_MES")
+        self.COL_PDF_TURNOS_POR_PERSONA = _lista("COL_PDF_TURNOS_POR_PERSONA")
+        self.COL_PDF_TURNOS_CANCELADOS_PERSONAS = _lista("COL_PDF_TURNOS_CANCELADOS_PERSONAS")
+        self.COL_PDF_TURNOS_CONFIRMADOS = _lista("COL_PDF_TURNOS_CONFIRMADOS")
+        self.COL_PDF_ESTADO_PERSONAS = _lista("COL_PDF_ESTADO_PERSONAS")
+        self.SI = _texto("SI")
+        self.NO = _texto("NO")
+        self.VARIABLE_HABILITADA = _texto("VARIABLE_HABILITADA")
+        self.VARIABLE_NO_HABILITADA = _texto("VARIABLE_NO_HABILITADA")
+        self.MESES = _lista("MESES")
+
+        # Reportes en segundo plano y cache
+        self.REPORTES_WORKERS = _entero("REPORTES_WORKERS", 2)
+        self.REPORTES_TRABAJOS_TTL_SEG = _entero("REPORTES_TRABAJOS_TTL_SEG", 3600)
+        self.REPORTES_CACHE = _booleano("REPORTES_CACHE", True)
+        self.REPORTES_CACHE_MAX_BYTES = _entero("REPORTES_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+        self.REPORTES_CACHE_MAX_ENTRADA = _entero("REPORTES_CACHE_MAX_ENTRADA", 8 * 1024 * 1024)
+        self.REPORTES_CACHE_TTL_SEG = _entero("REPORTES_CACHE_TTL_SEG", 300)
+
+
+config = Configuracion()
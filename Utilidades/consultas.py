@@ -0,0 +1,30 @@
+from fastapi import HTTPException
+from sqlalchemy.orm import Query, Session, contains_eager
+
+from Modelos.models import Persona, Turno
+
+
+# --------- Consultas de turnos con su persona --------- #
+# Turno.persona es una relación lazy: leer t.persona dentro de un loop dispara un SELECT por fila.
+# Estas consultas traen la persona en el mismo SELECT (JOIN + contains_eager), y permiten
+# filtrar y ordenar por columnas de Persona sin agregar otro join.
+
+def consulta_turnos(db: Session) -> Query:
+# Query de Turno con la persona cargada en la misma sentencia.
+
+    return db.query(Turno).join(Turno.persona).options(contains_eager(Turno.persona))
+
+
+def turno_con_persona_o_404(db: Session, turno_id: int) -> Turno:
+# Busca un turno por ID junto con su persona. Si no existe, lanza HTTPException 404.
+
+    turno = consulta_turnos(db).filter(Turno.id == turno_id).first()
+    if not turno:
+        raise HTTPException(status_code=404, detail="Turno no encontrado")
+    return turno
+
+
+def filtrar_por_dni(query: Query, dni: int) -> Query:
+# Filtra una consulta de consulta_turnos por el DNI de la persona (sin buscar antes la persona).
+
+    return query.filter(Persona.dni == dni)
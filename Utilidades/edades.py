@@ -0,0 +1,61 @@
+from datetime import date
+from typing import Iterable, List, Optional
+
+from sqlalchemy import extract
+from sqlalchemy.sql.elements import ColumnElement
+
+# Tope de los filtros edad_min / edad_max
+EDAD_MAXIMA = 150
+
+# La edad se calcula con la fecha como entero AAAAMMDD: (hoy - nacimiento) // 10000 da los años cumplidos
+# sin comparar mes y día aparte. La misma cuenta sirve en Python (una o muchas fechas) y en SQL.
+
+
+def clave_fecha(d: date) -> int:
+    return d.year * 10000 + d.month * 100 + d.day
+
+
+def edad_en(nacimiento: date, hoy: Optional[date] = None) -> int:
+    return (clave_fecha(hoy or date.today()) - clave_fecha(nacimiento)) // 10000
+
+
+def edades(nacimientos: Iterable[date], hoy: Optional[date] = None) -> List[int]:
+# Edades de muchas personas de una vez (listados): la fecha de hoy se toma una sola vez para todo el lote.
+
+    clave_hoy = clave_fecha(hoy or date.today())
+    return [(clave_hoy - (n.year * 10000 + n.month * 100 + n.day)) // 10000 for n in nacimientos]
+
+
+def edad_sql(nacimiento: ColumnElement, hoy: Optional[date] = None) -> ColumnElement:
+# Expresión SQL de la edad para ordenar o seleccionar. Para filtrar conviene filtros_edad, que compara la
+# columna directamente y puede usar el índice.
+
+    clave = extract("year", nacimiento) * 10000 + extract("month", nacimiento) * 100 + extract("day", nacimiento)
+    return (clave_fecha(hoy or date.today()) - clave) // 10000
+
+
+def _fecha_o_28_feb(anio: int, mes: int, dia: int) -> date:
+    # hoy - N años cuando hoy es 29 de febrero y el año destino no es bisiesto
+    try:
+        return date(anio, mes, dia)
+    except ValueError:
+        return date(anio, 2, 28)
+
+
+def filtros_edad(
+    nacimiento: ColumnElement,
+    edad_min: Optional[int] = None,
+    edad_max: Optional[int] = None,
+    hoy: Optional[date] = None,
+) -> List[ColumnElement]:
+# Condiciones sobre la fecha de nacimiento equivalentes a edad_min <= edad <= edad_max:
+#   edad >= N  <=>  nació a más tardar hoy hace N años
+#   edad <= N  <=>  nació después de hoy hace N + 1 años
+
+    hoy = hoy or date.today()
+    condiciones = []
+    if edad_min is not None:
+        condiciones.append(nacimiento <= _fecha_o_28_feb(hoy.year - edad_min, hoy.month, hoy.day))
+    if edad_max is not None:
+        condiciones.append(nacimiento > _fecha_o_28_feb(hoy.year - edad_max - 1, hoy.month, hoy.day))
+    return condiciones
@@ -0,0 +1,184 @@
+"""
+Estadísticas diarias de turnos (tabla estadisticas_turnos_diarias): cantidad por persona, estado y día.
+
+Los cambios hechos con el ORM (alta, baja y cambio de estado, fecha o persona de un turno, y la baja de una
+persona con sus turnos) se suman en el mismo flush, dentro de la transacción del endpoint. Las sentencias
+core que insertan o actualizan turnos en masa tienen que llamar a aplicar_deltas antes del commit. La regla de
+cancelaciones (Utilidades/cancelaciones.py) suma directamente sobre esta tabla.
+
+La tabla la crea y la llena por primera vez la migración 2 (BaseDatos/migraciones.py).
+
+Reconstruir la tabla desde cero (desde la raíz del repo):
+    python -m Utilidades.estadisticas reconstruir
+    python -m Utilidades.estadisticas verificar
+"""
+import argparse
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import Select, delete, event, func, insert, inspect, select
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+from sqlalchemy.orm import Session
+
+from BaseDatos.database import SessionLocal
+from Modelos.models import EstadisticaTurnoDiaria, EstadoTurno, Persona, Turno
+
+# (persona_id, estado, fecha)
+ClaveEstadistica = Tuple[int, EstadoTurno, date]
+
+_tabla = EstadisticaTurnoDiaria.__table__
+
+
+# --------- Mantenimiento incremental --------- #
+
+def deltas_de_filas(filas: Iterable[dict], signo: int = 1) -> Counter:
+# Deltas para filas de turnos con persona_id, estado y fecha (p. ej. los parámetros de un insert(Turno) masivo).
+
+    deltas: Counter = Counter()
+    for fila in filas:
+        deltas[(fila["persona_id"], fila["estado"], fila["fecha"])] += signo
+    return deltas
+
+
+def aplicar_deltas(db: Session, deltas: Dict[ClaveEstadistica, int]) -> None:
+# Suma los deltas con un INSERT ... ON CONFLICT DO UPDATE en la conexión de la sesión (misma transacción).
+
+    filas = [
+        {"persona_id": persona_id, "estado": estado, "fecha": fecha, "cantidad": cantidad}
+        for (persona_id, estado, fecha), cantidad in deltas.items()
+        if cantidad
+    ]
+    if not filas:
+        return
+
+    conexion = db.connection()
+    if conexion.dialect.name == "postgresql":
+        # el dialecto de PostgreSQL se importa solo si se usa (agrega ~50 ms al arranque)
+        from sqlalchemy.dialects.postgresql import insert as insertar
+    else:
+        insertar = insert_sqlite
+    sentencia = insertar(_tabla)
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=[_tabla.c.persona_id, _tabla.c.estado, _tabla.c.fecha],
+        set_={"cantidad": _tabla.c.cantidad + sentencia.excluded.cantidad},
+    )
+    conexion.execute(sentencia, filas)
+
+
+def _valor_anterior(turno: Turno, atributo: str):
+    historia = inspect(turno).attrs[atributo].history
+    if historia.deleted:
+        return historia.deleted[0]
+    if historia.unchanged:
+        return historia.unchanged[0]
+    return getattr(turno, atributo)
+
+
+def _clave_anterior(turno: Turno) -> ClaveEstadistica:
+    return (_valor_anterior(turno, "persona_id"), _valor_anterior(turno, "estado"), _valor_anterior(turno, "fecha"))
+
+
+def _clave_actual(turno: Turno) -> ClaveEstadistica:
+    return (turno.persona_id, turno.estado or EstadoTurno.pendiente, turno.fecha)
+
+
+# Con active_history el ORM carga el valor anterior al asignar aunque el atributo estuviera expirado,
+# así _valor_anterior siempre lo encuentra en el historial.
+for _atributo in (Turno.persona_id, Turno.estado, Turno.fecha):
+    event.listen(_atributo, "set", lambda target, value, oldvalue, initiator: value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _actualizar_estadisticas(session: Session, flush_context) -> None:
+# Después del flush (antes del commit) se conocen los ids generados y todavía está el historial de cambios.
+
+    personas_borradas = {obj.id for obj in session.deleted if isinstance(obj, Persona)}
+
+    deltas: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, Turno):
+            deltas[_clave_actual(obj)] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Turno):
+            deltas[_clave_anterior(obj)] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, Turno) and session.is_modified(obj):
+            anterior, actual = _clave_anterior(obj), _clave_actual(obj)
+            if anterior != actual:
+                deltas[anterior] -= 1
+                deltas[actual] += 1
+
+    if personas_borradas:
+        # sus filas se borran enteras (en SQLite las claves foráneas no se hacen cumplir por defecto)
+        deltas = Counter({k: v for k, v in deltas.items() if k[0] not in personas_borradas})
+        session.connection().execute(delete(_tabla).where(_tabla.c.persona_id.in_(personas_borradas)))
+
+    aplicar_deltas(session, deltas)
+
+
+# --------- Reconstrucción --------- #
+
+def _conteo_desde_turnos() -> Select:
+    return select(Turno.persona_id, Turno.estado, Turno.fecha, func.count(Turno.id)).group_by(
+        Turno.persona_id, Turno.estado, Turno.fecha
+    )
+
+
+def reconstruir_estadisticas(db: Session) -> int:
+# Borra la tabla y la vuelve a llenar con un INSERT ... SELECT agrupado sobre turnos, en una transacción.
+
+    db.execute(delete(EstadisticaTurnoDiaria))
+    db.execute(
+        insert(EstadisticaTurnoDiaria).from_select(
+            ["persona_id", "estado", "fecha", "cantidad"], _conteo_desde_turnos()
+        )
+    )
+    db.commit()
+    return db.scalar(select(func.count()).select_from(EstadisticaTurnoDiaria))
+
+
+def diferencias_estadisticas(db: Session) -> List[Tuple[ClaveEstadistica, int, int]]:
+# Compara la tabla con un conteo en vivo sobre turnos. Devuelve (clave, guardado, real) de las que no coinciden.
+
+    guardado = {
+        (p, e, f): c
+        for p, e, f, c in db.execute(
+            select(
+                EstadisticaTurnoDiaria.persona_id,
+                EstadisticaTurnoDiaria.estado,
+                EstadisticaTurnoDiaria.fecha,
+                EstadisticaTurnoDiaria.cantidad,
+            )
+        )
+    }
+    real = {(p, e, f): c for p, e, f, c in db.execute(_conteo_desde_turnos())}
+    return [
+        (clave, guardado.get(clave, 0), real.get(clave, 0))
+        for clave in guardado.keys() | real.keys()
+        if guardado.get(clave, 0) != real.get(clave, 0)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("accion", choices=["reconstruir", "verificar"])
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.accion == "reconstruir":
+            print(f"Estadísticas reconstruidas: {reconstruir_estadisticas(db)} filas")
+        else:
+            diferencias = diferencias_estadisticas(db)
+            for (persona_id, estado, fecha), guardado, real in diferencias[:50]:
+                print(f"persona {persona_id} {estado.value} {fecha}: guardado {guardado}, real {real}")
+            print(f"{len(diferencias)} diferencias")
+            if diferencias:
+                raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import csv
+import os
+from io import StringIO
+from itertools import chain
+from typing import Callable, Iterable, Iterator, List, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Query, Session
+
+from Utilidades.configuracion import config
+from BaseDatos.database import SessionLocal
+
+# Configuración de exportación desde .env
+CSV_SEPARATOR: str = config.CSV_SEPARATOR
+UTF8: str = config.UTF8
+MSG_SIN_DATOS = config.MSG_SIN_DATOS
+CSV_FILAS_POR_CHUNK = config.CSV_FILAS_POR_CHUNK
+CSV_YIELD_PER = config.CSV_YIELD_PER
+
+
+def generar_csv(columnas: Sequence[str], filas: Iterable[Sequence[object]]) -> Iterator[bytes]:
+# Escribe el encabezado y las filas en CSV y devuelve bloques codificados de CSV_FILAS_POR_CHUNK filas.
+# Mismo formato que pandas.to_csv(sep=CSV_SEPARATOR, index=False): QUOTE_MINIMAL y fin de línea os.linesep.
+
+    buffer = StringIO()
+    writer = csv.writer(buffer, delimiter=CSV_SEPARATOR, lineterminator=os.linesep)
+    writer.writerow(columnas)
+
+    pendientes = 0
+    for fila in filas:
+        writer.writerow(fila)
+        pendientes += 1
+        if pendientes >= CSV_FILAS_POR_CHUNK:
+            yield buffer.getvalue().encode(UTF8)
+            buffer.seek(0)
+            buffer.truncate()
+            pendientes = 0
+
+    resto = buffer.getvalue()
+    if resto:
+        yield resto.encode(UTF8)
+
+
+def respuesta_csv(
+    consulta: Callable[[Session], Query],
+    columnas: List[str],
+    fila: Callable[[object], Sequence[object]],
+    filename: str,
+) -> StreamingResponse:
+# Devuelve un StreamingResponse que lee la consulta con yield_per y escribe el CSV a medida que llegan las filas.
+# Usa una sesión propia que se cierra al terminar el envío. Si la consulta no trae filas lanza 404 (MSG_SIN_DATOS).
+
+    db = SessionLocal()
+    try:
+        resultados = iter(consulta(db).yield_per(CSV_YIELD_PER))
+        primera = next(resultados, None)
+    except Exception:
+        db.close()
+        raise
+
+    if primera is None:
+        db.close()
+        raise HTTPException(status_code=404, detail=MSG_SIN_DATOS)
+
+    def cuerpo() -> Iterator[bytes]:
+        try:
+            yield from generar_csv(columnas, map(fila, chain([primera], resultados)))
+        finally:
+            db.close()
+
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    return StreamingResponse(cuerpo(), media_type="text/csv", headers=headers)
@@ -0,0 +1,108 @@
+from io import BytesIO
+from typing import Iterable, List, Optional
+
+from borb.pdf import SingleColumnLayout
+from borb.pdf import Document
+from borb.pdf.page.page import Page
+from borb.pdf.pdf import PDF
+from borb.pdf.canvas.layout.text.paragraph import Paragraph
+from borb.pdf.canvas.layout.table.fixed_column_width_table import FixedColumnWidthTable
+from borb.pdf.canvas.layout.table.table import TableCell
+from borb.pdf.canvas.layout.layout_element import Alignment
+from borb.pdf.canvas.font.font import Font
+from borb.pdf.canvas.font.simple_font.font_type_1 import StandardType1Font
+
+from Utilidades.configuracion import config
+
+# borb tarda en importarse (más de medio segundo): este módulo solo se importa al generar el primer PDF
+# (Utilidades/reportes.py), así los workers que no sirven reportes no lo cargan.
+
+# Configuración de PDF (Utilidades/configuracion.py)
+PDF_FILAS_POR_PAGINA = config.PDF_FILAS_POR_PAGINA
+PDF_FUENTE: str = config.PDF_FUENTE
+
+
+class _FuentePDF(StandardType1Font):
+# StandardType1Font con los anchos de glifo memoizados: borb recorre todas las métricas AFM en cada get_width,
+# y el layout de una tabla lo llama por cada carácter de cada celda.
+
+    def __init__(self, nombre: str):
+        super().__init__(nombre)
+        self._anchos: dict = {}
+
+    def get_width(self, character_identifier: int):
+        ancho = self._anchos.get(character_identifier)
+        if ancho is None:
+            ancho = super().get_width(character_identifier)
+            self._anchos[character_identifier] = ancho
+        return ancho
+
+
+def _agregar_pagina_tabla(doc: Document, columnas: List[str], filas: List[Iterable[object]], titulo: Optional[str], fuente: Font) -> SingleColumnLayout:
+# Agrega una página con el título (si se indica), el encabezado de columnas y las filas recibidas. Devuelve el layout de la página.
+
+    page = Page()
+    doc.add_page(page)
+    layout = SingleColumnLayout(page)
+
+    if titulo:
+        layout.add(Paragraph(titulo, font=fuente, horizontal_alignment=Alignment.CENTERED))
+        layout.add(Paragraph(" ", font=fuente))  # línea en blanco
+
+    tabla = FixedColumnWidthTable(
+        number_of_columns=len(columnas),
+        number_of_rows=len(filas) + 1,  # +1 por la fila de encabezados
+    )
+
+    # Encabezados (se repiten en cada página)
+    for c in columnas:
+        tabla.add(TableCell(Paragraph(str(c), font=fuente, horizontal_alignment=Alignment.CENTERED)))
+
+    # Filas de datos
+    for fila in filas:
+        for valor in fila:
+            tabla.add(TableCell(Paragraph(str(valor), font=fuente, horizontal_alignment=Alignment.CENTERED)))
+
+    layout.add(tabla)
+    return layout
+
+
+def generar_pdf_tabla(columnas: Iterable[str], filas: Iterable[Iterable[object]], titulo: Optional[str] = None, filas_por_pagina: int = PDF_FILAS_POR_PAGINA,) -> bytes:
+# Genera un PDF en memoria con un título opcional y una tabla de datos paginada. Devuelve los bytes del PDF para ser usados en un StreamingResponse.
+# Las filas se consumen de a filas_por_pagina (pueden venir de un generador): cada página arma su propia tabla con el encabezado
+# repetido, y la cantidad de registros se agrega al final porque recién se conoce al terminar de recorrer las filas.
+# La fuente se crea una vez por documento: si cada Paragraph recibe el nombre, borb vuelve a parsear las métricas AFM en cada celda.
+
+    try:
+        doc = Document()
+        fuente = _FuentePDF(PDF_FUENTE)
+        columnas = list(columnas)
+        filas_por_pagina = max(1, filas_por_pagina)
+
+        cantidad = 0
+        pagina = 0
+        lote: List[Iterable[object]] = []
+        layout = None
+
+        for fila in filas:
+            lote.append(fila)
+            cantidad += 1
+            if len(lote) == filas_por_pagina:
+                pagina += 1
+                layout = _agregar_pagina_tabla(doc, columnas, lote, titulo if pagina == 1 else None, fuente)
+                lote = []
+
+        # Última página incompleta (o la única, si no hubo filas)
+        if lote or layout is None:
+            layout = _agregar_pagina_tabla(doc, columnas, lote, titulo if pagina == 0 else None, fuente)
+
+        layout.add(Paragraph(f"Cantidad de registros: {cantidad}", font=fuente, horizontal_alignment=Alignment.CENTERED))
+
+        buffer = BytesIO()
+        PDF.dumps(buffer, doc)
+        return buffer.getvalue()
+
+    except Exception as e:
+        # Esto se transforma en HTTP 500 en el endpoint
+        raise RuntimeError(f"Error generando PDF con tabla: {e}")
+    
\ No newline at end of file
@@ -0,0 +1,172 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from Utilidades.configuracion import config
+from BaseDatos.database import SessionLocal
+from Esquemas.schemas import PersonaIn
+from Modelos.models import Persona
+from Utilidades.utils import validar_email, CSV_SEPARATOR
+
+UTF8: str = config.UTF8
+IMPORT_CHUNK_FILAS = config.IMPORT_CHUNK_FILAS
+IMPORT_MAX_ERRORES = config.IMPORT_MAX_ERRORES
+
+FORMATOS_IMPORTACION = ("csv", "ndjson")
+
+# Content-Type aceptados cuando no se indica ?formato=
+TIPOS_IMPORTACION = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+}
+
+
+class ResultadoImportacion:
+# Acumula contadores y un máximo de IMPORT_MAX_ERRORES errores, para que la memoria no crezca con el archivo.
+
+    def __init__(self):
+        self.procesadas = 0
+        self.creadas = 0
+        self.rechazadas = 0
+        self.errores: List[Dict[str, object]] = []
+        self.errores_omitidos = 0
+
+    def error(self, fila: int, detalle: str) -> None:
+        self.rechazadas += 1
+        if len(self.errores) < IMPORT_MAX_ERRORES:
+            self.errores.append({"fila": fila, "detalle": detalle})
+        else:
+            self.errores_omitidos += 1
+
+    def como_dict(self) -> Dict[str, object]:
+        return {
+            "procesadas": self.procesadas,
+            "creadas": self.creadas,
+            "rechazadas": self.rechazadas,
+            "errores": self.errores,
+            "errores_omitidos": self.errores_omitidos,
+        }
+
+
+async def lineas_de_stream(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+# Decodifica el cuerpo del request de a bloques y lo corta en líneas sin cargarlo entero en memoria.
+
+    decoder = codecs.getincrementaldecoder(UTF8)()
+    resto = ""
+    primera = True
+    async for bloque in stream:
+        texto = resto + decoder.decode(bloque)
+        if primera and texto:
+            texto = texto.lstrip("\ufeff")
+            primera = False
+        partes = texto.split("\n")
+        resto = partes.pop()
+        for parte in partes:
+            yield parte.rstrip("\r")
+    resto += decoder.decode(b"", final=True)
+    if resto:
+        yield resto.rstrip("\r")
+
+
+async def filas_de_stream(stream: AsyncIterator[bytes], formato: str) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+# Devuelve (número de fila, datos, error de parseo). En CSV la primera línea es el encabezado.
+# Cada registro debe ocupar una sola línea (no se admiten saltos de línea dentro de campos entre comillas).
+
+    encabezado: Optional[List[str]] = None
+    numero = 0
+    async for linea in lineas_de_stream(stream):
+        if not linea.strip():
+            continue
+
+        if formato == "csv":
+            valores = next(csv.reader([linea], delimiter=CSV_SEPARATOR))
+            if encabezado is None:
+                encabezado = [v.strip() for v in valores]
+                continue
+            numero += 1
+            if len(valores) != len(encabezado):
+                yield numero, None, "Cantidad de columnas distinta al encabezado"
+                continue
+            # los campos vacíos se omiten para que apliquen los valores por defecto de PersonaIn
+            yield numero, {k: v for k, v in zip(encabezado, valores) if v != ""}, None
+        else:
+            numero += 1
+            try:
+                datos = json.loads(linea)
+            except json.JSONDecodeError as e:
+                yield numero, None, f"JSON inválido: {e.msg}"
+                continue
+            if not isinstance(datos, dict):
+                yield numero, None, "Cada línea debe ser un objeto JSON"
+                continue
+            yield numero, datos, None
+
+
+def guardar_chunk(filas: List[Tuple[int, dict]], resultado: ResultadoImportacion) -> None:
+# Valida un chunk con PersonaIn y validar_email, chequea unicidad con dos consultas IN y lo inserta con un executemany.
+
+    validas: List[Tuple[int, PersonaIn]] = []
+    emails_chunk = set()
+    dnis_chunk = set()
+    for numero, datos in filas:
+        try:
+            persona = PersonaIn.model_validate(datos)
+            validar_email(persona.email)
+        except ValidationError as e:
+            primero = e.errors()[0]
+            campo = ".".join(str(x) for x in primero["loc"])
+            resultado.error(numero, f"{campo}: {primero['msg']}")
+            continue
+        except HTTPException as e:
+            resultado.error(numero, e.detail)
+            continue
+
+        if persona.email in emails_chunk:
+            resultado.error(numero, "Email repetido en el archivo")
+            continue
+        if persona.dni in dnis_chunk:
+            resultado.error(numero, "DNI repetido en el archivo")
+            continue
+        emails_chunk.add(persona.email)
+        dnis_chunk.add(persona.dni)
+        validas.append((numero, persona))
+
+    if not validas:
+        return
+
+    db = SessionLocal()
+    try:
+        emails_existentes = set(db.scalars(select(Persona.email).where(Persona.email.in_(emails_chunk))))
+        dnis_existentes = set(db.scalars(select(Persona.dni).where(Persona.dni.in_(dnis_chunk))))
+
+        nuevas = []
+        for numero, persona in validas:
+            if persona.email in emails_existentes:
+                resultado.error(numero, "Email ya registrado")
+            elif persona.dni in dnis_existentes:
+                resultado.error(numero, "DNI ya registrado")
+            else:
+                nuevas.append((numero, persona.model_dump()))
+
+        if not nuevas:
+            return
+
+        try:
+            db.execute(insert(Persona), [datos for _, datos in nuevas])
+            db.commit()
+            resultado.creadas += len(nuevas)
+        except IntegrityError:
+            # otra alta concurrente tomó un email o DNI del chunk entre la consulta y el insert
+            db.rollback()
+            for numero, _ in nuevas:
+                resultado.error(numero, "Email o DNI registrado por otro pedido concurrente")
+    finally:
+        db.close()
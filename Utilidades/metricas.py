@@ -0,0 +1,211 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from Utilidades.configuracion import config
+
+METRICAS = config.METRICAS
+
+# Límites superiores de los buckets de cada histograma (el de +Inf se agrega al exponer)
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BUCKETS_FILAS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+RUTA_DESCONOCIDA = "sin_ruta"
+
+
+class MedicionPedido:
+# Lo que gastó en la base un pedido: cantidad de sentencias, segundos (ejecución y lectura de filas) y filas
+# devueltas o modificadas. La llenan los hooks del engine (BaseDatos/database.py) mientras dura el pedido.
+
+    __slots__ = ("inicio", "consultas", "db_seg", "filas")
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.db_seg = 0.0
+        self.filas = 0
+
+    def registrar_consulta(self, duracion: float, context) -> None:
+        self.consultas += 1
+        self.db_seg += duracion
+        cursor = context.cursor
+        if cursor.description is None or context.executemany:
+            # INSERT/UPDATE/DELETE: filas modificadas, si el driver las informa
+            self.filas += max(cursor.rowcount, 0)
+        elif not isinstance(cursor, CursorMedido):
+            # SELECT: las filas se leen después (de a tandas con yield_per); el resultado se arma con
+            # context.cursor justo después de este hook, así que se lo envuelve para contarlas
+            context.cursor = CursorMedido(cursor, self)
+
+    def registrar_fallida(self, duracion: float) -> None:
+        # sentencia que terminó en error: cuenta y tiempo, sin filas
+        self.consultas += 1
+        self.db_seg += duracion
+
+    def server_timing(self) -> str:
+        app_ms = (time.perf_counter() - self.inicio) * 1000
+        return (f'app;dur={app_ms:.1f}, db;dur={self.db_seg * 1000:.1f};desc="{self.consultas} consultas", '
+                f'filas;desc="{self.filas}"')
+
+
+class CursorMedido:
+# Envoltorio del cursor DBAPI que suma a la medición las filas leídas y el tiempo de cada fetch.
+
+    __slots__ = ("_cursor", "_medicion")
+
+    def __init__(self, cursor, medicion: MedicionPedido):
+        self._cursor = cursor
+        self._medicion = medicion
+
+    def _contar(self, inicio: float, filas: int) -> None:
+        self._medicion.db_seg += time.perf_counter() - inicio
+        self._medicion.filas += filas
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        fila = self._cursor.fetchone()
+        self._contar(inicio, 0 if fila is None else 1)
+        return fila
+
+    def fetchmany(self, *args):
+        inicio = time.perf_counter()
+        filas = self._cursor.fetchmany(*args)
+        self._contar(inicio, len(filas))
+        return filas
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        filas = self._cursor.fetchall()
+        self._contar(inicio, len(filas))
+        return filas
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+_medicion_actual: ContextVar[Optional[MedicionPedido]] = ContextVar("medicion_pedido", default=None)
+
+
+def medicion_actual() -> Optional[MedicionPedido]:
+# Medición del pedido en curso, o None fuera de un pedido (CLI, trabajos en segundo plano).
+# El contexto se copia al threadpool de los endpoints síncronos y a las sesiones async.
+
+    return _medicion_actual.get()
+
+
+# --------- Histogramas y exposición en formato Prometheus --------- #
+
+class Histograma:
+    __slots__ = ("limites", "cuentas", "suma", "cantidad")
+
+    def __init__(self, limites: Sequence[float]):
+        self.limites = limites
+        self.cuentas = [0] * (len(limites) + 1)
+        self.suma = 0.0
+        self.cantidad = 0
+
+    def observar(self, valor: float) -> None:
+        self.cuentas[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.cantidad += 1
+
+    def lineas(self, nombre: str, etiquetas: str) -> List[str]:
+        lineas = []
+        acumulado = 0
+        for limite, cuenta in zip(list(self.limites) + ["+Inf"], self.cuentas):
+            acumulado += cuenta
+            lineas.append(f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+        lineas.append(f"{nombre}_sum{{{etiquetas}}} {self.suma}")
+        lineas.append(f"{nombre}_count{{{etiquetas}}} {self.cantidad}")
+        return lineas
+
+
+# (nombre, ayuda, buckets) de los histogramas por ruta, en el orden en que se exponen
+HISTOGRAMAS: List[Tuple[str, str, Sequence[float]]] = [
+    ("http_request_duration_seconds", "Duración del pedido, hasta enviar la respuesta completa", BUCKETS_SEGUNDOS),
+    ("http_request_db_queries", "Sentencias SQL ejecutadas por pedido", BUCKETS_CONSULTAS),
+    ("http_request_db_duration_seconds", "Tiempo en la base por pedido (ejecución y lectura de filas)", BUCKETS_SEGUNDOS),
+    ("http_request_db_rows", "Filas devueltas o modificadas por pedido", BUCKETS_FILAS),
+]
+
+
+class RegistroMetricas:
+# Métricas por (método, ruta) en memoria del proceso. Con varios workers cada uno expone las suyas en
+# /metrics y Prometheus las suma por instancia.
+
+    def __init__(self):
+        self._histogramas: Dict[Tuple[str, str], List[Histograma]] = {}
+        self._pedidos: Dict[Tuple[str, str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, metodo: str, ruta: str, estado: int, duracion: float, medicion: MedicionPedido) -> None:
+        valores = (duracion, medicion.consultas, medicion.db_seg, medicion.filas)
+        with self._lock:
+            histogramas = self._histogramas.get((metodo, ruta))
+            if histogramas is None:
+                histogramas = self._histogramas[(metodo, ruta)] = [Histograma(b) for _, _, b in HISTOGRAMAS]
+            for histograma, valor in zip(histogramas, valores):
+                histograma.observar(valor)
+            clave = (metodo, ruta, estado)
+            self._pedidos[clave] = self._pedidos.get(clave, 0) + 1
+
+    def exponer(self) -> str:
+        lineas = ["# HELP http_requests_total Pedidos atendidos por ruta y código de estado",
+                  "# TYPE http_requests_total counter"]
+        with self._lock:
+            for (metodo, ruta, estado), cantidad in sorted(self._pedidos.items()):
+                lineas.append(f'http_requests_total{{method="{metodo}",route="{ruta}",status="{estado}"}} {cantidad}')
+            for i, (nombre, ayuda, _) in enumerate(HISTOGRAMAS):
+                lineas.append(f"# HELP {nombre} {ayuda}")
+                lineas.append(f"# TYPE {nombre} histogram")
+                for (metodo, ruta), histogramas in sorted(self._histogramas.items()):
+                    lineas.extend(histogramas[i].lineas(nombre, f'method="{metodo}",route="{ruta}"'))
+        return "\n".join(lineas) + "\n"
+
+
+registro_metricas = RegistroMetricas()
+
+
+# --------- Middleware --------- #
+
+class MiddlewareMetricas:
+# Middleware ASGI: abre una MedicionPedido por pedido, agrega el header Server-Timing al empezar la respuesta
+# y, cuando termina de enviarse el cuerpo (incluye los CSV en streaming), la registra con la plantilla de
+# la ruta (/turnos/{turno_id}) para no crear una serie por id.
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medicion = MedicionPedido()
+        token = _medicion_actual.set(medicion)
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                MutableHeaders(scope=mensaje).append("Server-Timing", medicion.server_timing())
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _medicion_actual.reset(token)
+            ruta = scope.get("route")
+            registro_metricas.observar(
+                scope["method"], getattr(ruta, "path", RUTA_DESCONOCIDA), estado,
+                time.perf_counter() - medicion.inicio, medicion,
+            )
@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta, time as time_cls
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from Utilidades.configuracion import config
+from Modelos.models import Turno, EstadoTurno
+from Utilidades.slots import indice_de_hora, slots_de_mascara
+
+# Configuración del índice desde .env
+OCUPACION_TTL_SEG = config.OCUPACION_TTL_SEG
+OCUPACION_MAX_FECHAS = config.OCUPACION_MAX_FECHAS
+DISPONIBILIDAD_MAX_DIAS = config.DISPONIBILIDAD_MAX_DIAS
+
+
+class IndiceOcupacion:
+# Índice en memoria de slots ocupados por fecha. Cada fecha guarda un bitmap (int) con un bit por slot, en el
+# orden de la grilla de Utilidades/slots.py.
+# Se reconstruye de forma perezosa desde la BD y lo actualizan los endpoints que modifican turnos.
+
+    def __init__(self, ttl_seg: float = OCUPACION_TTL_SEG, max_fechas: int = OCUPACION_MAX_FECHAS):
+        self._ttl = ttl_seg
+        self._max_fechas = max_fechas
+        self._mascaras: "OrderedDict[date, Tuple[int, float]]" = OrderedDict()
+        self._generacion = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generacion(self) -> int:
+    # Contador que cambia con cada modificación; permite descartar reconstrucciones concurrentes.
+        return self._generacion
+
+    def consultar(self, fecha: date) -> Optional[int]:
+    # Devuelve el bitmap de la fecha si está cargado y vigente, o None.
+
+        with self._lock:
+            entrada = self._mascaras.get(fecha)
+            if entrada is None:
+                return None
+            mascara, cargado = entrada
+            if self._ttl > 0 and time.monotonic() - cargado > self._ttl:
+                del self._mascaras[fecha]
+                return None
+            self._mascaras.move_to_end(fecha)
+            return mascara
+
+    def guardar(self, fecha: date, mascara: int, generacion: int) -> None:
+    # Guarda un bitmap leído de la BD, salvo que haya habido cambios mientras se leía.
+
+        with self._lock:
+            if generacion != self._generacion:
+                return
+            self._mascaras[fecha] = (mascara, time.monotonic())
+            self._mascaras.move_to_end(fecha)
+            while len(self._mascaras) > self._max_fechas:
+                self._mascaras.popitem(last=False)
+
+    def _modificar(self, fecha: date, hora: time_cls, ocupar: bool) -> None:
+        bit = indice_de_hora(hora)
+        with self._lock:
+            self._generacion += 1
+            entrada = self._mascaras.get(fecha)
+            if entrada is None:
+                return
+            if bit is None:
+                # Hora fuera de la grilla: no se puede representar, se descarta la fecha
+                del self._mascaras[fecha]
+                return
+            mascara, cargado = entrada
+            mascara = mascara | (1 << bit) if ocupar else mascara & ~(1 << bit)
+            self._mascaras[fecha] = (mascara, cargado)
+
+    def ocupar(self, fecha: date, hora: time_cls) -> None:
+        self._modificar(fecha, hora, ocupar=True)
+
+    def liberar(self, fecha: date, hora: time_cls) -> None:
+        self._modificar(fecha, hora, ocupar=False)
+
+    def invalidar(self, fecha: Optional[date] = None) -> None:
+    # Descarta una fecha o, sin argumentos, todo el índice.
+
+        with self._lock:
+            self._generacion += 1
+            if fecha is None:
+                self._mascaras.clear()
+            else:
+                self._mascaras.pop(fecha, None)
+
+
+def mascara_de_horas(horas: Iterable[time_cls]) -> int:
+# Convierte una colección de horas ocupadas en un bitmap. Las horas fuera de la grilla se ignoran.
+
+    mascara = 0
+    for h in horas:
+        bit = indice_de_hora(h)
+        if bit is not None:
+            mascara |= 1 << bit
+    return mascara
+
+
+def slots_libres(mascara: int) -> List[str]:
+# Devuelve, en orden, los slots cuyo bit no está encendido.
+
+    return slots_de_mascara(mascara)
+
+
+def horarios_disponibles(db: Session, fecha: date) -> List[str]:
+# Devuelve los horarios libres de una fecha usando el índice. Solo consulta la BD si la fecha no está cargada.
+
+    mascara = indice_ocupacion.consultar(fecha)
+    if mascara is None:
+        generacion = indice_ocupacion.generacion
+        horas = (
+            db.query(Turno.hora)
+            .filter(Turno.fecha == fecha, Turno.estado != EstadoTurno.cancelado)
+            .all()
+        )
+        mascara = mascara_de_horas(h for (h,) in horas)
+        indice_ocupacion.guardar(fecha, mascara, generacion)
+    return slots_libres(mascara)
+
+
+def registrar_cambio_turno(
+    fecha_anterior: Optional[date],
+    hora_anterior: Optional[time_cls],
+    estado_anterior: Optional[EstadoTurno],
+    fecha_nueva: Optional[date],
+    hora_nueva: Optional[time_cls],
+    estado_nuevo: Optional[EstadoTurno],
+) -> None:
+# Actualiza el índice luego de un commit. Usar None en el lado "anterior" para altas y en el "nuevo" para bajas.
+
+    if fecha_anterior is not None and estado_anterior != EstadoTurno.cancelado:
+        indice_ocupacion.liberar(fecha_anterior, hora_anterior)
+    if fecha_nueva is not None and estado_nuevo != EstadoTurno.cancelado:
+        indice_ocupacion.ocupar(fecha_nueva, hora_nueva)
+
+
+
+def disponibilidad_por_rango(db: Session, desde: date, hasta: date) -> Iterator[Tuple[date, List[str]]]:
+# Recorre día por día el rango [desde, hasta] con una única consulta agrupada por (fecha, hora).
+# Los días sin turnos se devuelven con todos los slots libres y cada día leído se carga en el índice.
+
+    generacion = indice_ocupacion.generacion
+    filas = (
+        db.query(Turno.fecha, Turno.hora)
+        .filter(
+            Turno.fecha >= desde,
+            Turno.fecha <= hasta,
+            Turno.estado != EstadoTurno.cancelado,
+        )
+        .group_by(Turno.fecha, Turno.hora)
+        .order_by(Turno.fecha.asc(), Turno.hora.asc())
+        .yield_per(1000)
+    )
+
+    ocupados = iter(filas)
+    siguiente = next(ocupados, None)
+    dia = desde
+    while dia <= hasta:
+        mascara = 0
+        while siguiente is not None and siguiente[0] == dia:
+            mascara |= mascara_de_horas((siguiente[1],))
+            siguiente = next(ocupados, None)
+        indice_ocupacion.guardar(dia, mascara, generacion)
+        yield dia, slots_libres(mascara)
+        dia += timedelta(days=1)
+
+
+indice_ocupacion = IndiceOcupacion()
@@ -0,0 +1,428 @@
+import os
+import re
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+from dateutil.relativedelta import relativedelta
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+
+from Utilidades.configuracion import config
+from BaseDatos.database import SessionLocal
+from Modelos.models import Persona, Turno, EstadoTurno, EstadisticaTurnoDiaria
+from Utilidades.consultas import consulta_turnos
+from Utilidades.exportacion_csv import generar_csv, respuesta_csv
+from Utilidades.utils import filas_o_404, persona_por_dni_o_404, PDF_YIELD_PER
+from Utilidades.slots import texto_hora
+
+# Configuración de reportes desde .env
+MSG_SIN_DATOS = config.MSG_SIN_DATOS
+CSV_TURNOS_CANCELADOS_MES = config.CSV_TURNOS_CANCELADOS_MES
+PDF_TURNOS_CANCELADOS_MES = config.PDF_TURNOS_CANCELADOS_MES
+COLUMNAS_TURNOS_POR_FECHA = config.COL_PDF_TURNOS_POR_FECHA
+COLUMNAS_TURNOS_CANCELADOS_POR_MES = config.COL_PDF_TURNOS_CANCELADOS_POR_MES
+COLUMNAS_TURNOS_POR_PERSONA = config.COL_PDF_TURNOS_POR_PERSONA
+COLUMNAS_TURNOS_CANCELADOS_PERSONAS = config.COL_PDF_TURNOS_CANCELADOS_PERSONAS
+COLUMNAS_TURNOS_CONFIRMADOS = config.COL_PDF_TURNOS_CONFIRMADOS
+COLUMNAS_ESTADO_PERSONAS = config.COL_PDF_ESTADO_PERSONAS
+SI = config.SI
+NO = config.NO
+VARIABLE_HABILITADA = config.VARIABLE_HABILITADA
+VARIABLE_NO_HABILITADA = config.VARIABLE_NO_HABILITADA
+
+
+class Reporte:
+# Definición de un reporte ya resuelto para sus parámetros: la consulta (recibe la sesión, así la puede
+# ejecutar tanto el endpoint como un proceso del pool de trabajos), las columnas, cómo armar cada fila y el nombre del archivo.
+
+    def __init__(
+        self,
+        consulta: Callable[[Session], Query],
+        columnas: List[str],
+        fila: Callable[[object], Sequence[object]],
+        archivo: str,
+        titulo: Optional[str] = None,
+    ):
+        self.consulta = consulta
+        self.columnas = columnas
+        self.fila = fila
+        self.archivo = archivo
+        self.titulo = titulo
+
+
+# --------- Consultas compartidas entre CSV y PDF --------- #
+
+def _turnos_por_fecha(fecha: date) -> Callable[[Session], Query]:
+    return lambda db: (
+        consulta_turnos(db)
+        .filter(Turno.fecha == fecha)
+        .order_by(Persona.nombre.asc(), Turno.hora.asc())
+    )
+
+
+def _mes_actual():
+    inicio = date.today().replace(day=1)
+    return inicio, inicio + relativedelta(months=1)
+
+
+def _turnos_cancelados_del_mes(inicio: date, fin: date) -> Callable[[Session], Query]:
+    return lambda db: (
+        consulta_turnos(db)
+        .filter(
+            Turno.estado == EstadoTurno.cancelado,
+            Turno.fecha >= inicio,
+            Turno.fecha < fin,
+        )
+        .order_by(Turno.fecha.asc(), Turno.hora.asc())
+    )
+
+
+def _turnos_de_persona(persona_id: int) -> Callable[[Session], Query]:
+    return lambda db: (
+        db.query(Turno)
+        .filter(Turno.persona_id == persona_id)
+        .order_by(Turno.fecha.desc(), Turno.hora.desc())
+    )
+
+
+def _personas_con_cancelados(min: int) -> Callable[[Session], Query]:
+# Sale de las estadísticas diarias: a lo sumo una fila por persona y día, sin recorrer turnos.
+
+    hoy = date.today()
+    hace_6_meses = hoy - timedelta(days=180)  # aproximación 6 meses
+    cantidad = func.sum(EstadisticaTurnoDiaria.cantidad)
+    return lambda db: (
+        db.query(
+            Persona.dni,
+            Persona.nombre,
+            cantidad.label("cantidad_cancelados"),
+        )
+        .join(EstadisticaTurnoDiaria, EstadisticaTurnoDiaria.persona_id == Persona.id)
+        .filter(
+            EstadisticaTurnoDiaria.estado == EstadoTurno.cancelado,
+            EstadisticaTurnoDiaria.fecha >= hace_6_meses,
+            EstadisticaTurnoDiaria.fecha <= hoy,
+            EstadisticaTurnoDiaria.cantidad > 0,
+        )
+        .group_by(Persona.id)
+        .having(cantidad >= min)
+        .order_by(cantidad.desc())
+    )
+
+
+def _turnos_confirmados(desde: date, hasta: date) -> Callable[[Session], Query]:
+    return lambda db: (
+        consulta_turnos(db)
+        .filter(
+            Turno.estado == EstadoTurno.confirmado,
+            Turno.fecha >= desde,
+            Turno.fecha <= hasta,
+        )
+        .order_by(Turno.fecha.asc(), Turno.hora.asc())
+    )
+
+
+def _personas_por_estado(habilitada: bool) -> Callable[[Session], Query]:
+    return lambda db: (
+        db.query(Persona)
+        .filter(Persona.habilitado == habilitada)
+        .order_by(Persona.id.asc())
+    )
+
+
+# --------- Reportes CSV --------- #
+
+def csv_turnos_por_fecha(db: Session, fecha: date) -> Reporte:
+    return Reporte(
+        _turnos_por_fecha(fecha),
+        ["dni", "nombre", "id_turno", "fecha", "hora", "estado"],
+        lambda t: [
+            t.persona.dni,
+            t.persona.nombre,
+            t.id,
+            t.fecha.isoformat(),
+            texto_hora(t.hora),
+            t.estado.value,
+        ],
+        f"turnos_{fecha.isoformat()}.csv",
+    )
+
+
+def csv_turnos_cancelados_por_mes(db: Session) -> Reporte:
+    return Reporte(
+        _turnos_cancelados_del_mes(*_mes_actual()),
+        ["id", "dni", "nombre", "fecha", "hora"],
+        lambda t: [
+            t.id,
+            t.persona.dni,
+            t.persona.nombre,
+            t.fecha.isoformat(),
+            texto_hora(t.hora),
+        ],
+        CSV_TURNOS_CANCELADOS_MES,
+    )
+
+
+def csv_turnos_por_persona(db: Session, dni: int) -> Reporte:
+    persona = persona_por_dni_o_404(db, dni)
+    return Reporte(
+        _turnos_de_persona(persona.id),
+        ["id", "fecha", "hora", "estado"],
+        lambda t: [
+            t.id,
+            t.fecha.isoformat(),
+            texto_hora(t.hora),
+            t.estado.value,
+        ],
+        f"turnos_{persona.nombre}.csv",
+    )
+
+
+def csv_turnos_cancelados_por_persona(db: Session, min: int = 5) -> Reporte:
+    return Reporte(
+        _personas_con_cancelados(min),
+        ["dni", "nombre", "cancelados_ultimos_6_meses"],
+        lambda r: [r.dni, r.nombre, r.cantidad_cancelados],
+        f"personas_con_{min}_o_mas_cancelados.csv",
+    )
+
+
+def csv_turnos_confirmados(db: Session, desde: date, hasta: date) -> Reporte:
+    return Reporte(
+        _turnos_confirmados(desde, hasta),
+        ["dni", "nombre", "id_turno", "fecha", "hora"],
+        lambda t: [
+            t.persona.dni,
+            t.persona.nombre,
+            t.id,
+            t.fecha.isoformat(),
+            texto_hora(t.hora),
+        ],
+        f"turnos_confirmados_{desde}_a_{hasta}.csv",
+    )
+
+
+def csv_estado_personas(db: Session, habilitada: bool) -> Reporte:
+    estado = "habilitadas" if habilitada else "no_habilitadas"
+    return Reporte(
+        _personas_por_estado(habilitada),
+        ["dni", "nombre", "email", "telefono", "habilitado"],
+        lambda p: [p.dni, p.nombre, p.email, p.telefono, p.habilitado],
+        f"personas_{estado}.csv",
+    )
+
+
+# --------- Reportes PDF --------- #
+
+def pdf_turnos_por_fecha(db: Session, fecha: date) -> Reporte:
+    return Reporte(
+        _turnos_por_fecha(fecha),
+        COLUMNAS_TURNOS_POR_FECHA,
+        lambda t: [
+            t.persona.dni,
+            t.persona.nombre,
+            t.id,
+            t.fecha,
+            texto_hora(t.hora),
+            t.estado.value,
+        ],
+        f"turnos_{fecha.isoformat()}.pdf",
+        f"Turnos del día {fecha.isoformat()}",
+    )
+
+
+def pdf_turnos_cancelados_por_mes(db: Session) -> Reporte:
+    inicio, fin = _mes_actual()
+    return Reporte(
+        _turnos_cancelados_del_mes(inicio, fin),
+        COLUMNAS_TURNOS_CANCELADOS_POR_MES,
+        lambda t: [
+            t.id,
+            t.persona.dni,
+            t.persona.nombre,
+            t.fecha,
+            texto_hora(t.hora),
+        ],
+        PDF_TURNOS_CANCELADOS_MES,
+        f"Turnos cancelados del mes {inicio.month}/{inicio.year}",
+    )
+
+
+def pdf_turnos_por_persona(db: Session, dni: int) -> Reporte:
+    persona = persona_por_dni_o_404(db, dni)
+    return Reporte(
+        _turnos_de_persona(persona.id),
+        COLUMNAS_TURNOS_POR_PERSONA,
+        lambda t: [
+            t.id,
+            t.fecha,
+            texto_hora(t.hora),
+            t.estado.value,
+        ],
+        f"turnos_{persona.nombre}.pdf",
+        f"Turnos de {persona.nombre} (DNI: {persona.dni})",
+    )
+
+
+def pdf_turnos_cancelados_por_persona(db: Session, min: int = 5) -> Reporte:
+    return Reporte(
+        _personas_con_cancelados(min),
+        COLUMNAS_TURNOS_CANCELADOS_PERSONAS,
+        lambda r: [r.dni, r.nombre, r.cantidad_cancelados],
+        f"personas_con_{min}_o_mas_cancelados.pdf",
+        f"Personas con {min} o más turnos cancelados en los últimos 6 meses",
+    )
+
+
+def pdf_turnos_confirmados(db: Session, desde: date, hasta: date, tamanio: int, pagina: int) -> Reporte:
+    if pagina < 1:
+        pagina = 1
+    if tamanio < 1:
+        tamanio = 50
+
+    consulta = _turnos_confirmados(desde, hasta)
+    total = consulta(db).count()
+
+    return Reporte(
+        lambda sesion: consulta(sesion).offset((pagina - 1) * tamanio).limit(tamanio),
+        COLUMNAS_TURNOS_CONFIRMADOS,
+        lambda t: [
+            t.persona.dni,
+            t.persona.nombre,
+            t.id,
+            t.fecha,
+            texto_hora(t.hora),
+        ],
+        f"turnos_confirmados_{desde}_a_{hasta}_p{pagina}.pdf",
+        f"Turnos confirmados entre {desde} y {hasta} (página {pagina}) - Total: {total}",
+    )
+
+
+def pdf_estado_personas(db: Session, habilitada: bool) -> Reporte:
+    if len(COLUMNAS_ESTADO_PERSONAS) != 5:
+        raise RuntimeError("La variable COLUMNAS_ESTADO_PERSONAS debe tener 5 valores separados por coma")
+
+    estado = VARIABLE_HABILITADA if habilitada else VARIABLE_NO_HABILITADA
+    return Reporte(
+        _personas_por_estado(habilitada),
+        COLUMNAS_ESTADO_PERSONAS,
+        lambda p: [
+            p.dni,
+            p.nombre,
+            p.email,
+            p.telefono,
+            SI if p.habilitado else NO,
+        ],
+        f"personas_{estado.replace(' ', '_')}.pdf",
+        f"Personas {estado}",
+    )
+
+
+# Catálogo por formato y nombre (el mismo nombre que el path del endpoint). Los trabajos en segundo plano
+# solo viajan al pool como (formato, nombre, parámetros), que se pueden serializar entre procesos.
+REPORTES: Dict[str, Dict[str, Callable[..., Reporte]]] = {
+    "csv": {
+        "turnos-por-fecha": csv_turnos_por_fecha,
+        "turnos-cancelados-por-mes": csv_turnos_cancelados_por_mes,
+        "turnos-por-persona": csv_turnos_por_persona,
+        "turnos-cancelados": csv_turnos_cancelados_por_persona,
+        "turnos-confirmados": csv_turnos_confirmados,
+        "estado-personas": csv_estado_personas,
+    },
+    "pdf": {
+        "turnos-por-fecha": pdf_turnos_por_fecha,
+        "turnos-cancelados-por-mes": pdf_turnos_cancelados_por_mes,
+        "turnos-por-persona": pdf_turnos_por_persona,
+        "turnos-cancelados": pdf_turnos_cancelados_por_persona,
+        "turnos-confirmados": pdf_turnos_confirmados,
+        "estado-personas": pdf_estado_personas,
+    },
+}
+
+MEDIA_TYPES = {"csv": "text/csv", "pdf": "application/pdf"}
+
+# Tablas que lee cada reporte (las versiones de estas tablas forman parte de la clave del cache)
+TABLAS_REPORTE: Dict[str, tuple] = {
+    "turnos-por-fecha": ("personas", "turnos"),
+    "turnos-cancelados-por-mes": ("personas", "turnos"),
+    "turnos-por-persona": ("personas", "turnos"),
+    "turnos-cancelados": ("personas", "turnos", "estadisticas_turnos_diarias"),
+    "turnos-confirmados": ("personas", "turnos"),
+    "estado-personas": ("personas",),
+}
+
+
+# --------- Respuestas síncronas --------- #
+
+def _pdf_tabla(columnas: List[str], filas, titulo: Optional[str]) -> bytes:
+# borb (Utilidades/exportacion_pdf.py) se importa recién con el primer PDF, no al levantar la app.
+
+    from Utilidades.exportacion_pdf import generar_pdf_tabla
+    return generar_pdf_tabla(columnas, filas, titulo=titulo)
+
+
+def respuesta_csv_reporte(reporte: Reporte) -> StreamingResponse:
+# CSV en streaming con la sesión propia de respuesta_csv.
+
+    return respuesta_csv(reporte.consulta, reporte.columnas, reporte.fila, reporte.archivo)
+
+
+def generar_pdf_reporte(db: Session, reporte: Reporte) -> bytes:
+# Genera el PDF paginado dentro del request. Si la consulta no trae filas lanza 404 (MSG_SIN_DATOS).
+
+    filas = filas_o_404(map(reporte.fila, reporte.consulta(db).yield_per(PDF_YIELD_PER)), MSG_SIN_DATOS)
+    return _pdf_tabla(reporte.columnas, filas, reporte.titulo)
+
+
+# --------- Render en un proceso del pool de trabajos --------- #
+
+def _nombre_seguro(nombre: str) -> str:
+# El nombre del archivo puede incluir datos de la persona: se dejan solo caracteres seguros para el disco.
+
+    return re.sub(r"[^\w.-]", "_", nombre)
+
+
+def renderizar_reporte(trabajo_id: str, formato: str, nombre: str, parametros: dict, carpeta: str) -> dict:
+# Se ejecuta en un proceso del pool: abre su propia sesión, escribe el archivo en la carpeta del formato
+# (primero en un .tmp, así nunca se descarga uno a medio escribir) y devuelve un dict con el resultado.
+# Los errores se devuelven como datos (status_code y detalle) en lugar de excepciones, para no depender
+# de que la excepción se pueda serializar de vuelta al proceso del API.
+
+    db = SessionLocal()
+    temporal = None
+    try:
+        reporte = REPORTES[formato][nombre](db, **parametros)
+
+        cantidad = 0
+
+        def filas():
+            nonlocal cantidad
+            for fila in map(reporte.fila, reporte.consulta(db).yield_per(PDF_YIELD_PER)):
+                cantidad += 1
+                yield fila
+
+        filas_reporte = filas_o_404(filas(), MSG_SIN_DATOS)
+
+        os.makedirs(carpeta, exist_ok=True)
+        ruta = os.path.join(carpeta, f"{trabajo_id}_{_nombre_seguro(reporte.archivo)}")
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as archivo:
+            if formato == "csv":
+                for bloque in generar_csv(reporte.columnas, filas_reporte):
+                    archivo.write(bloque)
+            else:
+                archivo.write(_pdf_tabla(reporte.columnas, filas_reporte, reporte.titulo))
+        os.replace(temporal, ruta)
+
+        return {"ok": True, "archivo": reporte.archivo, "ruta": ruta, "filas": cantidad}
+
+    except HTTPException as e:
+        return {"ok": False, "status_code": e.status_code, "detalle": e.detail}
+    except Exception as e:
+        if temporal and os.path.exists(temporal):
+            os.remove(temporal)
+        return {"ok": False, "status_code": 500, "detalle": f"Error generando el reporte: {e}"}
+    finally:
+        db.close()
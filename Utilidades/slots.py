@@ -0,0 +1,89 @@
+from datetime import datetime, time as time_cls
+from typing import Dict, List, Optional, Tuple
+
+from Utilidades.configuracion import config
+
+# Configuración de la grilla desde .env
+HORA_MODELO: str = config.HORA_MODELO
+SLOT_START_STR = config.SLOT_START
+SLOT_END_STR = config.SLOT_END
+SLOT_STEP_MIN = config.SLOT_STEP_MIN
+
+# La grilla de turnos se arma una sola vez al importar: un slot cada SLOT_STEP_MIN minutos desde SLOT_START,
+# mientras termine a más tardar en SLOT_END. Validar una hora, pasarla a texto o ubicarla en el bitmap de ocupación
+# (Utilidades/ocupacion.py) son búsquedas en diccionarios, sin strptime/strftime por pedido.
+
+
+def _minutos(hora: time_cls) -> int:
+    return hora.hour * 60 + hora.minute
+
+
+def _generar_grilla() -> Tuple[time_cls, ...]:
+    inicio = _minutos(datetime.strptime(SLOT_START_STR, HORA_MODELO).time())
+    fin = _minutos(datetime.strptime(SLOT_END_STR, HORA_MODELO).time())
+    # el último slot tiene que terminar a más tardar en SLOT_END
+    return tuple(time_cls(m // 60, m % 60) for m in range(inicio, fin - SLOT_STEP_MIN + 1, SLOT_STEP_MIN))
+
+
+# Horas de inicio de cada slot, en orden, y sus textos (['09:00', '09:30', ..., '16:30'] por defecto)
+HORAS: Tuple[time_cls, ...] = _generar_grilla()
+SLOTS: Tuple[str, ...] = tuple(h.strftime(HORA_MODELO) for h in HORAS)
+
+INDICE_POR_TEXTO: Dict[str, int] = {s: i for i, s in enumerate(SLOTS)}
+INDICE_POR_HORA: Dict[time_cls, int] = {h: i for i, h in enumerate(HORAS)}
+
+# Cache de textos de horas: empieza con la grilla y suma las horas fuera de ella que lleguen de la BD
+_TEXTO_POR_HORA: Dict[time_cls, str] = dict(zip(HORAS, SLOTS))
+_TEXTOS_MAX = 4096
+
+_INICIO_MIN = _minutos(HORAS[0]) if HORAS else 0
+
+
+def indice_de_texto(hhmm: str) -> Optional[int]:
+# Índice del slot para un texto exactamente como lo genera la grilla ("09:30"), o None.
+
+    return INDICE_POR_TEXTO.get(hhmm)
+
+
+def indice_de_hora(hora: time_cls) -> Optional[int]:
+# Índice del slot que empieza a esa hora, o None si no está en la grilla.
+
+    return INDICE_POR_HORA.get(hora)
+
+
+def texto_hora(hora: time_cls) -> str:
+# hora.strftime(HORA_MODELO) con cache: las horas de la grilla (casi todas) ya están calculadas.
+
+    texto = _TEXTO_POR_HORA.get(hora)
+    if texto is None:
+        texto = hora.strftime(HORA_MODELO)
+        if len(_TEXTO_POR_HORA) < _TEXTOS_MAX:
+            _TEXTO_POR_HORA[hora] = texto
+    return texto
+
+
+def alineada_a_la_grilla(hora: time_cls) -> bool:
+# Si la hora cae en un múltiplo de SLOT_STEP_MIN contado desde SLOT_START (aunque quede fuera de la franja).
+
+    return hora.second == 0 and hora.microsecond == 0 and (_minutos(hora) - _INICIO_MIN) % SLOT_STEP_MIN == 0
+
+
+def _descripcion_paso() -> str:
+    # "HH:00 o HH:30" si la grilla cae siempre en los mismos minutos de cada hora; si no, desde dónde se cuenta
+    if 60 % SLOT_STEP_MIN == 0:
+        minutos = [f"HH:{m:02d}" for m in range(_INICIO_MIN % SLOT_STEP_MIN, 60, SLOT_STEP_MIN)]
+        return minutos[0] if len(minutos) == 1 else ", ".join(minutos[:-1]) + " o " + minutos[-1]
+    return f"desde {SLOTS[0]}" if SLOTS else SLOT_START_STR
+
+
+# Mensajes de error de parsear_hora (Utilidades/utils.py) armados con la grilla configurada
+MSG_HORA_FUERA_DE_PASO = f"La hora debe ser cada {SLOT_STEP_MIN} minutos ({_descripcion_paso()})."
+MSG_HORA_FUERA_DE_FRANJA = (
+    f"Horario fuera de franja ({SLOTS[0]} a {SLOTS[-1]})." if SLOTS else "No hay horarios configurados."
+)
+
+
+def slots_de_mascara(mascara: int) -> List[str]:
+# Textos de los slots cuyo bit está apagado, en orden (los horarios libres de un bitmap de ocupación).
+
+    return [s for i, s in enumerate(SLOTS) if not (mascara >> i) & 1]
@@ -0,0 +1,256 @@
+import json
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from Utilidades.configuracion import config
+from Utilidades.cache_reportes import (REPORTES_CACHE, EntradaReporte, cache_reportes, cachear_streaming, leer_versiones,
+respuesta_desde_cache)
+from Utilidades.reportes import (REPORTES, TABLAS_REPORTE, MEDIA_TYPES, renderizar_reporte, respuesta_csv_reporte,
+generar_pdf_reporte)
+from Utilidades.utils import REPORT_CSV_DIR, REPORT_PDF_DIR
+
+logger = logging.getLogger(__name__)
+
+# Configuración de la cola de reportes desde .env
+REPORTES_WORKERS = config.REPORTES_WORKERS
+REPORTES_TRABAJOS_TTL_SEG = config.REPORTES_TRABAJOS_TTL_SEG
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_EN_PROCESO = "en_proceso"
+ESTADO_TERMINADO = "terminado"
+ESTADO_ERROR = "error"
+
+
+# Los trabajos se guardan como <id>.json en la carpeta del formato, junto al archivo que generan: cualquier
+# worker del API puede consultar o descargar un trabajo encolado en otro (con varios hosts, REPORT_CSV_DIR y
+# REPORT_PDF_DIR tienen que estar en un volumen compartido). El estado lo escribe el proceso del pool.
+_ID_TRABAJO = re.compile(r"[0-9a-f]{32}")
+_CARPETAS = {"csv": REPORT_CSV_DIR, "pdf": REPORT_PDF_DIR}
+
+
+class TrabajoReporte:
+# Un pedido de reporte encolado. El archivo lo escribe un proceso del pool; acá solo queda el estado.
+
+    def __init__(self, formato: str, reporte: str, parametros: dict):
+        self.id = uuid.uuid4().hex
+        self.formato = formato
+        self.reporte = reporte
+        self.parametros = parametros
+        self.estado = ESTADO_PENDIENTE
+        self.creado = datetime.now()
+        self.terminado: Optional[datetime] = None
+        self.archivo: Optional[str] = None
+        self.ruta: Optional[str] = None
+        self.filas: Optional[int] = None
+        self.status_code: Optional[int] = None
+        self.detalle: Optional[str] = None
+
+    @property
+    def ruta_estado(self) -> str:
+        return _ruta_estado(_CARPETAS[self.formato], self.id)
+
+    def como_dict(self) -> Dict[str, object]:
+        return {
+            "id": self.id,
+            "formato": self.formato,
+            "reporte": self.reporte,
+            "parametros": self.parametros,
+            "estado": self.estado,
+            "creado": self.creado,
+            "terminado": self.terminado,
+            "filas": self.filas,
+            "detalle": self.detalle,
+            "descarga": f"/reportes/trabajos/{self.id}/archivo" if self.estado == ESTADO_TERMINADO else None,
+        }
+
+    def aplicar_resultado(self, resultado: dict) -> None:
+    # Resultado de renderizar_reporte (o el error armado si el proceso del pool murió).
+
+        if resultado["ok"]:
+            self.estado = ESTADO_TERMINADO
+            self.archivo = resultado["archivo"]
+            self.ruta = resultado["ruta"]
+            self.filas = resultado["filas"]
+        else:
+            self.estado = ESTADO_ERROR
+            self.status_code = resultado["status_code"]
+            self.detalle = resultado["detalle"]
+        self.terminado = datetime.now()
+
+    def guardar(self) -> None:
+    # Se escribe en un .tmp y se reemplaza: ningún worker lee un estado a medio escribir.
+
+        datos = jsonable_encoder({
+            **self.como_dict(), "archivo": self.archivo, "ruta": self.ruta, "status_code": self.status_code,
+        })
+        datos.pop("descarga")
+        os.makedirs(os.path.dirname(self.ruta_estado) or ".", exist_ok=True)
+        temporal = self.ruta_estado + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(datos, archivo)
+        os.replace(temporal, self.ruta_estado)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> Optional["TrabajoReporte"]:
+        try:
+            with open(ruta, encoding="utf-8") as archivo:
+                datos = json.load(archivo)
+        except (OSError, ValueError):
+            return None
+        trabajo = cls(datos["formato"], datos["reporte"], datos["parametros"])
+        trabajo.id = datos["id"]
+        trabajo.estado = datos["estado"]
+        trabajo.creado = datetime.fromisoformat(datos["creado"])
+        trabajo.terminado = datetime.fromisoformat(datos["terminado"]) if datos["terminado"] else None
+        for campo in ("archivo", "ruta", "filas", "status_code", "detalle"):
+            setattr(trabajo, campo, datos[campo])
+        return trabajo
+
+
+def _ruta_estado(carpeta: str, trabajo_id: str) -> str:
+    return os.path.join(carpeta, f"{trabajo_id}.json")
+
+
+def generar_trabajo(trabajo_id: str, formato: str, reporte: str, parametros: dict, carpeta: str) -> None:
+# Se ejecuta en un proceso del pool: marca el trabajo en proceso, genera el archivo y guarda el resultado.
+
+    trabajo = TrabajoReporte.cargar(_ruta_estado(carpeta, trabajo_id))
+    if trabajo is None:
+        return
+    trabajo.estado = ESTADO_EN_PROCESO
+    trabajo.guardar()
+    trabajo.aplicar_resultado(renderizar_reporte(trabajo_id, formato, reporte, parametros, carpeta))
+    trabajo.guardar()
+
+
+class ColaReportes:
+# Cola de reportes en segundo plano sobre un ProcessPoolExecutor, para que generar un PDF o CSV grande
+# no ocupe un worker del API. El pool se crea recién con el primer trabajo y usa "spawn": cada proceso
+# importa los módulos y abre su propio engine en lugar de heredar las conexiones del proceso del API.
+
+    def __init__(self, workers: int = REPORTES_WORKERS, ttl_seg: int = REPORTES_TRABAJOS_TTL_SEG):
+        self._workers = max(1, workers)
+        self._ttl = ttl_seg
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _ejecutor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def encolar(self, formato: str, reporte: str, parametros: dict) -> TrabajoReporte:
+    # Registra el trabajo y lo manda al pool. Los parámetros tienen que poder serializarse (fechas, números, bool).
+
+        self._purgar_vencidos()
+
+        trabajo = TrabajoReporte(formato, reporte, parametros)
+        trabajo.guardar()
+
+        argumentos = (generar_trabajo, trabajo.id, formato, reporte, parametros, _CARPETAS[formato])
+        with self._lock:
+            try:
+                futuro = self._ejecutor().submit(*argumentos)
+            except BrokenProcessPool:
+                # un proceso del pool murió (p. ej. sin memoria): se descarta el pool y se crea otro
+                self._pool = None
+                futuro = self._ejecutor().submit(*argumentos)
+        futuro.add_done_callback(lambda f: self._terminar(trabajo, f))
+        return trabajo
+
+    def _terminar(self, trabajo: TrabajoReporte, futuro: Future) -> None:
+        try:
+            futuro.result()
+        except Exception as e:
+            # el proceso murió o el pool se cerró: generar_trabajo no llegó a guardar el resultado
+            logger.warning("Trabajo de reporte %s falló: %s", trabajo.id, e)
+            trabajo.aplicar_resultado({"ok": False, "status_code": 500, "detalle": "Error interno generando el reporte"})
+            trabajo.guardar()
+
+    def obtener(self, trabajo_id: str) -> Optional[TrabajoReporte]:
+        if not _ID_TRABAJO.fullmatch(trabajo_id):
+            return None
+        for carpeta in _CARPETAS.values():
+            trabajo = TrabajoReporte.cargar(_ruta_estado(carpeta, trabajo_id))
+            if trabajo is not None:
+                return trabajo
+        return None
+
+    def _purgar_vencidos(self) -> None:
+    # Borra los trabajos terminados hace más de REPORTES_TRABAJOS_TTL_SEG y sus archivos.
+
+        limite = datetime.now() - timedelta(seconds=self._ttl)
+        for carpeta in _CARPETAS.values():
+            if not os.path.isdir(carpeta):
+                continue
+            for nombre in os.listdir(carpeta):
+                if not (nombre.endswith(".json") and _ID_TRABAJO.fullmatch(nombre[:-5])):
+                    continue
+                trabajo = TrabajoReporte.cargar(os.path.join(carpeta, nombre))
+                if trabajo is None or trabajo.terminado is None or trabajo.terminado >= limite:
+                    continue
+                for ruta in (trabajo.ruta, trabajo.ruta_estado):
+                    if ruta and os.path.exists(ruta):
+                        try:
+                            os.remove(ruta)
+                        except OSError as e:
+                            logger.warning("No se pudo borrar %s: %s", ruta, e)
+
+    def cerrar(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Cola compartida por los endpoints de reportes
+cola_reportes = ColaReportes()
+
+
+def responder_reporte(formato: str, nombre: str, db: Session, asincrono: bool, if_none_match: Optional[str] = None, **parametros):
+# Con asincrono=True encola el reporte y devuelve 202 con el trabajo. Si no, lo busca en el cache de reportes
+# (clave: formato, nombre, parámetros, versiones de las tablas que lee y fecha del día) y si no está lo genera
+# en el request y lo guarda. Las respuestas desde el cache llevan ETag y respetan If-None-Match (304).
+
+    clave = None
+    if REPORTES_CACHE and not asincrono:
+        versiones = leer_versiones(db, TABLAS_REPORTE[nombre])
+        clave = cache_reportes.clave(formato, nombre, parametros, versiones)
+        entrada = cache_reportes.obtener(clave)
+        if entrada is not None:
+            return respuesta_desde_cache(entrada, if_none_match)
+
+    # Se arma el reporte del catálogo también para encolarlo: así los parámetros se validan en el request
+    # (p. ej. 404 si la persona no existe)
+    reporte = REPORTES[formato][nombre](db, **parametros)
+
+    if asincrono:
+        trabajo = cola_reportes.encolar(formato, nombre, parametros)
+        return JSONResponse(status_code=202, content=jsonable_encoder(trabajo.como_dict()))
+
+    if formato == "csv":
+        respuesta = respuesta_csv_reporte(reporte)
+        if clave is None:
+            return respuesta
+        return cachear_streaming(respuesta, clave, MEDIA_TYPES["csv"], reporte.archivo)
+
+    contenido = generar_pdf_reporte(db, reporte)
+    if clave is None:
+        entrada = EntradaReporte(contenido, MEDIA_TYPES["pdf"], reporte.archivo)
+    else:
+        entrada = cache_reportes.guardar(clave, contenido, MEDIA_TYPES["pdf"], reporte.archivo)
+    return respuesta_desde_cache(entrada, if_none_match)
@@ -1,40 +1,27 @@
 import re
-import os
-from io import BytesIO
-from datetime import date, datetime, timedelta, time as time_cls
+import json
+import base64
+from datetime import datetime, time as time_cls
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from typing import Iterable, List, Optional
+from sqlalchemy.exc import IntegrityError
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional
 
-from BaseDatos.database import SessionLocal
-from Modelos.models import Persona, Turno
-
-from dotenv import load_dotenv
-from borb.pdf import SingleColumnLayout
-from borb.pdf import Document
-from borb.pdf.page.page import Page
-from borb.pdf.pdf import PDF
-from borb.pdf.canvas.layout.text.paragraph import Paragraph
-from borb.pdf.canvas.layout.table.fixed_column_width_table import FixedColumnWidthTable
-from borb.pdf.canvas.layout.table.table import TableCell
-from borb.pdf.canvas.layout.layout_element import Alignment
-
-
-# Carga variables de entorno
-load_dotenv()
+from Utilidades.configuracion import config
+from BaseDatos.database import SessionLocal, AsyncSessionLocal
+from Utilidades.slots import (HORAS, INDICE_POR_HORA, indice_de_texto, alineada_a_la_grilla,
+MSG_HORA_FUERA_DE_PASO, MSG_HORA_FUERA_DE_FRANJA)
+from Modelos.models import Persona, Turno, IX_TURNO_ACTIVO_FECHA_HORA
 
 # Configuración de reportes desde .env
-CSV_SEPARATOR: str = os.getenv("CSV_SEPARATOR", ";")
-REPORT_CSV_DIR: str = os.getenv("REPORT_CSV_DIR", "CSV")
-REPORT_PDF_DIR: str = os.getenv("REPORT_PDF_DIR", "PDF")
-HORA_MODELO: str = os.getenv("HORA_MODELO", "%H:%M")
-SLOT_START_STR = os.getenv("SLOT_START", "09:00")
-SLOT_END_STR = os.getenv("SLOT_END", "17:00")
-SLOT_STEP_MIN = int(os.getenv("SLOT_STEP_MIN", "30"))
-SLOT_START: time_cls = datetime.strptime(SLOT_START_STR, HORA_MODELO).time()
-SLOT_END: time_cls = datetime.strptime(SLOT_END_STR, HORA_MODELO).time()
-EMAIL_REGEX = os.getenv("EMAIL_REGEX")
-PDF_FILAS_POR_PAGINA = int(os.getenv("PDF_FILAS_POR_PAGINA", "25"))
+CSV_SEPARATOR: str = config.CSV_SEPARATOR
+REPORT_CSV_DIR: str = config.REPORT_CSV_DIR
+REPORT_PDF_DIR: str = config.REPORT_PDF_DIR
+HORA_MODELO: str = config.HORA_MODELO
+EMAIL_REGEX = config.EMAIL_REGEX
+PDF_YIELD_PER = config.PDF_YIELD_PER
+PAGINACION_LIMITE_MAX = config.PAGINACION_LIMITE_MAX
 
 
 # --------- Sesión de base de datos --------- #
@@ -49,6 +36,16 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+# Versión asíncrona de get_db para el modo DB_ASYNC. Usa AsyncSessionLocal y la cierra al final del request.
+
+    if AsyncSessionLocal is None:
+        raise RuntimeError("El modo asíncrono no está habilitado (DB_ASYNC=true)")
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # --------- Validador de email --------- #
 
 EMAIL_RE = re.compile(EMAIL_REGEX)
@@ -68,28 +65,24 @@ def validar_email(email: str) -> None:
 
 
 def _validar_slot(hora: time_cls) -> None:
-# Verifica que la hora sea múltiplo de 30 minutos dentro de la franja permitida.
-    
-    if hora.minute not in (0, 30) or hora.second != 0 or hora.microsecond != 0:
-        raise HTTPException(
-            status_code=422,
-            detail="La hora debe ser cada 30 minutos (HH:00 o HH:30)."
-        )
+# Verifica que la hora sea un slot de la grilla (Utilidades/slots.py): cada SLOT_STEP_MIN minutos dentro de la franja.
 
-    ultimo_inicio = (
-        datetime.combine(date.today(), SLOT_END) - timedelta(minutes=SLOT_STEP_MIN)
-    ).time()
-
-    if not (SLOT_START <= hora <= ultimo_inicio):
-        raise HTTPException(
-            status_code=422,
-            detail="Horario fuera de franja (09:00 a 16:30)."
-        )
+    if hora in INDICE_POR_HORA:
+        return
+    if not alineada_a_la_grilla(hora):
+        raise HTTPException(status_code=422, detail=MSG_HORA_FUERA_DE_PASO)
+    raise HTTPException(status_code=422, detail=MSG_HORA_FUERA_DE_FRANJA)
 
 
 def parsear_hora(hhmm: str) -> time_cls:
 # Parsea una hora en formato HH:MM, valida el slot y devuelve un objeto time.
-    
+# Los textos de la grilla ("09:30") se resuelven con un diccionario; strptime queda para el resto
+# (otras grafías como "9:30" y los errores).
+
+    indice = indice_de_texto(hhmm)
+    if indice is not None:
+        return HORAS[indice]
+
     try:
         hora = datetime.strptime(hhmm, HORA_MODELO).time()
     except ValueError:
@@ -101,31 +94,38 @@ def parsear_hora(hhmm: str) -> time_cls:
     return hora
 
 
-def generar_slots_30min() -> List[str]:
-# Genera una lista de strings con todos los horarios válidos: ['09:00', '09:30', ..., '16:30'].
-    
-    slots: List[str] = []
-    h, m = SLOT_START.hour, SLOT_START.minute
-    ultimo_inicio = (
-        datetime.combine(date.today(), SLOT_END) - timedelta(minutes=SLOT_STEP_MIN)
-    ).time()
+# --------- Paginación por cursor (keyset) --------- #
+
+def codificar_cursor(valores: List[object]) -> str:
+# Codifica los valores de la clave de orden de la última fila en un cursor opaco (base64 url-safe).
+
+    crudo = json.dumps(valores, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
 
-    while True:
-        slots.append(time_cls(h, m).strftime(HORA_MODELO))
-        m += SLOT_STEP_MIN
-        if m >= 60:
-            m -= 60
-            h += 1
-        if time_cls(h, m) > ultimo_inicio:
-            break
-    return slots
 
+def decodificar_cursor(cursor: str, cantidad: int) -> List[object]:
+# Decodifica un cursor generado por codificar_cursor. Lanza HTTPException 400 si es inválido.
 
-SLOTS_FIJOS = set(generar_slots_30min())
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if not isinstance(valores, list) or len(valores) != cantidad:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return valores
 
 
 # --------- Helpers de consulta --------- #
 
+def es_colision_horario(error: IntegrityError) -> bool:
+# Indica si el IntegrityError proviene del índice único de turnos activos por fecha y hora.
+# SQLite informa las columnas y PostgreSQL el nombre del índice.
+
+    mensaje = str(error.orig)
+    return IX_TURNO_ACTIVO_FECHA_HORA in mensaje or "turnos.fecha, turnos.hora" in mensaje
+
+
 def persona_por_dni_o_404(db: Session, dni: int) -> Persona:
 # Busca una persona por DNI. Si no existe, lanza HTTPException 404.
 
@@ -143,49 +143,12 @@ def turno_o_404(db: Session, turno_id: int) -> Turno:
         raise HTTPException(status_code=404, detail="Turno no encontrado")
     return turno
 
-def generar_pdf_tabla(columnas: Iterable[str], filas: Iterable[Iterable[object]], titulo: Optional[str] = None,) -> bytes:
-# Genera un PDF en memoria con un título opcional y una tabla de datos. Devuelve los bytes del PDF para ser usados en un StreamingResponse.
-    
-    try:
-        doc = Document()
-        page = Page()
-        doc.add_page(page)
-
-        layout = SingleColumnLayout(page)
-
-        cantidad = len(filas)
-
-        # Título
-        if titulo:
-            layout.add(Paragraph(titulo, horizontal_alignment=Alignment.CENTERED))
-            layout.add(Paragraph(" "))  # línea en blanco
-        
-        layout.add(Paragraph(f"Cantidad de registros: {cantidad}", horizontal_alignment=Alignment.CENTERED))
-
-        columnas = list(columnas)
-        filas = list(filas)
-
-        tabla = FixedColumnWidthTable(
-            number_of_columns=len(columnas),
-            number_of_rows=len(filas) + 1,  # +1 por la fila de encabezados
-        )
-
-        # Encabezados
-        for c in columnas:
-            tabla.add(TableCell(Paragraph(str(c), horizontal_alignment=Alignment.CENTERED)))
-
-        # Filas de datos
-        for fila in filas:
-            for valor in fila:
-                tabla.add(TableCell(Paragraph(str(valor), horizontal_alignment=Alignment.CENTERED)))
-
-        layout.add(tabla)
 
-        buffer = BytesIO()
-        PDF.dumps(buffer, doc)
-        return buffer.getvalue()
+def filas_o_404(filas: Iterable[object], detalle: Optional[str]) -> Iterator[object]:
+# Lee la primera fila de un iterable sin consumir el resto. Si no hay filas lanza HTTPException 404 con el detalle indicado.
 
-    except Exception as e:
-        # Esto se transforma en HTTP 500 en el endpoint
-        raise RuntimeError(f"Error generando PDF con tabla: {e}")
-    
\ No newline at end of file
+    iterador = iter(filas)
+    primera = next(iterador, None)
+    if primera is None:
+        raise HTTPException(status_code=404, detail=detalle)
+    return chain([primera], iterador)
@@ -0,0 +1,65 @@
+"""
+Configuración común de los tests: una base SQLite temporal (la crean las migraciones al iniciar la app),
+carpetas temporales para los reportes y sin cache de reportes, para que cada pedido ejecute sus propias
+consultas. Las variables se definen antes de importar los módulos del proyecto, que las leen una sola vez
+(Utilidades/configuracion.py).
+
+Uso (desde la raíz del repo):
+    python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+from typing import List
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'tests.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["DB_ASYNC"] = "false"
+os.environ["DB_ESQUEMA_AL_INICIAR"] = "migrar"
+os.environ["REPORTES_CACHE"] = "false"
+os.environ["REPORT_CSV_DIR"] = os.path.join(_tmp.name, "CSV")
+os.environ["REPORT_PDF_DIR"] = os.path.join(_tmp.name, "PDF")
+sys.path.insert(0, RAIZ)
+
+
+class ContadorConsultas:
+# Sentencias SQL ejecutadas por el engine (evento before_cursor_execute) desde el último reiniciar().
+
+    def __init__(self):
+        self.sentencias: List[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.sentencias.append(statement)
+
+    def reiniciar(self) -> None:
+        self.sentencias.clear()
+
+    @property
+    def cantidad(self) -> int:
+        return len(self.sentencias)
+
+
+@pytest.fixture(scope="session")
+def cliente():
+    from fastapi.testclient import TestClient
+    from app import ROUTERS, crear_app
+
+    # Con `with` corre el ciclo de vida de la app, que aplica las migraciones
+    with TestClient(crear_app(ROUTERS)) as c:
+        yield c
+
+
+@pytest.fixture
+def consultas(cliente):
+    from sqlalchemy import event
+    from BaseDatos.database import engine
+
+    contador = ContadorConsultas()
+    event.listen(engine, "before_cursor_execute", contador)
+    yield contador
+    event.remove(engine, "before_cursor_execute", contador)
@@ -0,0 +1,61 @@
+"""
+Cantidad de sentencias SQL por pedido en los listados y reportes que se resuelven con una sola consulta
+(personas y turnos en el mismo SELECT, sin una consulta por fila).
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from Utilidades.slots import SLOTS
+
+FECHA = date.today() + timedelta(days=7)
+PERSONAS = 4
+
+
+@pytest.fixture(scope="module")
+def turnos_del_dia(cliente):
+    ids = []
+    for i in range(PERSONAS):
+        dni = 9100 + i
+        r = cliente.post("/personas", json={
+            "nombre": f"Persona {i}", "email": f"consultas{i}@test.com", "dni": dni,
+            "telefono": "1234", "fecha_Nacimiento": "1990-05-01",
+        })
+        assert r.status_code == 201, r.text
+        r = cliente.post("/turnos", json={"fecha": FECHA.isoformat(), "hora": SLOTS[i], "persona_dni": dni})
+        assert r.status_code == 201, r.text
+        ids.append(r.json()["id"])
+    return ids
+
+
+def test_listado_de_turnos_una_consulta(cliente, turnos_del_dia, consultas):
+    consultas.reiniciar()
+    r = cliente.get("/turnos")
+
+    assert r.status_code == 200
+    assert {t["id"] for t in r.json()} >= set(turnos_del_dia)
+    assert consultas.cantidad == 1, consultas.sentencias
+
+
+@pytest.mark.parametrize("url", [
+    "/reportes/turnos-por-fecha",
+    "/reportes/csv/turnos-por-fecha",
+    "/reportes/pdf/turnos-por-fecha",
+])
+def test_turnos_por_fecha_una_consulta(cliente, turnos_del_dia, consultas, url):
+    consultas.reiniciar()
+    r = cliente.get(url, params={"fecha": FECHA.isoformat()})
+
+    assert r.status_code == 200, r.text
+    assert len(r.content) > 0
+    assert consultas.cantidad == 1, consultas.sentencias
+
+
+def test_sin_cache_no_se_versionan_tablas(cliente, turnos_del_dia, consultas):
+    # Con REPORTES_CACHE=false (conftest) las escrituras no tocan versiones_tablas
+    consultas.reiniciar()
+    r = cliente.put(f"/turnos/{turnos_del_dia[-1]}/confirmar")
+
+    assert r.status_code == 200, r.text
+    assert consultas.cantidad > 0
+    assert not any("versiones_tablas" in s for s in consultas.sentencias), consultas.sentencias
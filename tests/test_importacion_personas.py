@@ -0,0 +1,37 @@
+"""
+POST /personas/importar sin ?formato=: el formato sale del Content-Type y solo se aceptan CSV y NDJSON.
+"""
+import json
+
+import pytest
+
+
+def _ndjson(*dnis):
+    return "\n".join(json.dumps({
+        "nombre": f"Importada {d}", "email": f"importada{d}@test.com", "dni": d,
+        "telefono": "1234", "fecha_Nacimiento": "1990-05-01",
+    }) for d in dnis).encode()
+
+
+def test_ndjson_por_content_type(cliente):
+    r = cliente.post("/personas/importar", content=_ndjson(9401, 9402), headers={"content-type": "application/x-ndjson"})
+
+    assert r.status_code == 200, r.text
+    assert (r.json()["procesadas"], r.json()["creadas"]) == (2, 2)
+
+
+def test_csv_por_content_type(cliente):
+    cuerpo = "nombre;email;dni;telefono;fecha_Nacimiento\nImportada CSV;importadacsv@test.com;9403;1234;1990-05-01\n"
+    r = cliente.post("/personas/importar", content=cuerpo.encode(), headers={"content-type": "text/csv; charset=utf-8"})
+
+    assert r.status_code == 200, r.text
+    assert r.json()["creadas"] == 1
+
+
+@pytest.mark.parametrize("tipo", ["application/json", "text/plain", ""])
+def test_otros_content_type_rechazados(cliente, tipo):
+    cuerpo = json.dumps([json.loads(_ndjson(9404))]).encode()
+    r = cliente.post("/personas/importar", content=cuerpo, headers={"content-type": tipo})
+
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Formato inválido: use csv o ndjson"
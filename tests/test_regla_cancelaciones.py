@@ -0,0 +1,58 @@
+"""
+Regla de 5 cancelaciones en la ventana (Utilidades/cancelaciones.py): se valida contra las estadísticas diarias
+en cada POST /turnos, así una cancelación hecha por cualquier worker cuenta enseguida.
+"""
+from datetime import date, timedelta
+
+from BaseDatos.database import SessionLocal
+from Modelos.models import EstadisticaTurnoDiaria, EstadoTurno, Persona
+from Utilidades.cancelaciones import cancelaciones_recientes, limite_cancelaciones
+from Utilidades.slots import SLOTS
+
+DNI = 9301
+
+
+def _turno(cliente, dias: int, slot: int):
+    fecha = date.today() + timedelta(days=dias)
+    return cliente.post("/turnos", json={"fecha": fecha.isoformat(), "hora": SLOTS[slot], "persona_dni": DNI})
+
+
+def test_quinta_cancelacion_bloquea_nuevos_turnos(cliente):
+    r = cliente.post("/personas", json={
+        "nombre": "Cancela Mucho", "email": "regla@test.com", "dni": DNI,
+        "telefono": "1234", "fecha_Nacimiento": "1990-05-01",
+    })
+    assert r.status_code == 201, r.text
+
+    for i in range(5):
+        r = _turno(cliente, 20 + i, 0)
+        assert r.status_code == 201, r.text
+        assert cliente.put(f"/turnos/{r.json()['id']}/cancelar").status_code == 200
+
+        db = SessionLocal()
+        try:
+            persona_id = db.query(Persona.id).filter(Persona.dni == DNI).scalar()
+            assert cancelaciones_recientes(db, [persona_id]) == {persona_id: i + 1}
+        finally:
+            db.close()
+
+    r = _turno(cliente, 30, 1)
+    assert r.status_code == 422
+    assert "5 o más cancelaciones" in r.json()["detail"]
+
+
+def test_cancelaciones_fuera_de_la_ventana_no_cuentan(cliente):
+    db = SessionLocal()
+    try:
+        vieja = limite_cancelaciones() - timedelta(days=1)
+        db.add(EstadisticaTurnoDiaria(persona_id=999_999, estado=EstadoTurno.cancelado, fecha=vieja, cantidad=7))
+        db.add(EstadisticaTurnoDiaria(
+            persona_id=999_999, estado=EstadoTurno.cancelado, fecha=limite_cancelaciones(), cantidad=2,
+        ))
+        db.commit()
+
+        assert cancelaciones_recientes(db, [999_999, 999_998]) == {999_999: 2, 999_998: 0}
+    finally:
+        db.query(EstadisticaTurnoDiaria).filter(EstadisticaTurnoDiaria.persona_id == 999_999).delete()
+        db.commit()
+        db.close()
@@ -0,0 +1,72 @@
+"""
+GET /reportes/turnos-cancelados: una sola sentencia para todas las personas que superan el mínimo y la misma
+salida que la versión con una consulta por persona (personas por id, turnos del más reciente al más antiguo).
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from BaseDatos.database import SessionLocal
+from Modelos.models import EstadoTurno, Persona, Turno
+from Utilidades.slots import HORAS
+
+MINIMO = 3
+
+# dni -> (cancelados, otros turnos); las dos últimas quedan por debajo del mínimo
+CANCELACIONES = {9201: (5, 2), 9202: (3, 1), 9203: (4, 0), 9204: (2, 3), 9205: (0, 1)}
+
+
+@pytest.fixture(scope="module")
+def personas_con_cancelados(cliente):
+    # Directo con el ORM: por la API la regla de 5 cancelaciones impediría sacar más turnos
+    inicio = date(2025, 3, 3)
+    db = SessionLocal()
+    try:
+        ids = {}
+        for dni, (cancelados, otros) in CANCELACIONES.items():
+            persona = Persona(
+                nombre=f"Cancela {dni}", email=f"cancela{dni}@test.com", dni=dni,
+                telefono="1234", fecha_Nacimiento=date(1985, 1, 1), habilitado=True,
+            )
+            db.add(persona)
+            db.flush()
+            ids[dni] = persona.id
+            # varios cancelados el mismo día, en distintas horas, para comprobar el orden por fecha y hora
+            for i in range(cancelados + otros):
+                db.add(Turno(
+                    fecha=inicio + timedelta(days=i // 2), hora=HORAS[(dni + i) % len(HORAS)],
+                    estado=EstadoTurno.cancelado if i < cancelados else EstadoTurno.asistido,
+                    persona_id=persona.id,
+                ))
+        db.commit()
+        return ids
+    finally:
+        db.close()
+
+
+def test_cancelados_una_consulta(cliente, personas_con_cancelados, consultas):
+    consultas.reiniciar()
+    r = cliente.get("/reportes/turnos-cancelados", params={"min": MINIMO})
+
+    assert r.status_code == 200, r.text
+    assert consultas.cantidad == 1, consultas.sentencias
+
+
+def test_cancelados_agrupados_por_persona(cliente, personas_con_cancelados):
+    datos = cliente.get("/reportes/turnos-cancelados", params={"min": MINIMO}).json()
+
+    esperadas = sorted(
+        (dni for dni, (cancelados, _) in CANCELACIONES.items() if cancelados >= MINIMO),
+        key=personas_con_cancelados.get,
+    )
+    assert datos["min_cancelados"] == MINIMO
+    # otros tests pueden dejar personas con cancelaciones en la misma base
+    propias = [p for p in datos["personas"] if p["persona"]["dni"] in CANCELACIONES]
+    assert [p["persona"]["dni"] for p in propias] == esperadas
+
+    for p in propias:
+        turnos = p["turnos"]
+        assert p["cancelados"] == len(turnos) == CANCELACIONES[p["persona"]["dni"]][0]
+        assert all(t["estado"] == EstadoTurno.cancelado.value for t in turnos)
+        claves = [(t["fecha"], t["hora"]) for t in turnos]
+        assert claves == sorted(claves, reverse=True)
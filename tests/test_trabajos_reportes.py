@@ -0,0 +1,49 @@
+"""
+Registro de trabajos de reportes en segundo plano: el estado se guarda junto al archivo, así otro worker del
+API (otra instancia de ColaReportes) lo encuentra.
+"""
+import os
+from datetime import date
+
+from Utilidades.trabajos import ColaReportes, ESTADO_ERROR, ESTADO_PENDIENTE, ESTADO_TERMINADO, TrabajoReporte
+
+
+def test_estado_visible_desde_otra_cola(tmp_path):
+    trabajo = TrabajoReporte("csv", "turnos-por-fecha", {"fecha": date(2026, 1, 5)})
+    trabajo.guardar()
+
+    otro = ColaReportes().obtener(trabajo.id)
+    assert otro is not None
+    assert otro.estado == ESTADO_PENDIENTE
+    assert otro.parametros == {"fecha": "2026-01-05"}
+    assert otro.creado == trabajo.creado
+
+    ruta = tmp_path / "turnos.csv"
+    ruta.write_text("fecha;hora\n")
+    trabajo.aplicar_resultado({"ok": True, "archivo": "turnos.csv", "ruta": str(ruta), "filas": 1})
+    trabajo.guardar()
+
+    otro = ColaReportes().obtener(trabajo.id)
+    assert otro.estado == ESTADO_TERMINADO
+    assert (otro.filas, otro.ruta, otro.archivo) == (1, str(ruta), "turnos.csv")
+    assert otro.como_dict()["descarga"] == f"/reportes/trabajos/{trabajo.id}/archivo"
+
+    # vencido: se borran el estado y el archivo
+    ColaReportes(ttl_seg=-1)._purgar_vencidos()
+    assert ColaReportes().obtener(trabajo.id) is None
+    assert not os.path.exists(ruta)
+
+
+def test_error_y_ids_invalidos(cliente):
+    trabajo = TrabajoReporte("pdf", "turnos-por-fecha", {"fecha": "1999-01-01"})
+    trabajo.aplicar_resultado({"ok": False, "status_code": 404, "detalle": "Sin datos"})
+    trabajo.guardar()
+
+    r = cliente.get(f"/reportes/trabajos/{trabajo.id}")
+    assert r.status_code == 200
+    assert r.json()["estado"] == ESTADO_ERROR
+    r = cliente.get(f"/reportes/trabajos/{trabajo.id}/archivo")
+    assert (r.status_code, r.json()["detail"]) == (404, "Sin datos")
+
+    assert cliente.get("/reportes/trabajos/no-existe").status_code == 404
+    assert cliente.get("/reportes/trabajos/..%2F..%2Fconftest").status_code == 404
@@ -0,0 +1,48 @@
+"""
+POST /turnos/bulk (Rutas/turnos.py): cada ítem se valida por separado y los válidos se insertan juntos; los
+errores se informan por índice sin cortar el lote.
+"""
+from datetime import date, timedelta
+
+from Utilidades.slots import SLOTS
+
+DNI = 9501
+DNI_INEXISTENTE = 9599
+
+
+def test_lote_con_duplicado_dni_inexistente_y_hora_invalida(cliente):
+    r = cliente.post("/personas", json={
+        "nombre": "Carga Lote", "email": "bulk@test.com", "dni": DNI,
+        "telefono": "1234", "fecha_Nacimiento": "1985-03-10",
+    })
+    assert r.status_code == 201, r.text
+
+    fecha = (date.today() + timedelta(days=60)).isoformat()
+    r = cliente.post("/turnos/bulk", json=[
+        {"fecha": fecha, "hora": SLOTS[0], "persona_dni": DNI},
+        {"fecha": fecha, "hora": SLOTS[0], "persona_dni": DNI},
+        {"fecha": fecha, "hora": SLOTS[1], "persona_dni": DNI_INEXISTENTE},
+        {"fecha": fecha, "hora": "25:00", "persona_dni": DNI},
+        {"fecha": fecha, "hora": SLOTS[2], "persona_dni": DNI},
+    ])
+    assert r.status_code == 200, r.text
+    cuerpo = r.json()
+
+    assert cuerpo["creados"] == 2
+    assert cuerpo["errores"] == 3
+    resultados = cuerpo["resultados"]
+    assert [x["indice"] for x in resultados] == [0, 1, 2, 3, 4]
+    assert [x["status_code"] for x in resultados] == [201, 409, 404, 422, 201]
+    assert resultados[1]["error"] == "Horario ocupado"
+    assert resultados[2]["error"] == "Persona no encontrada"
+    assert "Hora inválida" in resultados[3]["error"]
+    assert all(resultados[i]["turno"] is None for i in (1, 2, 3))
+
+    creados = [resultados[i]["turno"] for i in (0, 4)]
+    assert [t["hora"] for t in creados] == [SLOTS[0], SLOTS[2]]
+    assert {t["estado"] for t in creados} == {"pendiente"}
+
+    # Solo los ítems válidos quedaron en la base
+    r = cliente.get("/turnos", params={"persona_dni": DNI, "fecha": fecha})
+    assert r.status_code == 200, r.text
+    assert sorted(t["id"] for t in r.json()) == sorted(t["id"] for t in creados)
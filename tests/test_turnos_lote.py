@@ -0,0 +1,120 @@
+"""
+POST /turnos/bulk/cancelar y /turnos/bulk/confirmar (Rutas/turnos.py, _cambiar_estado_lote): un resultado por id
+con 404 para los inexistentes, 422 para los estados que no admiten el cambio y 409 para los turnos que otro
+pedido cambió entre el SELECT y el UPDATE.
+"""
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from BaseDatos.database import SessionLocal, engine
+from Modelos.models import EstadoTurno, Turno
+from Utilidades.slots import SLOTS
+
+DNI = 9601
+ID_INEXISTENTE = 10**9
+
+
+def _persona(cliente):
+    if cliente.get(f"/personas/{DNI}").status_code == 404:
+        r = cliente.post("/personas", json={
+            "nombre": "Lote Estados", "email": "lote@test.com", "dni": DNI,
+            "telefono": "1234", "fecha_Nacimiento": "1992-07-15",
+        })
+        assert r.status_code == 201, r.text
+
+
+def _turnos(cliente, dias: int, estados):
+    # Un turno por estado, en slots consecutivos del mismo día; devuelve los ids en el mismo orden
+    _persona(cliente)
+    fecha = (date.today() + timedelta(days=dias)).isoformat()
+    ids = []
+    for slot, estado in enumerate(estados):
+        r = cliente.post("/turnos", json={"fecha": fecha, "hora": SLOTS[slot], "persona_dni": DNI})
+        assert r.status_code == 201, r.text
+        turno_id = r.json()["id"]
+        if estado != EstadoTurno.pendiente:
+            r = cliente.put(f"/turnos/{turno_id}", json={"estado": estado.value})
+            assert r.status_code == 200, r.text
+        ids.append(turno_id)
+    return ids
+
+
+@contextmanager
+def _cambio_concurrente(turno_id: int, estado: EstadoTurno):
+    # Antes del UPDATE del lote, otra sesión cambia el estado del turno (como un pedido concurrente)
+    def antes_del_update(conn, cursor, statement, parameters, context, executemany):
+        if hecho or not statement.lstrip().upper().startswith("UPDATE TURNOS"):
+            return
+        hecho.append(turno_id)
+        otra = SessionLocal()
+        try:
+            otra.get(Turno, turno_id).estado = estado
+            otra.commit()
+        finally:
+            otra.close()
+
+    hecho = []
+    event.listen(engine, "before_cursor_execute", antes_del_update)
+    try:
+        yield
+    finally:
+        event.remove(engine, "before_cursor_execute", antes_del_update)
+
+
+def _estados(cliente, ids):
+    estados = []
+    for turno_id in ids:
+        r = cliente.get(f"/turnos/{turno_id}")
+        assert r.status_code == 200, r.text
+        estados.append(r.json()["estado"])
+    return estados
+
+
+def test_cancelar_en_lote(cliente):
+    pendiente, asistido, concurrente = _turnos(
+        cliente, 70, [EstadoTurno.pendiente, EstadoTurno.asistido, EstadoTurno.pendiente]
+    )
+
+    with _cambio_concurrente(concurrente, EstadoTurno.confirmado):
+        r = cliente.post("/turnos/bulk/cancelar", json={
+            "ids": [pendiente, asistido, concurrente, ID_INEXISTENTE],
+        })
+    assert r.status_code == 200, r.text
+    cuerpo = r.json()
+
+    assert cuerpo["actualizados"] == 1
+    assert cuerpo["errores"] == 3
+    resultados = cuerpo["resultados"]
+    assert [x["id"] for x in resultados] == [pendiente, asistido, concurrente, ID_INEXISTENTE]
+    assert [x["status_code"] for x in resultados] == [200, 422, 409, 404]
+    assert resultados[0]["turno"]["estado"] == "cancelado"
+    assert resultados[1]["error"] == "No se puede cancelar un turno asistido"
+    assert "otro pedido" in resultados[2]["error"]
+
+    assert _estados(cliente, [pendiente, asistido, concurrente]) == ["cancelado", "asistido", "confirmado"]
+
+
+def test_confirmar_en_lote(cliente):
+    pendiente, cancelado, asistido, concurrente = _turnos(
+        cliente, 71, [EstadoTurno.pendiente, EstadoTurno.cancelado, EstadoTurno.asistido, EstadoTurno.pendiente]
+    )
+
+    with _cambio_concurrente(concurrente, EstadoTurno.asistido):
+        r = cliente.post("/turnos/bulk/confirmar", json={
+            "ids": [pendiente, cancelado, asistido, concurrente, ID_INEXISTENTE],
+        })
+    assert r.status_code == 200, r.text
+    cuerpo = r.json()
+
+    assert cuerpo["actualizados"] == 1
+    assert cuerpo["errores"] == 4
+    resultados = cuerpo["resultados"]
+    assert [x["status_code"] for x in resultados] == [200, 422, 422, 409, 404]
+    assert resultados[0]["turno"]["estado"] == "confirmado"
+    assert {resultados[i]["error"] for i in (1, 2)} == {"No se puede confirmar un turno asistido o cancelado"}
+
+    assert _estados(cliente, [pendiente, cancelado, asistido, concurrente]) == [
+        "confirmado", "cancelado", "asistido", "asistido",
+    ]